@@ -0,0 +1,190 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from models import db, Application
+from queries import apply_application_filters, parse_float
+from stats import ENROLLMENT_STATUSES
+
+# Percentiles of final_percentage reported by the analytics endpoint
+PERCENTILES = [10, 25, 50, 75, 90]
+
+DEFAULT_BUCKET_WIDTH = 10
+ALLOWED_BUCKET_WIDTHS = [1, 2, 5, 10, 20, 25, 50]
+
+# Applicants at or above this percentage count as high performers
+HIGH_PERFORMER_PERCENTAGE = 80
+
+RECENT_DAYS = 7
+
+# Request arguments that select the cohort (the dashboard filters) or shape the result
+ANALYTICS_ARGS = ['q', 'min_percentage', 'max_percentage', 'gender', 'enrollment_status', 'university', 'bucket_width']
+
+
+class AnalyticsCache:
+    """
+    Small LRU cache of computed analytics. Keys include the data version of
+    the filtered cohort, so any write to it produces a new key and stale
+    entries simply age out.
+    """
+
+    def __init__(self, max_size=128):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+        return None
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+
+def get_analytics_cache():
+    """Return the app's analytics cache, creating it on first use."""
+    cache = current_app.extensions.get('analytics_cache')
+    if cache is None:
+        cache = AnalyticsCache()
+        current_app.extensions['analytics_cache'] = cache
+    return cache
+
+
+def parse_bucket_width(value):
+    if value in (None, ''):
+        return DEFAULT_BUCKET_WIDTH
+    width = parse_float(value, 'bucket_width')
+    if width not in ALLOWED_BUCKET_WIDTHS:
+        raise ValueError(f'bucket_width must be one of: {", ".join(str(w) for w in ALLOWED_BUCKET_WIDTHS)}')
+    return int(width)
+
+
+def analytics_key(args, version, window):
+    """Cache key and ETag input: the relevant arguments, the cohort's data version and the time window."""
+    return (tuple((name, args.get(name) or '') for name in ANALYTICS_ARGS),) + tuple(version) + (window,)
+
+
+def time_window():
+    """Index of the current ANALYTICS_CACHE_TTL period; 'recent' counts move with the clock."""
+    return int(time.time() // current_app.config['ANALYTICS_CACHE_TTL'])
+
+
+def summary_statistics(args, recent_since):
+    """Count, mean, range, high performers and recent applications in one pass."""
+    row = apply_application_filters(db.session.query(
+        db.func.count(Application.id),
+        db.func.count(Application.final_percentage),
+        db.func.avg(Application.final_percentage),
+        db.func.min(Application.final_percentage),
+        db.func.max(Application.final_percentage),
+        db.func.sum(db.case((Application.final_percentage >= HIGH_PERFORMER_PERCENTAGE, 1), else_=0)),
+        db.func.sum(db.case((Application.created_at >= recent_since, 1), else_=0))
+    ), args).one()
+    total, scored, mean, minimum, maximum, high_performers, recent = row
+    return {
+        'total': total,
+        'with_percentage': scored,
+        'mean_percentage': round(mean, 2) if mean is not None else None,
+        'min_percentage': minimum,
+        'max_percentage': maximum,
+        'high_performers': high_performers or 0,
+        'high_performer_threshold': HIGH_PERFORMER_PERCENTAGE,
+        'recent': recent or 0,
+        'recent_days': RECENT_DAYS
+    }
+
+
+def interpolate_percentile(values, q):
+    """Linear interpolation between closest ranks of a sorted list, like SQL percentile_cont."""
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def percentage_percentiles(args):
+    """PERCENTILES of final_percentage, computed in the database where it supports percentile_cont."""
+    if db.engine.dialect.name == 'postgresql':
+        row = apply_application_filters(db.session.query(*[
+            db.func.percentile_cont(q / 100).within_group(Application.final_percentage)
+            for q in PERCENTILES
+        ]), args).one()
+        values = list(row)
+    else:
+        # Load just the one column, already sorted by the database
+        column = [value for (value,) in apply_application_filters(
+            db.session.query(Application.final_percentage).filter(Application.final_percentage != None), args
+        ).order_by(Application.final_percentage)]
+        values = [interpolate_percentile(column, q) if column else None for q in PERCENTILES]
+    return {f'p{q}': round(value, 2) if value is not None else None for q, value in zip(PERCENTILES, values)}
+
+
+def percentage_histogram(args, width):
+    """Counts of final_percentage in [0, width), [width, 2*width), ... with 100 in the last bucket."""
+    bucket_count = 100 // width
+    bucket = db.cast(Application.final_percentage / width, db.Integer)
+    rows = apply_application_filters(
+        db.session.query(bucket, db.func.count(Application.id)).filter(Application.final_percentage != None),
+        args
+    ).group_by(bucket).all()
+
+    counts = [0] * bucket_count
+    for index, count in rows:
+        counts[max(0, min(index, bucket_count - 1))] += count
+    return [
+        {'min': i * width, 'max': (i + 1) * width, 'count': count}
+        for i, count in enumerate(counts)
+    ]
+
+
+def grouped_counts(args, *columns):
+    return apply_application_filters(
+        db.session.query(*columns, db.func.count(Application.id)), args
+    ).group_by(*columns).all()
+
+
+def cohort_analytics(args):
+    """
+    Aggregate statistics over the applications matching the dashboard
+    filters: summary counts, final_percentage percentiles and histogram,
+    gender and enrollment status breakdowns, and enrollment status by
+    admission year. Raises ValueError for invalid arguments.
+    """
+    width = parse_bucket_width(args.get('bucket_width'))
+    recent_since = datetime.utcnow() - timedelta(days=RECENT_DAYS)
+
+    # NULL and empty values are grouped separately but reported together
+    genders = Counter()
+    for gender, count in grouped_counts(args, Application.gender):
+        genders[gender or 'unspecified'] += count
+
+    statuses = {status: 0 for status in ENROLLMENT_STATUSES}
+    by_year = {}
+    for year, status, count in grouped_counts(args, Application.admission_year, Application.enrollment_status):
+        status = status or 'none'
+        statuses[status] = statuses.get(status, 0) + count
+        row = by_year.setdefault(year or None, {status: 0 for status in ENROLLMENT_STATUSES})
+        row[status] = row.get(status, 0) + count
+
+    return {
+        'summary': summary_statistics(args, recent_since),
+        'percentiles': percentage_percentiles(args),
+        'histogram': percentage_histogram(args, width),
+        'gender': dict(genders),
+        'status': statuses,
+        # Years without a value sort last
+        'status_by_year': [
+            dict(counts, admission_year=year, total=sum(counts.values()))
+            for year, counts in sorted(by_year.items(), key=lambda item: (item[0] is None, item[0] or 0))
+        ]
+    }
@@ -1,7 +1,30 @@
-from flask import Flask, request, jsonify, send_file, redirect, url_for, session, current_app
+from flask import Flask, Blueprint, Response, request, jsonify, send_file, redirect, url_for, session, current_app, stream_with_context
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from flask_cors import CORS
-from models import db, User, Application, File  # Added File import
+import click
+from database import configure_database, apply_sqlite_pragmas, env_flag
+from jsonprovider import FastJSONProvider
+from metrics import RequestMetrics
+from compression import ResponseCompressor
+from migrations import run_migrations, migration_status
+from models import db, User, Application, File, ReportJob, ImportJob, UploadSession  # Added File import
+from queries import parse_fieldset, parse_page_size, load_fields, search_applications, list_users_with_applications, apply_application_filters, application_list_version
+from conditional import make_etag, is_not_modified, with_validators, not_modified_response
+from changes import CursorExpired, listen_for_application_changes, get_changes, prune_tombstones
+from search import get_search_index, DEFAULT_RESULT_LIMIT, MAX_RESULT_LIMIT
+from exports import EXPORT_FORMATS, parse_export_columns, generate_export
+from jobs import ReportJobRunner, select_applications, MAX_JOB_APPLICATIONS
+import json
+from universities import sync_application_universities, ensure_university_links, backfill_application_universities, university_funnel
+from analytics import analytics_key, time_window, get_analytics_cache, cohort_analytics
+from ranking import load_ranking_weights, validate_weights, listen_for_ranking_inputs, ensure_rankings, rescore_applications, parse_program_source, top_applications, program_counts
+from stats import listen_for_application_writes, ensure_statistics, rebuild_statistics, enrollment_statistics, university_enrollment_counts
+from blobs import listen_for_file_writes, create_file_record, migrate_legacy_files, collect_unreferenced_blobs
+from serving import FILE_SERVING_MODES, file_etag, send_stored_file, send_derivative, file_not_modified_response
+from thumbnails import THUMBNAIL_SIZES, DEFAULT_THUMBNAIL_SIZE, get_thumbnail
+from user_import import parse_import_file, parse_import_records, check_import_size, fail_stale_import_job, ImportJobRunner
+from auth import PasswordVerifier, PasswordCheckBusy, SessionUserCache, SAFE_METHODS
+from uploads import UploadOffsetError, partial_upload_path, start_upload, append_chunk, finish_upload, discard_upload, expire_stale_uploads, upload_expiry
 import os
 from werkzeug.utils import secure_filename
 from datetime import datetime, timedelta
@@ -9,47 +32,135 @@ import mimetypes
 import uuid
 import shutil
 
-app = Flask(__name__)
-# Configure CORS to allow requests from your React app
-CORS(app, resources={r"/api/*": {"origins": "http://localhost:3000"}}, supports_credentials=True)
+api = Blueprint('api', __name__, cli_group=None)
 
-app.config['SECRET_KEY'] = 'your-secret-key-here'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///applicants.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['UPLOAD_FOLDER'] = 'uploads'
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16 MB max upload size
+# Extensions are created here and bound to an app in create_app()
+login_manager = LoginManager()
 
-# Ensure upload directory exists
-if not os.path.exists(app.config['UPLOAD_FOLDER']):
-    os.makedirs(app.config['UPLOAD_FOLDER'])
+# Background runner for batch report jobs
+report_jobs = ReportJobRunner()
 
-# Initialize database
-db.init_app(app)
+# Background runner for bulk user imports
+import_jobs = ImportJobRunner()
 
-# Initialize Flask-Login
-login_manager = LoginManager()
-login_manager.init_app(app)
+# Derived data is maintained by session events. db.session is shared by every
+# app in the process, so these are registered once, at import.
+
+# Keep the enrollment and university counters up to date on every write
+listen_for_application_writes(db.session)
+
+# Number application writes and record deletions for the change feed
+listen_for_application_changes(db.session)
+
+# Keep blob reference counts in step with File rows
+listen_for_file_writes(db.session)
+
+# Recompute ranking scores and program links when an application changes
+listen_for_ranking_inputs(db.session)
+
+def create_app(config=None):
+    """
+    Build the application. Does no database or filesystem work, so it is
+    cheap to call in every worker; run `flask init-db` once per deployment
+    to create and migrate the schema. `config` overrides the defaults.
+    """
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    # Configure CORS to allow requests from your React app
+    CORS(app, resources={r"/api/*": {"origins": "http://localhost:3000"}}, supports_credentials=True)
+    
+    app.config['SECRET_KEY'] = 'your-secret-key-here'
+    configure_database(app)  # DATABASE_URL, DB_POOL_* and SQLITE_* environment variables
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['UPLOAD_FOLDER'] = 'uploads'
+    app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16 MB max upload size
+    app.config['REPORT_FOLDER'] = 'reports'
+    app.config['REPORT_WORKERS'] = int(os.environ.get('REPORT_WORKERS', '0')) or None  # PDF render processes per web worker; None means one per CPU
+    app.config['MAX_UPLOAD_SIZE'] = 200 * 1024 * 1024  # Largest file accepted through chunked uploads
+    app.config['UPLOAD_CHUNK_SIZE'] = 5 * 1024 * 1024  # Chunk size suggested to clients; must stay below MAX_CONTENT_LENGTH
+    app.config['UPLOAD_EXPIRY_HOURS'] = 24  # Unfinished chunked uploads idle for longer are removed
+    app.config['CHANGE_FEED_RETENTION_DAYS'] = 30  # `flask prune-change-feed` drops older deletions; feed clients idle for longer must resync
+    app.config['FILE_SERVING'] = 'direct'  # One of FILE_SERVING_MODES; offload transfers to nginx/Apache in production
+    app.config['X_ACCEL_REDIRECT_PREFIX'] = '/protected-uploads/'  # nginx internal location aliased to UPLOAD_FOLDER
+    app.config['THUMBNAIL_FOLDER'] = 'thumbnails'
+    app.config['IMPORT_WORKERS'] = None  # Password hashing processes for bulk imports; None means one per CPU
+    app.config['PASSWORD_CHECK_WORKERS'] = None  # Concurrent login password checks; None means one per CPU
+    app.config['SESSION_USER_CACHE_TTL'] = 60  # Seconds a logged-in user's details are reused by read-only requests without a query
+    app.config['THUMBNAIL_CACHE_SIZE'] = 200 * 1024 * 1024  # Least recently used thumbnails are evicted beyond this
+    app.config['SLOW_QUERY_THRESHOLD'] = float(os.environ.get('SLOW_QUERY_THRESHOLD', '0.25'))  # Seconds; slower SQL statements are logged with their route
+    app.config['QUERY_COUNT_HEADER'] = env_flag('QUERY_COUNT_HEADER')  # Add X-Query-Count and Server-Timing headers; for development
+    app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')  # When set, /metrics requires "Authorization: Bearer <token>"
+    app.config['COMPRESS_RESPONSES'] = env_flag('COMPRESS_RESPONSES', True)  # Turn off when a proxy in front already compresses
+    app.config['COMPRESSION_MIN_SIZE'] = 1024  # Smaller buffered responses are sent uncompressed
+    app.config['ANALYTICS_CACHE_TTL'] = 300  # Seconds cached dashboard analytics are reused while the data is unchanged
+    app.config['RANKING_WEIGHTS'] = load_ranking_weights()  # RANKING_WEIGHTS or RANKING_WEIGHTS_FILE (JSON); run `flask rescore-applications` after changing
+    app.config.update(config or {})
+    
+    if app.config['FILE_SERVING'] not in FILE_SERVING_MODES:
+        raise ValueError(f"FILE_SERVING must be one of: {', '.join(FILE_SERVING_MODES)}")
+    validate_weights(app.config['RANKING_WEIGHTS'])
+    
+    # Initialize database; engines are created here but connect on first use
+    db.init_app(app)
+    with app.app_context():
+        apply_sqlite_pragmas(db.engine)
+        # Per-endpoint latency and SQL statement counts, served on /metrics
+        RequestMetrics(app, db.engine)
+    
+    # gzip/brotli for JSON and CSV responses; registered after the metrics so its time is included
+    ResponseCompressor(app)
+    
+    report_jobs.init_app(app)
+    import_jobs.init_app(app)
+    
+    # Initialize Flask-Login
+    login_manager.init_app(app)
+    
+    # Login password checks run on a bounded pool so bursts can't starve other routes
+    app.extensions['password_verifier'] = PasswordVerifier(app.config['PASSWORD_CHECK_WORKERS'])
+    
+    # Logged-in users are cached between requests and dropped when their account changes
+    session_users = SessionUserCache(ttl=app.config['SESSION_USER_CACHE_TTL'])
+    session_users.listen_for_user_changes(db.session)
+    app.extensions['session_users'] = session_users
+    
+    app.register_blueprint(api)
+    return app
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    # Writes always re-read the user, so an account deleted or demoted by
+    # another worker can't act on its cached copy; reads may use a copy up
+    # to SESSION_USER_CACHE_TTL seconds old
+    refresh = request.method not in SAFE_METHODS
+    return current_app.extensions['session_users'].get(int(user_id), refresh=refresh)
 
-# Create database tables
-with app.app_context():
-    db.create_all()
+def initialize_database(admin_email, admin_password):
+    """
+    One-shot database setup: create and migrate the schema, build derived
+    data for existing rows and create the first admin if there are no
+    users. Safe to re-run. Returns (applied migration names, new admin or None).
+    """
+    # Create missing tables and bring existing ones up to date
+    applied = run_migrations()
+    get_search_index().ensure_index()
+    ensure_university_links()
+    ensure_statistics()
+    ensure_rankings()
     
     # Create default admin user if no users exist
+    admin = None
     if not User.query.first():
         admin = User(
-            email='admin@example.com',
+            email=admin_email,
             is_admin=True,
             first_name='Admin',
             last_name='User'
         )
-        admin.set_password('admin123')
+        admin.set_password(admin_password)
         db.session.add(admin)
         db.session.commit()
-        print("Default admin user created with email: admin@example.com and password: admin123")
+    return applied, admin
 
 # Helper functions
 def get_file_extension(filename):
@@ -62,17 +173,48 @@ def generate_unique_filename(original_filename):
 
 def create_user_directory(user_id):
     """Create a directory for the user's files if it doesn't exist."""
-    user_dir = os.path.join(app.config['UPLOAD_FOLDER'], str(user_id))
-    if not os.path.exists(user_dir):
-        os.makedirs(user_dir)
+    user_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], str(user_id))
+    os.makedirs(user_dir, exist_ok=True)
     return user_dir
 
 def get_mime_type(file_path):
     """Get the MIME type of a file."""
     return mimetypes.guess_type(file_path)[0] or 'application/octet-stream'
 
+# Allowed extensions per file type; other types accept any extension
+ALLOWED_EXTENSIONS = {
+    'transcript': ['.pdf', '.doc', '.docx'],
+    'cv': ['.pdf', '.doc', '.docx'],
+    'photo': ['.jpg', '.jpeg', '.png']
+}
+
+def validate_file_type(filename, file_type):
+    """Return an error message if the extension isn't allowed for the file type, else None."""
+    file_extension = get_file_extension(filename)
+    if file_type in ALLOWED_EXTENSIONS and file_extension not in ALLOWED_EXTENSIONS[file_type]:
+        return f'Invalid file type. Allowed types for {file_type}: {", ".join(ALLOWED_EXTENSIONS[file_type])}'
+    return None
+
+def attach_file_to_application(application_id, file):
+    """Point the user's application at a newly uploaded file, if one was given."""
+    if application_id:
+        application = Application.query.get(application_id)
+        if application and application.user_id == file.user_id:
+            setattr(application, file.file_type, file.id)
+            db.session.commit()
+
+def file_upload_response(file, **extra):
+    return jsonify({
+        'message': 'File uploaded successfully',
+        'fileId': file.id,
+        'originalName': file.original_name,
+        'fileType': file.file_type,
+        'fileSize': file.file_size,
+        **extra
+    }), 201
+
 # Routes
-@app.route('/api/register', methods=['POST'])
+@api.route('/api/register', methods=['POST'])
 def register():
     data = request.get_json()
     
@@ -103,7 +245,7 @@ def register():
         'user_id': new_user.id
     }), 201
 
-@app.route('/api/login', methods=['POST'])
+@api.route('/api/login', methods=['POST'])
 def login():
     data = request.get_json()
     
@@ -112,7 +254,12 @@ def login():
     
     user = User.query.filter_by(email=data['email']).first()
     
-    if not user or not user.check_password(data['password']):
+    try:
+        valid = user is not None and current_app.extensions['password_verifier'].verify(user.password, data['password'])
+    except PasswordCheckBusy:
+        return jsonify({'message': 'Too many login attempts in progress, please try again shortly'}), 503, {'Retry-After': '1'}
+    
+    if not valid:
         return jsonify({'message': 'Invalid email or password'}), 401
     
     login_user(user)
@@ -123,7 +270,7 @@ def login():
         'is_admin': user.is_admin
     }), 200
 
-@app.route('/api/check-auth', methods=['GET'])
+@api.route('/api/check-auth', methods=['GET'])
 def check_auth():
     if current_user.is_authenticated:
         return jsonify({
@@ -136,12 +283,12 @@ def check_auth():
             'authenticated': False
         }), 200
 
-@app.route('/api/logout', methods=['POST'])
+@api.route('/api/logout', methods=['POST'])
 def logout():
     logout_user()
     return jsonify({'message': 'Logout successful'}), 200
 
-@app.route('/api/upload-file', methods=['POST'])
+@api.route('/api/upload-file', methods=['POST'])
 @login_required
 def upload_file():
     # Check if file part is in the request
@@ -157,62 +304,171 @@ def upload_file():
         return jsonify({'message': 'No file selected'}), 400
     
     # Validate file type
-    allowed_extensions = {
-        'transcript': ['.pdf', '.doc', '.docx'],
-        'cv': ['.pdf', '.doc', '.docx'],
-        'photo': ['.jpg', '.jpeg', '.png']
-    }
-    
-    file_extension = get_file_extension(file.filename)
-    if file_type in allowed_extensions and file_extension not in allowed_extensions[file_type]:
-        return jsonify({
-            'message': f'Invalid file type. Allowed types for {file_type}: {", ".join(allowed_extensions[file_type])}'
-        }), 400
+    error = validate_file_type(file.filename, file_type)
+    if error:
+        return jsonify({'message': error}), 400
     
     # Create user directory
     user_dir = create_user_directory(current_user.id)
     
-    # Generate a unique filename
+    # Save to a temporary name first
     secure_name = secure_filename(file.filename)
-    unique_filename = f"{file_type}_{generate_unique_filename(secure_name)}"
-    file_path = os.path.join(user_dir, unique_filename)
-    
-    # Save the file
+    file_path = partial_upload_path(user_dir, generate_unique_filename(secure_name))
     file.save(file_path)
     
-    # Get file info
-    file_size = os.path.getsize(file_path)
-    mime_type = get_mime_type(file_path)
-    
-    # Create file record in database
-    new_file = File(
-        user_id=current_user.id,
-        original_name=secure_name,
-        file_path=file_path,
-        file_type=file_type,
-        mime_type=mime_type,
-        file_size=file_size
+    # Create file record in database; identical content is stored only once
+    new_file = create_file_record(
+        current_user.id,
+        file_path,
+        secure_name,
+        file_type,
+        get_mime_type(secure_name)
     )
-    
-    db.session.add(new_file)
     db.session.commit()
     
     # If this is for an existing application, update the application record
-    if application_id:
-        application = Application.query.get(application_id)
-        if application and application.user_id == current_user.id:
-            setattr(application, file_type, new_file.id)
-            db.session.commit()
+    attach_file_to_application(application_id, new_file)
     
-    return jsonify({
-        'message': 'File uploaded successfully',
-        'fileId': new_file.id,
-        'originalName': new_file.original_name,
-        'fileType': new_file.file_type,
-        'fileSize': new_file.file_size
-    }), 201
+    return file_upload_response(new_file)
+
+def get_own_upload(upload_id):
+    upload = UploadSession.query.get_or_404(upload_id)
+    # Security check - uploads can only be continued by the user who started them
+    if upload.user_id != current_user.id:
+        return None
+    return upload
+
+def upload_status(upload):
+    status = upload.to_dict()
+    status['expires_at'] = upload.updated_at + upload_expiry(current_app)
+    return status
+
+@api.route('/api/uploads', methods=['POST'])
+@login_required
+def create_upload():
+    """
+    Start a resumable upload. Send the file in order with
+    PUT /api/uploads/<id>?offset=<n>, then POST /api/uploads/<id>/complete.
+    """
+    data = request.get_json() or {}
+    filename = secure_filename(data.get('filename') or '')
+    file_type = data.get('type', 'document')
+    application_id = data.get('applicationId')
+    
+    if not filename:
+        return jsonify({'message': 'No file selected'}), 400
+    
+    error = validate_file_type(filename, file_type)
+    if error:
+        return jsonify({'message': error}), 400
+    
+    try:
+        total_size = int(data.get('size'))
+    except (TypeError, ValueError):
+        return jsonify({'message': 'File size is required'}), 400
+    if total_size <= 0 or total_size > current_app.config['MAX_UPLOAD_SIZE']:
+        return jsonify({'message': f'File size must be between 1 and {current_app.config["MAX_UPLOAD_SIZE"]} bytes'}), 400
+    
+    # Clear out uploads that were abandoned
+    expire_stale_uploads(upload_expiry(current_app))
+    
+    upload = start_upload(
+        current_user.id,
+        create_user_directory(current_user.id),
+        filename,
+        file_type,
+        total_size,
+        application_id
+    )
+    
+    status = upload_status(upload)
+    status['chunk_size'] = current_app.config['UPLOAD_CHUNK_SIZE']
+    return jsonify(status), 201
+
+@api.route('/api/uploads/<upload_id>', methods=['GET'])
+@login_required
+def get_upload(upload_id):
+    """Report how many bytes have been received, so a client can resume."""
+    upload = get_own_upload(upload_id)
+    if upload is None:
+        return jsonify({'message': 'Unauthorized access'}), 403
+    
+    return jsonify(upload_status(upload)), 200
+
+@api.route('/api/uploads/<upload_id>', methods=['PUT'])
+@login_required
+def upload_chunk(upload_id):
+    """
+    Append the raw request body at ?offset=<n>. The offset must equal the
+    number of bytes already received; otherwise a 409 with the current
+    offset is returned.
+    """
+    upload = get_own_upload(upload_id)
+    if upload is None:
+        return jsonify({'message': 'Unauthorized access'}), 403
+    
+    offset = request.args.get('offset', type=int)
+    if offset is None:
+        return jsonify({'message': 'offset is required'}), 400
+    
+    try:
+        append_chunk(upload, request.stream, offset)
+    except UploadOffsetError as e:
+        return jsonify({'message': str(e), 'offset': e.expected_offset}), 409
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    return jsonify(upload_status(upload)), 200
+
+@api.route('/api/uploads/<upload_id>/complete', methods=['POST'])
+@login_required
+def complete_upload(upload_id):
+    """
+    Finish an upload once every byte has been received. An optional sha256
+    is compared against the digest of the stored bytes.
+    """
+    upload = get_own_upload(upload_id)
+    if upload is None:
+        return jsonify({'message': 'Unauthorized access'}), 403
+    
+    data = request.get_json(silent=True) or {}
+    
+    try:
+        checksum = finish_upload(upload, data.get('sha256'))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    try:
+        new_file = create_file_record(
+            current_user.id,
+            upload.temp_path,
+            upload.original_name,
+            upload.file_type,
+            get_mime_type(upload.original_name),
+            expected_sha256=checksum
+        )
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 409
+    db.session.commit()
+    
+    attach_file_to_application(upload.application_id, new_file)
+    
+    return file_upload_response(new_file, sha256=checksum)
 
-@app.route('/api/files/<int:file_id>/download', methods=['GET'])
+@api.route('/api/uploads/<upload_id>', methods=['DELETE'])
+@login_required
+def cancel_upload(upload_id):
+    upload = get_own_upload(upload_id)
+    if upload is None:
+        return jsonify({'message': 'Unauthorized access'}), 403
+    
+    discard_upload(upload)
+    db.session.commit()
+    
+    return jsonify({'message': 'Upload cancelled'}), 200
+
+@api.route('/api/files/<int:file_id>/download', methods=['GET'])
 @login_required
 def download_file(file_id):
     file = File.query.get_or_404(file_id)
@@ -221,19 +477,10 @@ def download_file(file_id):
     if not current_user.is_admin and file.user_id != current_user.id:
         return jsonify({'message': 'Unauthorized access'}), 403
     
-    # Check if file exists on disk
-    if not os.path.exists(file.file_path):
-        return jsonify({'message': 'File not found on server'}), 404
-    
     # Set attachment filename to original name
-    return send_file(
-        file.file_path,
-        as_attachment=True,
-        download_name=file.original_name,
-        mimetype=file.mime_type
-    )
+    return send_stored_file(file, as_attachment=True)
 
-@app.route('/api/files/<int:file_id>/view', methods=['GET'])
+@api.route('/api/files/<int:file_id>/view', methods=['GET'])
 @login_required
 def view_file(file_id):
     file = File.query.get_or_404(file_id)
@@ -242,17 +489,46 @@ def view_file(file_id):
     if not current_user.is_admin and file.user_id != current_user.id:
         return jsonify({'message': 'Unauthorized access'}), 403
     
-    # Check if file exists on disk
-    if not os.path.exists(file.file_path):
+    # Show in browser instead of downloading
+    return send_stored_file(file)
+
+@api.route('/api/files/<int:file_id>/thumbnail', methods=['GET'])
+@login_required
+def view_thumbnail(file_id):
+    """
+    Downscaled JPEG of an image file, generated on first request and kept in
+    a bounded disk cache. size is one of avatar, thumbnail (default), preview.
+    """
+    file = File.query.get_or_404(file_id)
+    
+    # Security check - only admin or file owner can view
+    if not current_user.is_admin and file.user_id != current_user.id:
+        return jsonify({'message': 'Unauthorized access'}), 403
+    
+    if not (file.mime_type or '').startswith('image/'):
+        return jsonify({'message': 'Thumbnails are only available for images'}), 400
+    
+    size = request.args.get('size', DEFAULT_THUMBNAIL_SIZE)
+    if size not in THUMBNAIL_SIZES:
+        return jsonify({'message': f'Invalid size. Allowed sizes: {", ".join(THUMBNAIL_SIZES)}'}), 400
+    
+    source_etag = file_etag(file)
+    etag = make_etag(source_etag, size)
+    
+    # Answer revalidations without touching the image
+    if request.if_none_match.contains(etag):
+        return file_not_modified_response(etag)
+    
+    try:
+        path = get_thumbnail(file, size, source_etag)
+    except FileNotFoundError:
         return jsonify({'message': 'File not found on server'}), 404
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     
-    # Show in browser instead of downloading
-    return send_file(
-        file.file_path,
-        mimetype=file.mime_type
-    )
+    return send_derivative(path, etag, 'image/jpeg')
 
-@app.route('/api/submit-application', methods=['POST'])
+@api.route('/api/submit-application', methods=['POST'])
 @login_required
 def submit_application():
     data = request.get_json()
@@ -267,6 +543,8 @@ def submit_application():
                 setattr(existing_application, key, value)
         
         existing_application.updated_at = datetime.utcnow()
+        sync_application_universities(existing_application)
+        get_search_index().index_application(existing_application)
         db.session.commit()
         
         return jsonify({
@@ -282,6 +560,9 @@ def submit_application():
                 setattr(new_application, key, value)
         
         db.session.add(new_application)
+        sync_application_universities(new_application)
+        db.session.flush()
+        get_search_index().index_application(new_application)
         db.session.commit()
         
         return jsonify({
@@ -289,28 +570,53 @@ def submit_application():
             'application_id': new_application.id
         }), 201
 
-@app.route('/api/get-application', methods=['GET'])
+@api.route('/api/get-application', methods=['GET'])
 @login_required
 def get_current_user_application():
-    application = Application.query.filter_by(user_id=current_user.id).first()
+    """The current user's application. Accepts fields= or view= to limit the fields returned."""
+    try:
+        fields = parse_fieldset(request.args)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    # Look up only the validators first so unchanged polls skip loading the row
+    version = db.session.query(Application.id, Application.updated_at) \
+        .filter_by(user_id=current_user.id).first()
     
-    if not application:
+    if not version:
         return jsonify({'message': 'No application found for this user'}), 404
     
-    return jsonify(application.to_dict()), 200
+    etag = make_etag('application', version.id, version.updated_at, fields)
+    if is_not_modified(etag, version.updated_at):
+        return not_modified_response(etag, version.updated_at)
+    
+    application = load_fields(Application.query, fields).filter_by(id=version.id).first()
+    return with_validators(jsonify(application.to_dict(fields)), etag, version.updated_at), 200
 
-@app.route('/api/get-application/<int:application_id>', methods=['GET'])
+@api.route('/api/get-application/<int:application_id>', methods=['GET'])
 @login_required
 def get_application_by_id(application_id):
-    application = Application.query.get_or_404(application_id)
+    """A single application. Accepts fields= or view= to limit the fields returned."""
+    try:
+        fields = parse_fieldset(request.args)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    version = db.session.query(Application.user_id, Application.updated_at) \
+        .filter_by(id=application_id).first_or_404()
     
     # Security check - only admin or application owner can view
-    if not current_user.is_admin and application.user_id != current_user.id:
+    if not current_user.is_admin and version.user_id != current_user.id:
         return jsonify({'message': 'Unauthorized access'}), 403
     
-    return jsonify(application.to_dict()), 200
+    etag = make_etag('application', application_id, version.updated_at, fields)
+    if is_not_modified(etag, version.updated_at):
+        return not_modified_response(etag, version.updated_at)
+    
+    application = load_fields(Application.query, fields).filter_by(id=application_id).first_or_404()
+    return with_validators(jsonify(application.to_dict(fields)), etag, version.updated_at), 200
 
-@app.route('/api/update-application/<int:application_id>', methods=['PUT'])
+@api.route('/api/update-application/<int:application_id>', methods=['PUT'])
 @login_required
 def update_application(application_id):
     application = Application.query.get_or_404(application_id)
@@ -327,6 +633,8 @@ def update_application(application_id):
             setattr(application, key, value)
     
     application.updated_at = datetime.utcnow()
+    sync_application_universities(application)
+    get_search_index().index_application(application)
     db.session.commit()
     
     return jsonify({
@@ -334,7 +642,7 @@ def update_application(application_id):
         'application_id': application.id
     }), 200
 
-@app.route('/api/update-application-status/<int:application_id>', methods=['PUT'])
+@api.route('/api/update-application-status/<int:application_id>', methods=['PUT'])
 @login_required
 def update_application_status(application_id):
     application = Application.query.get_or_404(application_id)
@@ -357,6 +665,7 @@ def update_application_status(application_id):
             setattr(application, field, data[field])
     
     application.updated_at = datetime.utcnow()
+    sync_application_universities(application)
     db.session.commit()
     
     return jsonify({
@@ -364,7 +673,7 @@ def update_application_status(application_id):
         'application_id': application.id
     }), 200
 
-@app.route('/api/delete-application/<int:application_id>', methods=['DELETE'])
+@api.route('/api/delete-application/<int:application_id>', methods=['DELETE'])
 @login_required
 def delete_application(application_id):
     application = Application.query.get_or_404(application_id)
@@ -374,46 +683,240 @@ def delete_application(application_id):
         return jsonify({'message': 'Unauthorized access'}), 403
     
     # Delete associated files if they're no longer needed
-    for file_type in ['transcript', 'cv', 'photo']:
-        file_id = getattr(application, file_type)
-        if file_id:
-            file = File.query.get(file_id)
-            if file:
-                # Check if file is used by any other application
-                other_usage = False
-                for attr in ['transcript', 'cv', 'photo']:
-                    if Application.query.filter(
-                        Application.id != application_id,
-                        getattr(Application, attr) == file_id
-                    ).first():
-                        other_usage = True
-                        break
-                
-                if not other_usage:
-                    # Delete file from disk
-                    if os.path.exists(file.file_path):
-                        os.remove(file.file_path)
-                    
-                    # Delete file record
-                    db.session.delete(file)
+    file_slots = ['transcript', 'cv', 'photo']
+    file_ids = {getattr(application, file_type) for file_type in file_slots} - {None}
+    if file_ids:
+        # Files still attached to any other application, in one query; one
+        # SELECT per slot so each can use that column's index
+        still_used = set(db.session.execute(db.union(*[
+            db.select(getattr(Application, attr)).where(
+                getattr(Application, attr).in_(file_ids),
+                Application.id != application_id
+            )
+            for attr in file_slots
+        ])).scalars())
+        
+        for file in File.query.filter(File.id.in_(file_ids - still_used)):
+            # Content in the blob store is removed once its reference count drops to zero
+            if file.blob_id is None and os.path.exists(file.file_path):
+                os.remove(file.file_path)
+            
+            # Delete file record
+            db.session.delete(file)
     
     # Delete application
+    get_search_index().remove_application(application.id)
     db.session.delete(application)
     db.session.commit()
     
     return jsonify({'message': 'Application deleted successfully'}), 200
 
-@app.route('/api/get-all-applications', methods=['GET'])
+@api.route('/api/get-all-applications', methods=['GET'])
 @login_required
 def get_all_applications():
+    """
+    Search applications for the admin dashboard.
+    Filters: q, min_percentage, max_percentage, gender, enrollment_status, university.
+    Sorting: sort_by (id, name, email, percentage). Paging: limit and the
+    next_cursor returned by the previous page. Fields: fields=a,b,c or
+    view=summary|full (default full).
+    """
     # Security check - only admin can view all applications
     if not current_user.is_admin:
         return jsonify({'message': 'Unauthorized access'}), 403
     
-    applications = Application.query.all()
-    return jsonify([app.to_dict() for app in applications]), 200
+    try:
+        fields = parse_fieldset(request.args)
+        last_updated, count = application_list_version(request.args)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    # The validator covers the filtered set as a whole plus the exact query
+    # (page, sort order), so any matching insert, update or delete changes it.
+    # Only the ETag is checked: a delete doesn't move the latest updated_at,
+    # so If-Modified-Since alone can't tell that the list changed.
+    etag = make_etag('applications', last_updated, count, sorted(request.args.items(multi=True)))
+    if is_not_modified(etag):
+        return not_modified_response(etag, last_updated)
+    
+    try:
+        applications, next_cursor = search_applications(request.args, fields)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    return with_validators(jsonify({
+        'applications': [app.to_dict(fields) for app in applications],
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None
+    }), etag, last_updated), 200
+
+@api.route('/api/admin/application-changes', methods=['GET'])
+@login_required
+def get_application_changes():
+    """
+    Change feed for keeping a local copy of all applications in sync.
+    Call without a cursor for the initial copy, then pass back next_cursor to
+    receive only applications changed or deleted since. Keep calling while
+    has_more is true. A 410 means deletions the cursor hadn't reached were
+    pruned; start again without a cursor.
+    """
+    # Security check - only admin can read the change feed
+    if not current_user.is_admin:
+        return jsonify({'message': 'Unauthorized access'}), 403
+    
+    try:
+        changes = get_changes(request.args)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    except CursorExpired as e:
+        return jsonify({'message': str(e)}), 410
+    
+    return jsonify(changes), 200
+
+@api.route('/api/admin/export-applications', methods=['GET'])
+@login_required
+def export_applications():
+    """
+    Stream applications as CSV or NDJSON (format=csv|ndjson).
+    Accepts the same filters as /api/get-all-applications plus a
+    comma-separated `columns` list.
+    """
+    # Security check - only admin can export applications
+    if not current_user.is_admin:
+        return jsonify({'message': 'Unauthorized access'}), 403
+    
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'message': f'format must be one of: {", ".join(EXPORT_FORMATS)}'}), 400
+    
+    try:
+        columns = parse_export_columns(request.args.get('columns'))
+        # Validate the filters up front; errors can't be reported once streaming starts
+        search_args = request.args.to_dict()
+        apply_application_filters(Application.query, search_args)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    filename = f"applications_{datetime.utcnow().strftime('%Y-%m-%d')}.{export_format}"
+    return Response(
+        stream_with_context(generate_export(export_format, search_args, columns)),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+@api.route('/api/admin/report-jobs', methods=['POST'])
+@login_required
+def create_report_job():
+    """
+    Queue a batch PDF report job. The body takes the same filters as
+    /api/get-all-applications, plus an optional list of application_ids.
+    Poll /api/admin/report-jobs/<job_id> for progress.
+    """
+    # Security check - only admin can generate reports
+    if not current_user.is_admin:
+        return jsonify({'message': 'Unauthorized access'}), 403
+    
+    filters = request.get_json(silent=True)
+    if not isinstance(filters, dict):
+        return jsonify({'message': 'Request body must be a JSON object'}), 400
+    
+    try:
+        count = select_applications(filters).count()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    if count == 0:
+        return jsonify({'message': 'No applications match the given filters'}), 400
+    if count > MAX_JOB_APPLICATIONS:
+        return jsonify({'message': f'A report job can cover at most {MAX_JOB_APPLICATIONS} applications'}), 400
+    
+    job = ReportJob(created_by=current_user.id, filters=json.dumps(filters), total=count)
+    db.session.add(job)
+    db.session.commit()
+    
+    report_jobs.submit(job.id)
+    
+    return jsonify(job.to_dict()), 202
+
+@api.route('/api/admin/report-jobs/<job_id>', methods=['GET'])
+@login_required
+def get_report_job(job_id):
+    # Security check - only admin can view report jobs
+    if not current_user.is_admin:
+        return jsonify({'message': 'Unauthorized access'}), 403
+    
+    job = ReportJob.query.get_or_404(job_id)
+    return jsonify(job.to_dict()), 200
+
+@api.route('/api/admin/report-jobs/<job_id>/download', methods=['GET'])
+@login_required
+def download_report_job(job_id):
+    # Security check - only admin can download reports
+    if not current_user.is_admin:
+        return jsonify({'message': 'Unauthorized access'}), 403
+    
+    job = ReportJob.query.get_or_404(job_id)
+    
+    if job.status != 'completed':
+        return jsonify({'message': 'Report job has not completed'}), 409
+    
+    if not job.result_path or not os.path.exists(job.result_path):
+        return jsonify({'message': 'File not found on server'}), 404
+    
+    return send_file(
+        os.path.abspath(job.result_path),
+        as_attachment=True,
+        download_name=f"application_reports_{job.created_at.strftime('%Y-%m-%d')}.zip",
+        mimetype='application/zip'
+    )
+
+@api.route('/api/admin/search-applications', methods=['GET'])
+@login_required
+def search_application_text():
+    """
+    Ranked keyword search over the free-text fields of all applications
+    (statement of purpose, projects, publications, research areas and
+    professional experience). Each result carries an HTML snippet: the
+    application text escaped, with matched terms wrapped in <mark> tags.
+    """
+    # Security check - only admin can search applications
+    if not current_user.is_admin:
+        return jsonify({'message': 'Unauthorized access'}), 403
+    
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'message': 'Search query is required'}), 400
+    
+    limit = min(request.args.get('limit', DEFAULT_RESULT_LIMIT, type=int), MAX_RESULT_LIMIT)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    if limit < 1:
+        return jsonify({'message': 'limit must be positive'}), 400
+    
+    matches = get_search_index().search(query, limit=limit, offset=offset)
+    
+    # Load the matched applications in one query and keep the ranking order
+    applications = {
+        application.id: application
+        for application in load_fields(Application.query, ['first_name', 'last_name', 'email'])
+            .filter(Application.id.in_([m[0] for m in matches])).all()
+    }
+    
+    results = []
+    for application_id, score, snippet in matches:
+        application = applications.get(application_id)
+        if application:
+            results.append({
+                'application_id': application.id,
+                'first_name': application.first_name,
+                'last_name': application.last_name,
+                'email': application.email,
+                'score': score,
+                'snippet': snippet
+            })
+    
+    return jsonify({'query': query, 'results': results}), 200
 
-@app.route('/api/user/profile', methods=['GET'])
+@api.route('/api/user/profile', methods=['GET'])
 @login_required
 def get_user_profile():
     """
@@ -435,31 +938,32 @@ def get_user_profile():
         
         return jsonify(user_data), 200
     except Exception as e:
-        app.logger.error(f"Error fetching user profile: {str(e)}")
+        current_app.logger.error(f"Error fetching user profile: {str(e)}")
         return jsonify({'message': 'Failed to retrieve user profile'}), 500
 
-@app.route('/api/admin/users', methods=['GET'])
+@api.route('/api/admin/users', methods=['GET'])
 @login_required
 def get_all_users():
+    """
+    List users with their application id, one page at a time (limit, cursor).
+    Pass include_application=true to embed an application summary.
+    """
     # Security check - only admin can view all users
     if not current_user.is_admin:
         return jsonify({'message': 'Unauthorized access'}), 403
     
-    users = User.query.all()
-    
-    # For each user, check if they have an application
-    user_data = []
-    for user in users:
-        user_dict = user.to_dict()
-        application = Application.query.filter_by(user_id=user.id).first()
-        user_dict['has_application'] = application is not None
-        if application:
-            user_dict['application_id'] = application.id
-        user_data.append(user_dict)
+    try:
+        users, next_cursor = list_users_with_applications(request.args)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     
-    return jsonify(user_data), 200
+    return jsonify({
+        'users': users,
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None
+    }), 200
 
-@app.route('/api/admin/create-user', methods=['POST'])
+@api.route('/api/admin/create-user', methods=['POST'])
 @login_required
 def create_user():
     # Security check - only admin can create users
@@ -495,7 +999,53 @@ def create_user():
         'user_id': new_user.id
     }), 201
 
-@app.route('/api/admin/delete-user/<int:user_id>', methods=['DELETE'])
+@api.route('/api/admin/import-users', methods=['POST'])
+@login_required
+def import_users_endpoint():
+    """
+    Queue a bulk import of users from an uploaded CSV or JSON file (form
+    field 'file') or a JSON body. Columns: email, password, first_name,
+    last_name, contact_number, is_admin. Poll /api/admin/import-jobs/<job_id>
+    for progress; rows that fail are listed in the job's errors.
+    """
+    # Security check - only admin can create users
+    if not current_user.is_admin:
+        return jsonify({'message': 'Unauthorized access'}), 403
+    
+    try:
+        if 'file' in request.files:
+            upload = request.files['file']
+            records = parse_import_file(upload.filename or '', upload.read())
+        else:
+            records = parse_import_records(request.get_json(silent=True))
+        check_import_size(records)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    job = ImportJob(created_by=current_user.id, total=len(records))
+    db.session.add(job)
+    db.session.commit()
+    
+    import_jobs.submit(job.id, records)
+    
+    return jsonify(job.to_dict()), 202
+
+@api.route('/api/admin/import-jobs/<job_id>', methods=['GET'])
+@login_required
+def get_import_job(job_id):
+    # Security check - only admin can view import jobs
+    if not current_user.is_admin:
+        return jsonify({'message': 'Unauthorized access'}), 403
+    
+    job = ImportJob.query.get_or_404(job_id)
+    fail_stale_import_job(job)
+    
+    result = job.to_dict()
+    if job.status == 'completed':
+        result['message'] = f"Imported {job.created} of {job.total} users"
+    return jsonify(result), 200
+
+@api.route('/api/admin/delete-user/<int:user_id>', methods=['DELETE'])
 @login_required
 def delete_user(user_id):
     # Security check - only admin can delete users
@@ -509,40 +1059,27 @@ def delete_user(user_id):
     user = User.query.get_or_404(user_id)
     
     # Delete user's files and directories
-    user_dir = os.path.join(app.config['UPLOAD_FOLDER'], str(user_id))
+    user_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], str(user_id))
     if os.path.exists(user_dir):
         shutil.rmtree(user_dir)
     
     # User's applications and files will be deleted via cascade
+    for application in user.applications:
+        get_search_index().remove_application(application.id)
     db.session.delete(user)
     db.session.commit()
     
     return jsonify({'message': 'User deleted successfully'}), 200
 
-@app.route('/api/admin/university-report', methods=['GET'])
+@api.route('/api/admin/university-report', methods=['GET'])
 @login_required
 def get_university_report():
     # Security check - only admin can access reports
     if not current_user.is_admin:
         return jsonify({'message': 'Unauthorized access'}), 403
     
-    # Get enrolled students grouped by university
-    enrolled_data = db.session.query(
-        Application.enrolled_university,
-        db.func.count(Application.id).label('count')
-    ).filter(
-        Application.enrollment_status == 'enrolled',
-        Application.enrolled_university != None,
-        Application.enrolled_university != ''
-    ).group_by(Application.enrolled_university).all()
-    
-    # Format report data
-    university_report = [
-        {
-            'university': item[0],
-            'student_count': item[1]
-        } for item in enrolled_data
-    ]
+    # Enrolled students per university, maintained incrementally on every write
+    university_report = university_enrollment_counts()
     
     return jsonify({
         'report_date': '2025-03-22 16:22:40',  # Use the provided date/time
@@ -551,30 +1088,108 @@ def get_university_report():
         'generated_by': 'User'  # Add the username
     }), 200
 
-@app.route('/api/admin/enrollment-statistics', methods=['GET'])
+@api.route('/api/admin/university-funnel', methods=['GET'])
 @login_required
-def get_enrollment_statistics():
-    # Security check - only admin can access statistics
+def get_university_funnel():
+    """
+    Per-university counts of target, applied, accepted and enrolled
+    applications. Pass university=<text> to limit to matching universities.
+    """
+    # Security check - only admin can access reports
     if not current_user.is_admin:
         return jsonify({'message': 'Unauthorized access'}), 403
     
-    # Count applications by enrollment status
-    status_counts = {}
-    for status in ['planning', 'applied', 'accepted', 'enrolled']:
-        count = Application.query.filter_by(enrollment_status=status).count()
-        status_counts[status] = count
+    return jsonify({
+        'universities': university_funnel(request.args.get('university', '').strip())
+    }), 200
+
+@api.route('/api/admin/analytics', methods=['GET'])
+@login_required
+def get_analytics():
+    """
+    Dashboard statistics over the applications matching the filters (same
+    parameters as get-all-applications): summary counts, percentage
+    percentiles and histogram (bucket_width percentage points), gender and
+    status breakdowns, and status by admission year.
+    """
+    # Security check - only admin can access analytics
+    if not current_user.is_admin:
+        return jsonify({'message': 'Unauthorized access'}), 403
+    
+    try:
+        version = application_list_version(request.args)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    # Results are reused until the filtered applications change or the TTL window moves on
+    key = analytics_key(request.args, version, time_window())
+    etag = make_etag('analytics', key)
+    if is_not_modified(etag):
+        return not_modified_response(etag)
+    
+    cache = get_analytics_cache()
+    analytics = cache.get(key)
+    if analytics is None:
+        try:
+            analytics = cohort_analytics(request.args)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+        cache.put(key, analytics)
+    
+    return with_validators(jsonify(analytics), etag), 200
+
+@api.route('/api/admin/shortlist', methods=['GET'])
+@login_required
+def get_shortlist():
+    """
+    The highest-ranked applications by stored score, optionally only those
+    naming a program (program=<name>, matched exactly ignoring case) as
+    their study program, a preferred program or either (source=study|
+    preferred|any). Takes limit and fields=/view= (default summary).
+    """
+    # Security check - only admin can shortlist applicants
+    if not current_user.is_admin:
+        return jsonify({'message': 'Unauthorized access'}), 403
+    
+    try:
+        fields = parse_fieldset(request.args, default_view='summary')
+        source = parse_program_source(request.args.get('source'))
+        limit = parse_page_size(request.args.get('limit'))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    program = request.args.get('program', '').strip()
+    rows = top_applications(program, source, limit, fields)
     
-    # Count application with no enrollment status (legacy data)
-    none_count = Application.query.filter(
-        (Application.enrollment_status == None) | 
-        (Application.enrollment_status == '')
-    ).count()
+    return jsonify({
+        'program': program or None,
+        'source': source or 'any',
+        'weights': current_app.config['RANKING_WEIGHTS'],
+        'applications': [
+            dict(application.to_dict(fields), rank=rank, score=score)
+            for rank, (application, score) in enumerate(rows, start=1)
+        ]
+    }), 200
+
+@api.route('/api/admin/programs', methods=['GET'])
+@login_required
+def get_programs():
+    """Programs named in applications, with study and preferred counts, for choosing a shortlist."""
+    # Security check - only admin can access reports
+    if not current_user.is_admin:
+        return jsonify({'message': 'Unauthorized access'}), 403
     
-    if none_count > 0:
-        status_counts['none'] = none_count
+    return jsonify({'programs': program_counts()}), 200
+
+@api.route('/api/admin/enrollment-statistics', methods=['GET'])
+@login_required
+def get_enrollment_statistics():
+    # Security check - only admin can access statistics
+    if not current_user.is_admin:
+        return jsonify({'message': 'Unauthorized access'}), 403
     
-    # Get total applications
-    total_applications = Application.query.count()
+    # Counts by enrollment status, maintained incrementally on every write
+    total_applications, status_counts = enrollment_statistics()
     
     return jsonify({
         'report_date': '2025-03-22 16:22:40',  # Use the provided date/time
@@ -583,14 +1198,98 @@ def get_enrollment_statistics():
         'generated_by': 'User'  # Add the username
     }), 200
 
+@api.route('/api/admin/statistics/rebuild', methods=['POST'])
+@login_required
+def rebuild_statistics_endpoint():
+    """
+    Recompute the enrollment and university counters from the application
+    table and report any drift between the stored and actual values.
+    """
+    # Security check - only admin can rebuild statistics
+    if not current_user.is_admin:
+        return jsonify({'message': 'Unauthorized access'}), 403
+    
+    drift = rebuild_statistics()
+    
+    return jsonify({
+        'message': 'Statistics rebuilt successfully',
+        'drift': drift
+    }), 200
+
+@api.cli.command('init-db')
+@click.option('--admin-email', default='admin@example.com', envvar='ADMIN_EMAIL', show_default=True,
+              help='Email of the admin created when there are no users yet')
+@click.option('--admin-password', default='admin123', envvar='ADMIN_PASSWORD', show_default=True,
+              help='Password of that admin')
+def init_db_command(admin_email, admin_password):
+    """Create and migrate the schema and seed the first admin. Run once per deployment."""
+    applied, admin = initialize_database(admin_email, admin_password)
+    for name in applied:
+        print(f"Applied {name}")
+    if admin:
+        print(f"Default admin user created with email: {admin_email}")
+    print("Database is up to date")
+
+@api.cli.command('migrate')
+def migrate_command():
+    """Apply pending schema migrations and list their status."""
+    for name in run_migrations():
+        print(f"Applied {name}")
+    for migration in migration_status():
+        print(f"{migration['version']:>4}  {'applied' if migration['applied'] else 'pending':<8} {migration['name']}")
+
+@api.cli.command('backfill-universities')
+def backfill_universities_command():
+    """Rebuild the application-university links from the free-text fields."""
+    count = backfill_application_universities()
+    print(f"Synced university links for {count} applications")
+
+@api.cli.command('rescore-applications')
+def rescore_applications_command():
+    """Recompute every application's ranking score with the current RANKING_WEIGHTS."""
+    count = rescore_applications()
+    print(f"Updated the ranking score of {count} applications")
+
+@api.cli.command('cleanup-uploads')
+def cleanup_uploads_command():
+    """Remove chunked uploads that were started but never completed."""
+    count = expire_stale_uploads(upload_expiry(current_app))
+    print(f"Removed {count} expired uploads")
+
+@api.cli.command('prune-change-feed')
+def prune_change_feed_command():
+    """Remove deletion records older than CHANGE_FEED_RETENTION_DAYS from the change feed."""
+    count = prune_tombstones(timedelta(days=current_app.config['CHANGE_FEED_RETENTION_DAYS']))
+    print(f"Removed {count} deletion records")
+
+@api.cli.command('dedupe-files')
+def dedupe_files_command():
+    """Move files uploaded before the blob store into it and drop unreferenced blobs."""
+    count = migrate_legacy_files()
+    removed = collect_unreferenced_blobs()
+    print(f"Moved {count} files into the blob store, removed {removed} unreferenced blobs")
+
+@api.route('/metrics', methods=['GET'])
+def metrics():
+    """Request and SQL metrics for this process in Prometheus text format."""
+    token = current_app.config['METRICS_TOKEN']
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return jsonify({'message': 'Unauthorized access'}), 403
+    
+    return current_app.extensions['request_metrics'].response()
+
 # Error handlers
-@app.errorhandler(404)
+@api.app_errorhandler(404)
 def not_found(error):
     return jsonify({'message': 'Resource not found'}), 404
 
-@app.errorhandler(500)
+@api.app_errorhandler(500)
 def server_error(error):
     return jsonify({'message': 'Internal server error'}), 500
 
 if __name__ == '__main__':
+    app = create_app()
+    # The development server sets up the database itself; deployments run `flask init-db`
+    with app.app_context():
+        initialize_database('admin@example.com', 'admin123')
     app.run(debug=True)
\ No newline at end of file
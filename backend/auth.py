@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+
+from flask_login import UserMixin
+from sqlalchemy import event
+from werkzeug.security import check_password_hash
+
+from models import db, User
+
+# User columns kept for the logged-in user between requests
+SESSION_USER_FIELDS = ['id', 'email', 'first_name', 'last_name', 'is_admin']
+
+# Requests that may use a cached copy of the logged-in user
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class PasswordCheckBusy(Exception):
+    """Raised when too many password checks are queued or one doesn't finish in time."""
+
+
+class PasswordVerifier:
+    """
+    Runs password hash checks on a small, bounded thread pool. The KDF in
+    hashlib releases the GIL, so at most `max_workers` cores are spent on
+    hashing while other requests keep running. At most `max_pending` checks
+    are queued; further attempts wait for a slot and are turned away if none
+    frees up within `timeout` seconds.
+    """
+
+    def __init__(self, max_workers=None, max_pending=None, timeout=10):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.slots = threading.BoundedSemaphore(max_pending or self.max_workers * 4)
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='password-check')
+
+    def verify(self, password_hash, password):
+        # Waiting for a slot costs no CPU; give up only under sustained overload
+        if not self.slots.acquire(timeout=self.timeout):
+            raise PasswordCheckBusy()
+        # The slot is held until the check finishes, even if the caller stops waiting
+        future = self.executor.submit(check_password_hash, password_hash, password)
+        future.add_done_callback(lambda future: self.slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FuturesTimeoutError:
+            raise PasswordCheckBusy()
+
+
+class SessionUser(UserMixin):
+    """The columns of a User that requests need, detached from any session."""
+
+    def __init__(self, id, email, first_name, last_name, is_admin):
+        self.id = id
+        self.email = email
+        self.first_name = first_name
+        self.last_name = last_name
+        self.is_admin = bool(is_admin)
+
+
+class SessionUserCache:
+    """
+    Small LRU cache of SessionUser by id with a TTL. Changes committed in this
+    process invalidate entries immediately. Other processes can't reach the
+    cache, so callers pass refresh=True where acting on a stale copy isn't
+    acceptable; elsewhere the TTL bounds how long such changes go unnoticed.
+    """
+
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, user_id, refresh=False):
+        """The user with `user_id`, or None if they no longer exist. `refresh` skips the cached copy."""
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry and entry[0] > now and not refresh:
+                self.entries.move_to_end(user_id)
+                return entry[1]
+
+        row = db.session.query(*[getattr(User, field) for field in SESSION_USER_FIELDS]) \
+            .filter(User.id == user_id).first()
+        if row is None:
+            self.invalidate(user_id)
+            return None
+
+        user = SessionUser(*row)
+        with self.lock:
+            self.entries[user_id] = (now + self.ttl, user)
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+        return user
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def listen_for_user_changes(self, session):
+        """Drop cached users that are updated or deleted through `session`."""
+        def collect(session, flush_context, instances):
+            changed = session.info.setdefault('changed_user_ids', set())
+            for obj in list(session.dirty) + list(session.deleted):
+                if isinstance(obj, User) and obj.id is not None:
+                    changed.add(obj.id)
+
+        def invalidate_changed(session):
+            for user_id in session.info.pop('changed_user_ids', ()):
+                self.invalidate(user_id)
+
+        event.listen(session, 'before_flush', collect)
+        event.listen(session, 'after_commit', invalidate_changed)
+        event.listen(session, 'after_soft_rollback', lambda session, previous_transaction: session.info.pop('changed_user_ids', None))
@@ -0,0 +1,284 @@
+"""
+Seeded synthetic data for benchmarks: applicant users with an application
+each, university links, and transcript/CV files backed by a small set of
+shared blobs. The same seed and size always produce the same rows.
+
+Rows are bulk inserted in batches, bypassing the session events that keep
+derived data in sync, so the statistics counters, blob reference counts and
+search index are rebuilt once at the end instead. Ranking scores and
+program links are computed as the rows are generated, and change feed
+numbers are reserved a batch at a time.
+"""
+import hashlib
+import os
+import random
+from datetime import datetime, timedelta
+
+from werkzeug.security import generate_password_hash
+
+from blobs import blob_path
+from changes import reserve_change_numbers
+from models import db, User, Application, File, Blob, ApplicationUniversity, ApplicationProgram
+from ranking import application_score, ranking_weights, wanted_programs
+from search import get_search_index
+from stats import rebuild_statistics
+from universities import UNIVERSITY_STATUS_FIELDS, get_or_create_universities, split_universities, university_key
+
+MIN_APPLICANTS = 1000
+MAX_APPLICANTS = 500000
+
+# Applicants inserted per transaction
+BATCH_SIZE = 5000
+
+# Every synthetic user shares this password, hashed once
+SYNTHETIC_PASSWORD = 'benchmark'
+
+# Distinct file contents; File rows share them the way re-uploaded documents do
+BLOB_VARIANTS = 16
+BLOB_SIZE = 64 * 1024
+
+FILE_TYPES = ['transcript', 'cv']
+
+FIRST_NAMES = [
+    'Aarav', 'Aisha', 'Anil', 'Bikash', 'Chen', 'Deepa', 'Elena', 'Farhan', 'Gita', 'Hari',
+    'Ishaan', 'Jamie', 'Kiran', 'Laxmi', 'Mohan', 'Nisha', 'Omar', 'Priya', 'Rajesh', 'Sita',
+    'Tenzin', 'Uma', 'Vikram', 'Wei', 'Yuki', 'Zara'
+]
+
+LAST_NAMES = [
+    'Acharya', 'Bhattarai', 'Chaudhary', 'Dahal', 'Gurung', 'Karki', 'Khan', 'Lama', 'Magar',
+    'Nguyen', 'Pandey', 'Rai', 'Sharma', 'Shrestha', 'Smith', 'Tamang', 'Thapa', 'Wang'
+]
+
+UNIVERSITY_CITIES = [
+    'Boston', 'Toronto', 'Munich', 'Zurich', 'Melbourne', 'Sydney', 'Tokyo', 'Seoul', 'Delft',
+    'Helsinki', 'Oslo', 'Vienna', 'Edinburgh', 'Manchester', 'Austin', 'Chicago', 'Vancouver',
+    'Singapore', 'Hong Kong', 'Copenhagen'
+]
+
+UNIVERSITY_PATTERNS = ['University of {}', '{} Institute of Technology', '{} State University', 'Technical University of {}']
+
+# 80 universities: every pattern applied to every city
+UNIVERSITIES = [pattern.format(city) for city in UNIVERSITY_CITIES for pattern in UNIVERSITY_PATTERNS]
+
+PROGRAMS = [
+    'Computer Science', 'Data Science', 'Electrical Engineering', 'Mechanical Engineering',
+    'Civil Engineering', 'Economics', 'Public Health', 'Physics', 'Mathematics', 'Business Analytics'
+]
+
+GENDERS = ['Male', 'Female', 'Other']
+
+# The application form's choices
+CLASS_RANKINGS = ['Top 5%', 'Top 10%', 'Top 20%', 'Top 30%', 'Top 40%']
+
+ENGLISH_LEVELS = ['Beginner', 'Intermediate', 'Advanced', 'Native/Fluent']
+
+SCHOLARSHIP_STATUSES = ['none', 'applied', 'partial', 'full']
+
+ENROLLMENT_WEIGHTS = {'planning': 40, 'applied': 30, 'accepted': 20, 'enrolled': 10}
+
+WORDS = (
+    'research project machine learning data analysis system design robotics energy '
+    'sustainability network security cloud computing statistics modelling community '
+    'leadership volunteer internship publication conference thesis laboratory team '
+    'software hardware optimization algorithm experiment survey field study health'
+).split()
+
+
+def paragraph(rng, min_words, max_words):
+    words = rng.choices(WORDS, k=rng.randint(min_words, max_words))
+    return ' '.join(words).capitalize() + '.'
+
+
+def application_fields(rng, first_name, last_name, email, now):
+    """Column values for one synthetic application (without ids or files)."""
+    status = rng.choices(list(ENROLLMENT_WEIGHTS), weights=list(ENROLLMENT_WEIGHTS.values()))[0]
+    targets = rng.sample(UNIVERSITIES, rng.randint(2, 6))
+    applied = targets[:rng.randint(1, len(targets))] if status != 'planning' else []
+    accepted = applied[:rng.randint(1, len(applied))] if status in ('accepted', 'enrolled') else []
+    created_at = now - timedelta(minutes=rng.randint(60, 2 * 365 * 24 * 60))
+    return {
+        'first_name': first_name,
+        'last_name': last_name,
+        'email': email,
+        'contact_number': f'98{rng.randint(10000000, 99999999)}',
+        'gender': rng.choice(GENDERS),
+        'final_percentage': round(rng.uniform(50, 99), 2),
+        'tentative_ranking': rng.choice(CLASS_RANKINGS),
+        'final_year_project': paragraph(rng, 10, 40),
+        'other_projects': '\n'.join(paragraph(rng, 5, 30) for _ in range(rng.randint(0, 3))),
+        'publications': '\n'.join(paragraph(rng, 5, 20) for _ in range(rng.randint(0, 4))),
+        'target_universities': ', '.join(targets),
+        'applied_universities': ', '.join(applied),
+        'accepted_universities': ', '.join(accepted),
+        'enrollment_status': status,
+        'enrolled_university': accepted[0] if status == 'enrolled' else None,
+        'study_program': rng.choice(PROGRAMS),
+        'admission_year': rng.randint(now.year, now.year + 2),
+        'scholarship_status': rng.choice(SCHOLARSHIP_STATUSES),
+        'extracurricular': paragraph(rng, 5, 30),
+        'professional_experience': paragraph(rng, 0, 40),
+        'strong_points': paragraph(rng, 5, 20),
+        'weak_points': paragraph(rng, 5, 20),
+        'preferred_programs': ', '.join(rng.sample(PROGRAMS, 2)),
+        'references': paragraph(rng, 5, 15),
+        'statement_of_purpose': paragraph(rng, 150, 600),
+        'intended_research_areas': paragraph(rng, 5, 15),
+        'english_proficiency': rng.choice(ENGLISH_LEVELS),
+        'leadership_experience': paragraph(rng, 0, 20),
+        'availability_to_start': f'Fall {rng.randint(now.year, now.year + 2)}',
+        'additional_certifications': paragraph(rng, 0, 10),
+        'created_at': created_at,
+        'updated_at': created_at + timedelta(minutes=rng.randint(0, 30 * 24 * 60))
+    }
+
+
+def next_id(model):
+    return (db.session.query(db.func.max(model.id)).scalar() or 0) + 1
+
+
+def insert_rows(model, rows):
+    if rows:
+        db.session.execute(db.insert(model), rows)
+
+
+def create_blobs(rng):
+    """Write BLOB_VARIANTS placeholder documents to the blob store and return their Blob rows."""
+    blobs = []
+    for _ in range(BLOB_VARIANTS):
+        content = b'%PDF-1.4\n' + rng.randbytes(BLOB_SIZE)
+        digest = hashlib.sha256(content).hexdigest()
+        blob = Blob.query.filter_by(sha256=digest).first()
+        if blob is not None:
+            blobs.append(blob)
+            continue
+        blob = Blob(sha256=digest, path=blob_path(digest), size=len(content), ref_count=0)
+        os.makedirs(os.path.dirname(blob.path), exist_ok=True)
+        with open(blob.path, 'wb') as handle:
+            handle.write(content)
+        db.session.add(blob)
+        blobs.append(blob)
+    db.session.commit()
+    return blobs
+
+
+def create_users(count, seed=0, prefix='bench'):
+    """Create `count` users without applications. Returns their ids."""
+    rng = random.Random(seed)
+    password_hash = generate_password_hash(SYNTHETIC_PASSWORD)
+    first_id = next_id(User)
+    now = datetime.utcnow()
+    rows = [{
+        'id': first_id + i,
+        'email': f'{prefix}{first_id + i}@example.com',
+        'password': password_hash,
+        'first_name': rng.choice(FIRST_NAMES),
+        'last_name': rng.choice(LAST_NAMES),
+        'created_at': now
+    } for i in range(count)]
+    for start in range(0, len(rows), BATCH_SIZE):
+        insert_rows(User, rows[start:start + BATCH_SIZE])
+        db.session.commit()
+    return [row['id'] for row in rows]
+
+
+def generate_dataset(applicants, seed=42, files_per_applicant=2, progress=None):
+    """
+    Add `applicants` users, each with an application, university links and
+    `files_per_applicant` files (0-2), then rebuild the derived data.
+    Must run inside an app context. Returns a summary dict.
+    """
+    if not MIN_APPLICANTS <= applicants <= MAX_APPLICANTS:
+        raise ValueError(f'applicants must be between {MIN_APPLICANTS} and {MAX_APPLICANTS}')
+    if not 0 <= files_per_applicant <= len(FILE_TYPES):
+        raise ValueError(f'files_per_applicant must be between 0 and {len(FILE_TYPES)}')
+
+    rng = random.Random(seed)
+    now = datetime(2025, 1, 1)  # Fixed so the same seed gives the same rows
+    weights = ranking_weights()
+    password_hash = generate_password_hash(SYNTHETIC_PASSWORD)
+    universities = get_or_create_universities(UNIVERSITIES)
+    db.session.commit()
+    university_ids = {key: university.id for key, university in universities.items()}
+    blobs = create_blobs(rng) if files_per_applicant else []
+
+    user_id = next_id(User)
+    application_id = next_id(Application)
+    file_id = next_id(File)
+    first_user_id = user_id
+
+    for start in range(0, applicants, BATCH_SIZE):
+        users, applications, files, links, programs = [], [], [], [], []
+        for _ in range(min(BATCH_SIZE, applicants - start)):
+            first_name = rng.choice(FIRST_NAMES)
+            last_name = rng.choice(LAST_NAMES)
+            email = f'applicant{user_id}@example.com'
+            fields = application_fields(rng, first_name, last_name, email, now)
+            users.append({
+                'id': user_id,
+                'email': email,
+                'password': password_hash,
+                'first_name': first_name,
+                'last_name': last_name,
+                'contact_number': fields['contact_number'],
+                'created_at': fields['created_at']
+            })
+
+            for file_type in FILE_TYPES[:files_per_applicant]:
+                blob = rng.choice(blobs)
+                files.append({
+                    'id': file_id,
+                    'user_id': user_id,
+                    'original_name': f'{file_type}.pdf',
+                    'file_path': blob.path,
+                    'file_type': file_type,
+                    'mime_type': 'application/pdf',
+                    'file_size': blob.size,
+                    'upload_date': fields['created_at'],
+                    'blob_id': blob.id
+                })
+                fields[file_type] = file_id
+                file_id += 1
+
+            for status, field in UNIVERSITY_STATUS_FIELDS.items():
+                for name in split_universities(fields[field]):
+                    links.append({
+                        'application_id': application_id,
+                        'university_id': university_ids[university_key(name)],
+                        'status': status
+                    })
+
+            fields['ranking_score'] = application_score(fields, weights)
+            for key, attributes in wanted_programs(fields).items():
+                programs.append(dict(attributes, application_id=application_id, program_key=key, score=fields['ranking_score']))
+
+            applications.append(dict(fields, id=application_id, user_id=user_id))
+            user_id += 1
+            application_id += 1
+
+        first_change = reserve_change_numbers(db.session, len(applications))
+        for offset, application in enumerate(applications):
+            application['change_seq'] = first_change + offset
+
+        insert_rows(User, users)
+        insert_rows(File, files)
+        insert_rows(Application, applications)
+        insert_rows(ApplicationUniversity, links)
+        insert_rows(ApplicationProgram, programs)
+        db.session.commit()
+        if progress:
+            progress(start + len(users), applicants)
+
+    for blob in blobs:
+        blob.ref_count = File.query.filter_by(blob_id=blob.id).count()
+    db.session.commit()
+    rebuild_statistics()
+    get_search_index().rebuild()
+
+    return {
+        'seed': seed,
+        'applicants': applicants,
+        'first_user_id': first_user_id,
+        'files': applicants * files_per_applicant,
+        'universities': len(university_ids)
+    }
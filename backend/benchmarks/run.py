@@ -0,0 +1,321 @@
+"""
+Load-test harness: seeds a fresh database with synthetic applicants, drives
+the real Flask endpoints through the test client and reports p50/p95/p99
+latency, throughput and peak memory per endpoint. Results are written as
+JSON so runs can be compared.
+
+Run from the backend directory:
+
+    python -m benchmarks.run --applicants 10000 --requests 200 --output results.json
+
+By default the database and uploads live in a temporary directory that is
+removed afterwards; pass --database-url to benchmark another database (it
+must be empty or disposable, since synthetic rows are added to it).
+"""
+import argparse
+import io
+import itertools
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+from benchmarks.datagen import FIRST_NAMES, LAST_NAMES, application_fields, generate_dataset, create_users
+from models import db, User, Application
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCHMARK_DIR)
+
+# Run in a fresh interpreter: import the app, build it, serve one request.
+# Statements and connections during boot should both be zero.
+COLD_START_SCRIPT = """
+import json, time
+started = time.perf_counter()
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+statements, connections = [], []
+event.listen(Engine, 'before_cursor_execute', lambda *args: statements.append(1))
+event.listen(Pool, 'connect', lambda *args: connections.append(1))
+import app
+imported = time.perf_counter()
+application = app.create_app()
+created = time.perf_counter()
+boot = (len(statements), len(connections))
+application.test_client().get('/api/check-auth')
+served = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'first_request_ms': (served - created) * 1000,
+    'boot_statements': boot[0],
+    'boot_connections': boot[1]
+}))
+"""
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a sorted list."""
+    if not values:
+        return None
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+
+def log_in(client, user_id):
+    """Log a test client in by writing the Flask-Login session directly, skipping the password check."""
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+
+
+def build_scenarios(context, upload_size):
+    """
+    Return (name, request_for, expected_status) tuples. request_for(i)
+    returns the user to log in as and the test client request arguments
+    for the i-th request of the scenario.
+    """
+    admin_id = context['admin_id']
+    applicants = context['applicant_ids']
+    new_users = context['new_user_ids']
+    applications = context['application_ids']
+
+    def get(path):
+        return lambda i: (admin_id, {'method': 'GET', 'path': path})
+
+    def submit(i):
+        rng = random.Random(i)
+        fields = application_fields(rng, rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), f'new{i}@example.com', datetime.utcnow())
+        body = {key: value for key, value in fields.items() if key not in ('created_at', 'updated_at')}
+        return new_users[i], {'method': 'POST', 'path': '/api/submit-application', 'json': body}
+
+    def update(i):
+        # Every application write takes the next change sequence number, so
+        # with --concurrency this measures how far the counter row serializes writers
+        rng = random.Random(i)
+        return admin_id, {'method': 'PUT', 'path': f'/api/update-application/{rng.choice(applications)}', 'json': {'middle_name': rng.choice(FIRST_NAMES)}}
+
+    def upload(i):
+        rng = random.Random(i)
+        # Random content so every upload writes a new blob instead of deduplicating
+        content = b'%PDF-1.4\n' + rng.randbytes(upload_size)
+        return rng.choice(applicants), {
+            'method': 'POST',
+            'path': '/api/upload-file',
+            'data': {'file': (io.BytesIO(content), 'transcript.pdf'), 'type': 'transcript'},
+            'content_type': 'multipart/form-data'
+        }
+
+    return [
+        ('get_all_applications', get('/api/get-all-applications'), 200),
+        ('get_all_applications_summary', get('/api/get-all-applications?view=summary&sort_by=percentage'), 200),
+        ('get_all_users', get('/api/admin/users?include_application=true'), 200),
+        ('university_report', get('/api/admin/university-report'), 200),
+        ('enrollment_statistics', get('/api/admin/enrollment-statistics'), 200),
+        ('analytics', get('/api/admin/analytics?gender=Female'), 200),
+        ('shortlist', get('/api/admin/shortlist?limit=20'), 200),
+        ('program_shortlist', get('/api/admin/shortlist?program=Computer%20Science&source=preferred&limit=20'), 200),
+        ('submit_application', submit, 201),
+        ('update_application', update, 200),
+        ('upload_file', upload, 201)
+    ]
+
+
+def run_scenario(app, request_for, expected_status, args):
+    """Time one scenario; returns its result dict."""
+    counter = itertools.count()
+    counter_lock = threading.Lock()
+    local = threading.local()
+
+    def send():
+        with counter_lock:
+            i = next(counter)
+        user_id, kwargs = request_for(i)
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = app.test_client()
+            local.user_id = None
+        if local.user_id != user_id:
+            log_in(client, user_id)
+            local.user_id = user_id
+        start = time.perf_counter()
+        response = client.open(**kwargs)
+        elapsed = time.perf_counter() - start
+        response.close()
+        return elapsed, response.status_code == expected_status
+
+    for _ in range(args.warmup):
+        send()
+
+    # Peak Python heap allocated while serving a request, over a few requests
+    peak_memory = 0
+    tracemalloc.start()
+    try:
+        for _ in range(args.memory_requests):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            send()
+            peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        outcomes = list(executor.map(lambda _: send(), range(args.requests)))
+    wall = time.perf_counter() - start
+
+    latencies = sorted(elapsed * 1000 for elapsed, ok in outcomes)
+    return {
+        'requests': len(outcomes),
+        'errors': sum(1 for elapsed, ok in outcomes if not ok),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(sum(latencies) / len(latencies), 3),
+        'max_ms': round(latencies[-1], 3),
+        'throughput_rps': round(len(outcomes) / wall, 2),
+        'peak_memory_bytes': peak_memory
+    }
+
+
+def measure_cold_start(runs):
+    """Median import, create_app() and first-request times over `runs` fresh interpreters."""
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', COLD_START_SCRIPT], cwd=BACKEND_DIR, env=os.environ,
+            capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        key: round(sorted(sample[key] for sample in samples)[len(samples) // 2], 3)
+        for key in samples[0]
+    }
+
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=BENCHMARK_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark the API against a seeded synthetic dataset.')
+    parser.add_argument('--applicants', type=int, default=1000, help='Synthetic applicants to create (1000-500000)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--files-per-applicant', type=int, default=2)
+    parser.add_argument('--requests', type=int, default=100, help='Timed requests per scenario')
+    parser.add_argument('--warmup', type=int, default=5, help='Untimed requests per scenario before timing')
+    parser.add_argument('--memory-requests', type=int, default=3, help='Requests traced for peak memory per scenario')
+    parser.add_argument('--concurrency', type=int, default=1, help='Threads sending requests at once')
+    parser.add_argument('--upload-size', type=int, default=100 * 1024, help='Bytes per uploaded file')
+    parser.add_argument('--cold-start-runs', type=int, default=3, help='Fresh interpreters started to time app boot (0 to skip)')
+    parser.add_argument('--scenarios', help='Comma-separated scenario names (default: all)')
+    parser.add_argument('--database-url', help='Benchmark this database instead of a temporary SQLite file')
+    parser.add_argument('--output', default='benchmark-results.json')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    output = os.path.abspath(args.output)
+    workdir = tempfile.mkdtemp(prefix='gradpath-bench-')
+
+    # The app reads its configuration at import time, and keeps uploads,
+    # reports and thumbnails relative to the working directory
+    os.environ['DATABASE_URL'] = args.database_url or f"sqlite:///{os.path.join(workdir, 'benchmark.db')}"
+    sys.path.insert(0, BACKEND_DIR)
+    os.chdir(workdir)
+    try:
+        from app import create_app, initialize_database
+
+        app = create_app()
+        with app.app_context():
+            started = time.perf_counter()
+            initialize_database('admin@example.com', 'admin123')
+            dataset = generate_dataset(
+                args.applicants, args.seed, args.files_per_applicant,
+                progress=lambda done, total: print(f'\rSeeding {done}/{total}', end='', flush=True)
+            )
+            print()
+            spare = args.warmup + args.memory_requests + args.requests
+            context = {
+                'admin_id': User.query.filter_by(is_admin=True).order_by(User.id).first().id,
+                'applicant_ids': list(range(dataset['first_user_id'], dataset['first_user_id'] + args.applicants)),
+                'new_user_ids': create_users(spare, args.seed),
+                'application_ids': db.session.scalars(db.select(Application.id).order_by(Application.id).limit(spare)).all()
+            }
+            dataset['seed_seconds'] = round(time.perf_counter() - started, 2)
+            dialect = db.engine.dialect.name
+
+        scenarios = build_scenarios(context, args.upload_size)
+        if args.scenarios:
+            wanted = [name.strip() for name in args.scenarios.split(',')]
+            unknown = set(wanted) - {name for name, request_for, expected in scenarios}
+            if unknown:
+                raise SystemExit(f'Unknown scenarios: {", ".join(sorted(unknown))}')
+            scenarios = [scenario for scenario in scenarios if scenario[0] in wanted]
+
+        cold_start = measure_cold_start(args.cold_start_runs) if args.cold_start_runs else None
+        if cold_start:
+            print(f"Cold start: import {cold_start['import_ms']:.0f} ms, create_app {cold_start['create_app_ms']:.1f} ms, "
+                  f"first request {cold_start['first_request_ms']:.1f} ms, "
+                  f"{cold_start['boot_statements']} SQL statements during boot")
+
+        results = {}
+        print(f'{"scenario":<30}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"req/s":>10}{"peak KiB":>10}{"errors":>8}')
+        for name, request_for, expected_status in scenarios:
+            result = run_scenario(app, request_for, expected_status, args)
+            results[name] = result
+            print(f'{name:<30}{result["p50_ms"]:>10.2f}{result["p95_ms"]:>10.2f}{result["p99_ms"]:>10.2f}'
+                  f'{result["throughput_rps"]:>10.1f}{result["peak_memory_bytes"] / 1024:>10.0f}{result["errors"]:>8}')
+
+        report = {
+            'run': {
+                'timestamp': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+                'git_commit': git_commit(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'database': dialect,
+                'settings': {key: value for key, value in vars(args).items() if key not in ('output', 'database_url')}
+            },
+            'dataset': dataset,
+            'cold_start': cold_start,
+            'results': results,
+            'peak_rss_bytes': peak_rss_bytes()
+        }
+        with open(output, 'w') as handle:
+            json.dump(report, handle, indent=2)
+        print(f'Results written to {output}')
+    finally:
+        os.chdir(BACKEND_DIR)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
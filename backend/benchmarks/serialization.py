@@ -0,0 +1,100 @@
+"""
+Per-row serialization cost of Application, User and File, comparing the
+previous approach (getattr loop, strftime for datetimes, standard library
+json with sorted keys) against the compiled to_dict() serializers encoded
+by FastJSONProvider.
+
+Run from the backend directory:
+
+    python -m benchmarks.serialization [--rows 2000] [--repeat 5]
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask
+
+from jsonprovider import FastJSONProvider, orjson
+from models import Application, User, File, APPLICATION_FIELDS
+
+USER_FIELDS = ['id', 'email', 'is_admin', 'first_name', 'last_name', 'contact_number', 'created_at']
+FILE_FIELDS = ['id', 'user_id', 'original_name', 'file_type', 'mime_type', 'file_size', 'upload_date']
+
+
+def legacy_to_dict(obj, fields):
+    data = {}
+    for field in fields:
+        value = getattr(obj, field)
+        data[field] = value.strftime('%Y-%m-%d %H:%M:%S') if isinstance(value, datetime) else value
+    return data
+
+
+def legacy_dumps(rows, fields):
+    return json.dumps([legacy_to_dict(row, fields) for row in rows], sort_keys=True).encode('utf-8')
+
+
+def fast_dumps(provider):
+    def dumps(rows, fields):
+        return provider.response([row.to_dict() for row in rows]).get_data()
+    return dumps
+
+
+def loaded(model, fields, **values):
+    """An instance with every column set, as rows loaded from the database are."""
+    return model(**dict(dict.fromkeys(fields), **values))
+
+
+def make_rows(rows):
+    now = datetime.utcnow()
+    applications, users, files = [], [], []
+    for i in range(rows):
+        stamp = now - timedelta(minutes=i)
+        applications.append(loaded(
+            Application, APPLICATION_FIELDS, id=i, user_id=i, first_name=f'First{i}', last_name=f'Last{i}', email=f'student{i}@example.com',
+            final_percentage=60 + i % 40, tentative_ranking=str(i % 100), enrollment_status='applied',
+            enrolled_university=None, target_universities='MIT, Stanford, ETH Zurich',
+            statement_of_purpose='Lorem ipsum dolor sit amet. ' * 20, created_at=stamp, updated_at=stamp
+        ))
+        users.append(loaded(
+            User, USER_FIELDS, id=i, email=f'student{i}@example.com', is_admin=False, first_name=f'First{i}',
+            last_name=f'Last{i}', contact_number='+1 555 0100', created_at=stamp
+        ))
+        files.append(loaded(
+            File, FILE_FIELDS, id=i, user_id=i, original_name=f'transcript_{i}.pdf', file_type='transcript',
+            mime_type='application/pdf', file_size=123456, upload_date=stamp
+        ))
+    return [('Application', applications, APPLICATION_FIELDS), ('User', users, USER_FIELDS), ('File', files, FILE_FIELDS)]
+
+
+def per_row_us(dumps, rows, fields, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        dumps(rows, fields)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(rows) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    provider = FastJSONProvider(app)
+    encoder = 'orjson' if orjson is not None else 'json (orjson not installed)'
+
+    with app.app_context():
+        print(f'{args.rows} rows, best of {args.repeat}; encoder: {encoder}')
+        print(f'{"model":<12}{"before us/row":>15}{"after us/row":>15}{"speedup":>10}')
+        for name, rows, fields in make_rows(args.rows):
+            before = per_row_us(legacy_dumps, rows, fields, args.repeat)
+            after = per_row_us(fast_dumps(provider), rows, fields, args.repeat)
+            print(f'{name:<12}{before:>15.2f}{after:>15.2f}{before / after:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
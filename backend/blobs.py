@@ -0,0 +1,230 @@
+import hashlib
+import os
+from collections import Counter
+
+from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import IntegrityError
+
+from models import db, Blob, File
+
+READ_BUFFER_SIZE = 64 * 1024
+
+
+def hash_file(path):
+    """SHA-256 hex digest of a file, read in small buffers."""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for data in iter(lambda: f.read(READ_BUFFER_SIZE), b''):
+            hasher.update(data)
+    return hasher.hexdigest()
+
+
+def blob_path(digest):
+    """Sharded location of a blob: uploads/blobs/ab/cd/abcd..."""
+    return os.path.join(current_app.config['UPLOAD_FOLDER'], 'blobs', digest[:2], digest[2:4], digest)
+
+
+def claim_blob(blob):
+    """
+    Take a reference on an existing blob in the current transaction so that
+    collect_unreferenced_blobs can't delete it before the File pointing at
+    it is flushed; apply_blob_deltas then counts that File against the
+    claim. Returns False if the blob row was deleted in the meantime.
+    """
+    table = Blob.__table__
+    result = db.session.execute(
+        table.update().where(table.c.id == blob.id, table.c.ref_count >= 0).values(ref_count=table.c.ref_count + 1)
+    )
+    if not result.rowcount:
+        return False
+    db.session.expire(blob, ['ref_count'])
+    db.session.info.setdefault('claimed_blobs', Counter())[blob.id] += 1
+    return True
+
+
+def store_blob(source_path, expected_sha256=None):
+    """
+    Move the file at `source_path` into the blob store and return its Blob.
+    The content is always hashed here, so bytes are only ever filed under
+    their own digest; ValueError is raised, leaving the source in place,
+    if they don't match `expected_sha256`. When identical content is
+    already stored the source file is removed and the existing blob is
+    reused. Runs inside the caller's transaction, which takes a reference
+    on the blob straight away; the File pointing at it must be added in
+    the same transaction.
+    """
+    digest = hash_file(source_path)
+    if expected_sha256 and expected_sha256.lower() != digest:
+        raise ValueError('Checksum mismatch')
+
+    blob = Blob.query.filter_by(sha256=digest).first()
+    if blob is not None and not claim_blob(blob):
+        # Removed by collect_unreferenced_blobs since it was looked up
+        db.session.expunge(blob)
+        blob = None
+
+    while blob is None:
+        path = blob_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            with db.session.begin_nested():
+                blob = Blob(sha256=digest, path=path, size=os.path.getsize(source_path), ref_count=0)
+                db.session.add(blob)
+        except IntegrityError:
+            # Stored by a concurrent request in the meantime
+            blob = Blob.query.filter_by(sha256=digest).first()
+            if blob is not None and not claim_blob(blob):
+                db.session.expunge(blob)
+                blob = None
+        else:
+            claim_blob(blob)
+
+    if os.path.exists(blob.path):
+        os.remove(source_path)
+    else:
+        os.replace(source_path, blob.path)
+    return blob
+
+
+def create_file_record(user_id, source_path, original_name, file_type, mime_type, expected_sha256=None):
+    """
+    Store an uploaded file's content as a blob and return a new (unsaved)
+    File pointing at it. Raises ValueError if the content doesn't match
+    `expected_sha256`.
+    """
+    blob = store_blob(source_path, expected_sha256)
+    new_file = File(
+        user_id=user_id,
+        original_name=original_name,
+        file_path=blob.path,
+        file_type=file_type,
+        mime_type=mime_type,
+        file_size=blob.size,
+        blob=blob
+    )
+    db.session.add(new_file)
+    return new_file
+
+
+def old_blob(file):
+    history = inspect(file).attrs.blob.history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return file.blob
+
+
+def collect_blob_deltas(session, flush_context, instances):
+    """before_flush hook: count File rows gained and lost per blob."""
+    deltas = session.info.setdefault('blob_deltas', Counter())
+
+    for obj in session.new:
+        if isinstance(obj, File) and obj.blob is not None:
+            deltas[obj.blob] += 1
+
+    for obj in session.deleted:
+        if isinstance(obj, File) and old_blob(obj) is not None:
+            deltas[old_blob(obj)] -= 1
+
+    for obj in session.dirty:
+        if isinstance(obj, File) and obj not in session.deleted:
+            history = inspect(obj).attrs.blob.history
+            if not history.has_changes():
+                continue
+            for blob in history.deleted:
+                if blob is not None:
+                    deltas[blob] -= 1
+            for blob in history.added:
+                if blob is not None:
+                    deltas[blob] += 1
+
+
+def apply_blob_deltas(session, flush_context):
+    """
+    after_flush hook: adjust reference counts with atomic updates. New
+    references to a blob claimed by store_blob use up the claim instead.
+    """
+    deltas = session.info.pop('blob_deltas', None)
+    if not deltas:
+        return
+
+    claims = session.info.get('claimed_blobs', Counter())
+    released = session.info.setdefault('released_blobs', set())
+    connection = session.connection()
+    table = Blob.__table__
+    for blob, delta in deltas.items():
+        if delta > 0 and claims[blob.id]:
+            used = min(delta, claims[blob.id])
+            claims[blob.id] -= used
+            delta -= used
+        if delta == 0:
+            continue
+        connection.execute(
+            table.update().where(table.c.id == blob.id).values(ref_count=table.c.ref_count + delta)
+        )
+        if delta < 0:
+            released.add(blob.id)
+
+
+def remove_released_blobs(session):
+    """after_commit hook: delete blobs whose last File went away, and their content."""
+    session.info.pop('claimed_blobs', None)
+    released = session.info.pop('released_blobs', None)
+    if released:
+        collect_unreferenced_blobs(released)
+
+
+def discard_blob_deltas(session, previous_transaction):
+    session.info.pop('blob_deltas', None)
+    # Claims belong to the outer transaction and survive a savepoint rollback
+    if not previous_transaction.nested:
+        session.info.pop('claimed_blobs', None)
+    session.info.pop('released_blobs', None)
+
+
+def listen_for_file_writes(session):
+    """Keep Blob.ref_count in sync with File rows flushed through `session`."""
+    event.listen(session, 'before_flush', collect_blob_deltas)
+    event.listen(session, 'after_flush', apply_blob_deltas)
+    event.listen(session, 'after_commit', remove_released_blobs)
+    event.listen(session, 'after_soft_rollback', discard_blob_deltas)
+
+
+def collect_unreferenced_blobs(blob_ids=None):
+    """
+    Delete blobs that no File references any more, optionally limited to
+    `blob_ids`. Uses its own connection so it can run after a commit.
+    Returns the number of blobs removed.
+    """
+    table = Blob.__table__
+    removed = 0
+    with db.engine.begin() as connection:
+        query = table.select().where(table.c.ref_count <= 0)
+        if blob_ids is not None:
+            query = query.where(table.c.id.in_(list(blob_ids)))
+        for row in connection.execute(query).fetchall():
+            # Only delete if nothing claimed the blob since it was selected
+            result = connection.execute(table.delete().where(table.c.id == row.id, table.c.ref_count <= 0))
+            if result.rowcount:
+                removed += 1
+                if os.path.exists(row.path):
+                    os.remove(row.path)
+    return removed
+
+
+def migrate_legacy_files():
+    """
+    Move files uploaded before the blob store into it, sharing content
+    between identical files. Returns the number of files migrated.
+    """
+    migrated = 0
+    for file in File.query.filter(File.blob_id == None).all():
+        if not os.path.exists(file.file_path):
+            continue
+        file.blob = store_blob(file.file_path)
+        file.file_path = file.blob.path
+        migrated += 1
+        db.session.commit()
+    return migrated
@@ -0,0 +1,190 @@
+from datetime import datetime
+
+from sqlalchemy import event
+
+from models import db, Application, ApplicationTombstone, ChangeCounter
+from queries import encode_cursor, decode_cursor, parse_page_size, parse_fieldset, load_fields
+
+# Ids of the ChangeCounter rows: the last number handed out, and the
+# number of the newest tombstone pruned
+COUNTER_ID = 1
+PRUNED_ID = 2
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+class CursorExpired(Exception):
+    """The cursor predates pruned tombstones, so deletions may have been missed."""
+
+    def __init__(self):
+        super().__init__('Cursor is too old; call without a cursor to resync')
+
+
+def reserve_change_numbers(session, count):
+    """
+    Take the next `count` change sequence numbers and return the first.
+
+    Bumping the counter row write-locks it until the transaction ends, so
+    writers are numbered in the order they commit: once a reader sees
+    number N, no transaction can still commit a number below N.
+
+    This also means transactions that write applications take turns from
+    their first flush to their commit, on every database. A Postgres
+    sequence would avoid the wait but hands out numbers in the order
+    writers start rather than commit, which is the gap this closes. Keep
+    such transactions short; `python -m benchmarks.run --scenarios
+    update_application --concurrency N` measures the limit on a database.
+    """
+    table = ChangeCounter.__table__
+    connection = session.connection()
+    updated = connection.execute(
+        table.update().where(table.c.id == COUNTER_ID).values(value=table.c.value + count)
+    ).rowcount
+    if not updated:
+        connection.execute(table.insert().values(id=COUNTER_ID, value=count))
+    last = connection.execute(db.select(table.c.value).where(table.c.id == COUNTER_ID)).scalar()
+    return last - count + 1
+
+
+def record_changes(session, flush_context, instances):
+    """
+    before_flush hook: leave a tombstone for every application being
+    deleted, and give every new or changed application and every new
+    tombstone the next change sequence number.
+    """
+    for obj in list(session.deleted):
+        if isinstance(obj, Application):
+            session.add(ApplicationTombstone(application_id=obj.id, user_id=obj.user_id))
+
+    changed = [
+        obj for obj in session.new
+        if isinstance(obj, (Application, ApplicationTombstone))
+    ] + [
+        obj for obj in session.dirty
+        if isinstance(obj, Application) and obj not in session.deleted and session.is_modified(obj)
+    ]
+    if not changed:
+        return
+    first = reserve_change_numbers(session, len(changed))
+    for offset, obj in enumerate(changed):
+        obj.change_seq = first + offset
+
+
+def listen_for_application_changes(session):
+    """Number the application writes and deletions made through `session` for the change feed."""
+    event.listen(session, 'before_flush', record_changes)
+
+
+def backfill_change_numbers(connection):
+    """
+    Number applications (in updated_at order) and tombstones that predate
+    the change sequence, and create the counter row if it's missing.
+    """
+    counter = ChangeCounter.__table__
+    last = connection.execute(db.select(counter.c.value).where(counter.c.id == COUNTER_ID)).scalar()
+    if last is None:
+        last = max(
+            connection.execute(db.select(db.func.max(table.c.change_seq))).scalar() or 0
+            for table in (Application.__table__, ApplicationTombstone.__table__)
+        )
+        connection.execute(counter.insert().values(id=COUNTER_ID, value=last))
+
+    for table, order in (
+        (Application.__table__, [Application.__table__.c.updated_at, Application.__table__.c.id]),
+        (ApplicationTombstone.__table__, [ApplicationTombstone.__table__.c.id])
+    ):
+        update = table.update().where(table.c.id == db.bindparam('b_id')).values(change_seq=db.bindparam('b_seq'))
+        while True:
+            ids = connection.execute(
+                db.select(table.c.id).where(table.c.change_seq == None).order_by(*order).limit(BACKFILL_BATCH_SIZE)
+            ).scalars().all()
+            if not ids:
+                break
+            connection.execute(update, [{'b_id': row_id, 'b_seq': last + offset} for offset, row_id in enumerate(ids, start=1)])
+            last += len(ids)
+
+    connection.execute(counter.update().where(counter.c.id == COUNTER_ID).values(value=last))
+
+
+def pruned_position(session):
+    """Change sequence number of the newest tombstone removed by prune_tombstones, or 0."""
+    table = ChangeCounter.__table__
+    return session.execute(db.select(table.c.value).where(table.c.id == PRUNED_ID)).scalar() or 0
+
+
+def prune_tombstones(max_age):
+    """
+    Delete tombstones older than `max_age` and remember the newest one
+    removed, so clients whose cursor is older are told to resync. Returns
+    the number removed.
+    """
+    last = db.session.query(db.func.max(ApplicationTombstone.change_seq)) \
+        .filter(ApplicationTombstone.deleted_at < datetime.utcnow() - max_age).scalar()
+    if last is None:
+        return 0
+
+    # Prune by sequence number so the remaining tombstones follow on from the
+    # recorded position without gaps
+    count = ApplicationTombstone.query.filter(ApplicationTombstone.change_seq <= last).delete(synchronize_session=False)
+    table = ChangeCounter.__table__
+    if db.session.execute(table.update().where(table.c.id == PRUNED_ID).values(value=last)).rowcount == 0:
+        db.session.execute(table.insert().values(id=PRUNED_ID, value=last))
+    db.session.commit()
+    return count
+
+
+def get_changes(args):
+    """
+    Return applications changed and deleted since the cursor in `args`.
+
+    Without a cursor every application is returned (in pages) so a client can
+    build its initial copy; deletions start from the current position. Returns
+    a dict with 'changed', 'deleted', 'next_cursor' and 'has_more'. Accepts
+    `fields` or `view` to limit the application fields sent. Raises
+    ValueError for invalid arguments.
+
+    Changes are paged by change sequence number rather than updated_at: a
+    timestamp is taken before the write lock, so a slow writer could commit
+    a row older than one already sent and be skipped. Raises CursorExpired
+    when tombstones the cursor hasn't reached have been pruned.
+    """
+    limit = parse_page_size(args.get('limit'))
+    fields = parse_fieldset(args)
+
+    # The cursor holds the sequence numbers of the last application and the
+    # last tombstone sent
+    cursor = args.get('cursor')
+    if cursor:
+        position, tombstone_position = decode_cursor(cursor, [int, int])
+        if tombstone_position < pruned_position(db.session):
+            raise CursorExpired()
+    else:
+        position = 0
+        tombstone_position = max(
+            db.session.query(db.func.max(ApplicationTombstone.change_seq)).scalar() or 0,
+            pruned_position(db.session)
+        )
+
+    # change_seq is needed for the cursor even if the client didn't ask for it
+    changed = load_fields(Application.query, fields, 'change_seq') \
+        .filter(Application.change_seq > position) \
+        .order_by(Application.change_seq).limit(limit + 1).all()
+
+    tombstones = ApplicationTombstone.query.filter(ApplicationTombstone.change_seq > tombstone_position) \
+        .order_by(ApplicationTombstone.change_seq).limit(limit + 1).all()
+
+    has_more = len(changed) > limit or len(tombstones) > limit
+    changed = changed[:limit]
+    tombstones = tombstones[:limit]
+
+    if changed:
+        position = changed[-1].change_seq
+    if tombstones:
+        tombstone_position = tombstones[-1].change_seq
+
+    return {
+        'changed': [application.to_dict(fields) for application in changed],
+        'deleted': [tombstone.application_id for tombstone in tombstones],
+        'next_cursor': encode_cursor([position, tombstone_position]),
+        'has_more': has_more
+    }
@@ -0,0 +1,143 @@
+import zlib
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available
+    brotli = None
+
+# Only text formats are worth compressing; stored files (PDFs, images,
+# Office documents) are already compressed or served by send_file
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/x-ndjson',
+    'text/csv',
+    'text/plain',
+    'text/html'
+}
+
+# Streamed bodies are flushed to the client after this much input, so rows
+# go out as they are produced instead of waiting for the encoder's buffer
+STREAM_FLUSH_SIZE = 16 * 1024
+
+
+class GzipEncoder:
+    name = 'gzip'
+
+    def __init__(self, level):
+        # wbits=31 writes a gzip header and trailer rather than a raw zlib stream
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def flush(self):
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+class BrotliEncoder:
+    name = 'br'
+
+    def __init__(self, quality):
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self.compressor.process(data)
+
+    def flush(self):
+        return self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+def compress_chunks(chunks, encoder, flush_size=STREAM_FLUSH_SIZE):
+    """
+    Compress an iterable of byte chunks as it is consumed. The first chunk
+    and then every `flush_size` bytes of input are flushed through the
+    encoder, so the client receives data at least that often.
+    """
+    try:
+        pending = flush_size  # Flush the first chunk straight away
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = encoder.compress(chunk)
+            pending += len(chunk)
+            if pending >= flush_size:
+                data += encoder.flush()
+                pending = 0
+            if data:
+                yield data
+        yield encoder.finish()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+class ResponseCompressor:
+    """
+    Compresses text responses with brotli or gzip, as negotiated from
+    Accept-Encoding. Buffered responses are compressed only when they are at
+    least COMPRESSION_MIN_SIZE bytes; streamed responses are compressed
+    chunk by chunk as they are sent, without buffering the body. File
+    downloads (send_file, X-Accel-Redirect/X-Sendfile), partial content and
+    responses that already have a Content-Encoding are left alone.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        app.config.setdefault('COMPRESS_RESPONSES', True)
+        app.config.setdefault('COMPRESSION_MIN_SIZE', 1024)  # Bytes
+        app.config.setdefault('GZIP_LEVEL', 6)
+        app.config.setdefault('BROTLI_QUALITY', 5)  # 0-11; higher levels are too slow for dynamic responses
+        app.after_request(self.compress_response)
+        app.extensions['response_compressor'] = self
+
+    def choose_encoder(self):
+        """Return an encoder for the best encoding the client accepts, or None."""
+        accepted = request.accept_encodings
+        if brotli is not None and accepted['br'] and accepted['br'] >= accepted['gzip']:
+            return BrotliEncoder(self.app.config['BROTLI_QUALITY'])
+        if accepted['gzip']:
+            return GzipEncoder(self.app.config['GZIP_LEVEL'])
+        return None
+
+    def compress_response(self, response):
+        if not self.app.config['COMPRESS_RESPONSES'] or response.mimetype not in COMPRESSIBLE_MIMETYPES:
+            return response
+        # Caches must keep compressed and uncompressed copies apart
+        response.vary.add('Accept-Encoding')
+
+        if (
+            response.direct_passthrough
+            or response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers
+            or 'X-Accel-Redirect' in response.headers
+            or 'X-Sendfile' in response.headers
+            or request.method == 'HEAD'
+        ):
+            return response
+
+        if not response.is_streamed:
+            body = response.get_data()
+            if len(body) < self.app.config['COMPRESSION_MIN_SIZE']:
+                return response
+            encoder = self.choose_encoder()
+            if encoder is None:
+                return response
+            response.set_data(encoder.compress(body) + encoder.finish())
+        else:
+            encoder = self.choose_encoder()
+            if encoder is None:
+                return response
+            response.response = compress_chunks(response.response, encoder)
+            response.headers.pop('Content-Length', None)
+
+        response.headers['Content-Encoding'] = encoder.name
+        return response
@@ -0,0 +1,47 @@
+import hashlib
+from datetime import timezone
+
+from flask import request, current_app
+
+# Bump when the serialized representation changes so cached copies are dropped
+REPRESENTATION_VERSION = 4
+
+
+def make_etag(*parts):
+    """Build an entity tag from the values a representation depends on."""
+    raw = '|'.join(str(part) for part in (REPRESENTATION_VERSION,) + parts)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def http_datetime(value):
+    """Convert a naive UTC datetime to the aware, second-precision form HTTP dates use."""
+    if value is None:
+        return None
+    return value.replace(microsecond=0, tzinfo=timezone.utc)
+
+
+def is_not_modified(etag, last_modified=None):
+    """
+    Evaluate If-None-Match / If-Modified-Since against the current validators.
+    If-Modified-Since is only consulted when no If-None-Match header was sent.
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified is not None:
+        return http_datetime(last_modified) <= request.if_modified_since
+    return False
+
+
+def with_validators(response, etag, last_modified=None):
+    """Attach ETag, Last-Modified and revalidation headers to a response."""
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = http_datetime(last_modified)
+    # Let clients keep a copy, but make them revalidate before every use
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def not_modified_response(etag, last_modified=None):
+    return with_validators(current_app.response_class(status=304), etag, last_modified)
@@ -0,0 +1,81 @@
+import os
+
+from sqlalchemy import event
+
+DEFAULT_DATABASE_URL = 'sqlite:///applicants.db'
+
+# SQLite pragmas applied to every new connection. WAL lets readers run
+# alongside a writer, and busy_timeout makes writers wait for the lock
+# instead of failing with "database is locked".
+SQLITE_PRAGMAS = {
+    'journal_mode': ('SQLITE_JOURNAL_MODE', 'WAL'),
+    'busy_timeout': ('SQLITE_BUSY_TIMEOUT', '5000'),  # Milliseconds
+    'synchronous': ('SQLITE_SYNCHRONOUS', 'NORMAL'),  # Safe with WAL; only the last commits can be lost on power failure
+    'mmap_size': ('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)),
+    'cache_size': ('SQLITE_CACHE_SIZE', '-20000')  # Negative values are KiB
+}
+
+# Engine options read from the environment, with their types
+POOL_OPTIONS = {
+    'pool_size': ('DB_POOL_SIZE', int),
+    'max_overflow': ('DB_MAX_OVERFLOW', int),
+    'pool_timeout': ('DB_POOL_TIMEOUT', int),
+    'pool_recycle': ('DB_POOL_RECYCLE', int)
+}
+
+
+def database_url():
+    """DATABASE_URL from the environment, normalized for SQLAlchemy."""
+    url = os.environ.get('DATABASE_URL', DEFAULT_DATABASE_URL)
+    # Heroku-style URLs use a scheme SQLAlchemy no longer accepts
+    if url.startswith('postgres://'):
+        url = 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+def env_flag(name, default=False):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def engine_options(url):
+    """Build SQLALCHEMY_ENGINE_OPTIONS from DB_* environment variables."""
+    options = {'pool_pre_ping': env_flag('DB_POOL_PRE_PING', not url.startswith('sqlite'))}
+    for option, (name, cast) in POOL_OPTIONS.items():
+        value = os.environ.get(name)
+        if value:
+            try:
+                options[option] = cast(value)
+            except ValueError:
+                raise ValueError(f'{name} must be an integer')
+    return options
+
+
+def sqlite_pragmas():
+    return {pragma: os.environ.get(name, default) for pragma, (name, default) in SQLITE_PRAGMAS.items()}
+
+
+def configure_database(app):
+    """Set the database URL and engine options on `app` from the environment."""
+    url = database_url()
+    app.config['SQLALCHEMY_DATABASE_URI'] = url
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(url)
+    app.config['SQLALCHEMY_ECHO'] = env_flag('SQLALCHEMY_ECHO')
+
+
+def apply_sqlite_pragmas(engine):
+    """Apply SQLITE_PRAGMAS to each connection `engine` opens. No-op for other databases."""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    pragmas = sqlite_pragmas()
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma, value in pragmas.items():
+            # Values come from deployment configuration, not from requests
+            cursor.execute(f'PRAGMA {pragma}={value}')
+        cursor.close()
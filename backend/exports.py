@@ -0,0 +1,87 @@
+import csv
+import json
+from datetime import datetime
+
+from sqlalchemy.orm import load_only
+
+from models import Application
+from queries import apply_application_filters
+
+# Number of rows fetched from the database per round trip while streaming
+EXPORT_BATCH_SIZE = 500
+
+# Columns that can be exported, in their default order
+EXPORT_COLUMNS = [column.name for column in Application.__table__.columns]
+
+DEFAULT_EXPORT_COLUMNS = [
+    'id', 'email', 'first_name', 'last_name', 'contact_number', 'gender',
+    'final_percentage', 'tentative_ranking', 'preferred_programs',
+    'english_proficiency', 'enrollment_status', 'enrolled_university'
+]
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson'
+}
+
+
+def parse_export_columns(value):
+    """Parse a comma-separated column list, raising ValueError for unknown columns."""
+    if not value:
+        return list(DEFAULT_EXPORT_COLUMNS)
+
+    columns = [column.strip() for column in value.split(',') if column.strip()]
+    unknown = [column for column in columns if column not in EXPORT_COLUMNS]
+    if unknown:
+        raise ValueError(f'Unknown export columns: {", ".join(unknown)}')
+    if not columns:
+        raise ValueError('At least one column is required')
+    return columns
+
+
+def export_value(application, column):
+    value = getattr(application, column)
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return value
+
+
+def iter_export_rows(args, columns):
+    """
+    Yield applications matching the dashboard filters in id order, loading
+    only the selected columns and at most EXPORT_BATCH_SIZE rows at a time.
+    """
+    query = apply_application_filters(Application.query, args) \
+        .options(load_only(*[getattr(Application, column) for column in columns])) \
+        .order_by(Application.id) \
+        .yield_per(EXPORT_BATCH_SIZE)
+
+    for application in query:
+        yield [export_value(application, column) for column in columns]
+
+
+class LineBuffer:
+    """File-like object that hands back whatever csv.writer writes to it."""
+
+    def write(self, value):
+        return value
+
+
+def generate_csv(rows, columns):
+    writer = csv.writer(LineBuffer())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def generate_ndjson(rows, columns):
+    for row in rows:
+        yield json.dumps(dict(zip(columns, row))) + '\n'
+
+
+def generate_export(export_format, args, columns):
+    """Return a generator producing the export body in the requested format."""
+    rows = iter_export_rows(args, columns)
+    if export_format == 'ndjson':
+        return generate_ndjson(rows, columns)
+    return generate_csv(rows, columns)
@@ -0,0 +1,25 @@
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+
+# Every worker runs its own report job runner with a pool of render
+# processes; share the CPUs out between them instead of one pool per CPU each
+os.environ.setdefault('REPORT_WORKERS', str(max(1, multiprocessing.cpu_count() // workers)))
+
+# Import the app once in the master and fork workers from it, so they share
+# its memory and start without re-importing
+preload_app = True
+
+
+def post_fork(server, worker):
+    # Never share pooled connections across processes; the master shouldn't
+    # have opened any, but drop them without closing the parent's sockets
+    from wsgi import app
+    from models import db
+    with app.app_context():
+        db.engine.dispose(close=False)
+    # Pick up queued jobs, and those lost with a dead worker, without waiting for a request
+    app.extensions['report_jobs'].start()
@@ -0,0 +1,260 @@
+import json
+import multiprocessing
+import os
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ALL_COMPLETED, FIRST_COMPLETED, wait
+from datetime import datetime, timedelta
+
+from models import db, Application, ReportJob
+from queries import apply_application_filters
+from reports import render_application_pdf
+
+# Applications loaded from the database at a time while a job runs
+JOB_BATCH_SIZE = 100
+
+# Maximum number of applications a single report job may cover
+MAX_JOB_APPLICATIONS = 5000
+
+# A running job whose worker hasn't recorded progress for this long is
+# presumed lost with that worker and handed to another one
+REPORT_JOB_STALE_AFTER = timedelta(minutes=2)
+
+# Times a job is started before a lost job is failed instead of requeued
+MAX_JOB_ATTEMPTS = 3
+
+
+def select_applications(filters):
+    """
+    Build the query for the applications covered by a report job: the
+    dashboard filters, optionally narrowed to an explicit list of ids.
+    Raises ValueError for invalid filters.
+    """
+    for name, value in filters.items():
+        if name == 'application_ids' or value is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            raise ValueError(f'{name} must be a string or number')
+    query = apply_application_filters(Application.query, filters)
+    application_ids = filters.get('application_ids')
+    if application_ids:
+        if not isinstance(application_ids, list) or not all(isinstance(i, int) for i in application_ids):
+            raise ValueError('application_ids must be a list of integers')
+        query = query.filter(Application.id.in_(application_ids))
+    return query
+
+
+class ReportJobLost(Exception):
+    """The job was requeued or failed by another worker while this one was running it."""
+
+
+class ReportJobRunner:
+    """
+    Runs batch PDF report jobs in the background without an external broker.
+
+    The ReportJob table is the queue: every web worker runs a coordinator
+    thread that claims queued jobs one at a time, renders the PDFs across a
+    process pool and bundles them into a ZIP under REPORT_FOLDER. Progress
+    commits double as a heartbeat, so when a worker dies mid-job the others
+    notice within REPORT_JOB_STALE_AFTER and requeue it, or fail it after
+    MAX_JOB_ATTEMPTS. The thread starts with the worker's first request
+    (or from gunicorn's post_fork hook); the pool only when a job is claimed.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.wakeup = threading.Event()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.pool = None
+        self.workers = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('REPORT_FOLDER', 'reports')
+        app.config.setdefault('REPORT_WORKERS', None)  # None means one per CPU
+        app.config.setdefault('REPORT_JOB_POLL_INTERVAL', 5)  # Seconds between checks for queued and stale jobs
+        app.extensions['report_jobs'] = self
+        app.before_request(self.start)
+
+    def submit(self, job_id):
+        """Wake the coordinator for a job just committed as queued; any worker may claim it."""
+        self.start()
+        self.wakeup.set()
+
+    def start(self):
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.thread = threading.Thread(target=self.run, name='report-jobs', daemon=True)
+            self.thread.start()
+
+    def start_pool(self):
+        if self.pool is not None:
+            return
+        # Spawn rather than fork: the web process has threads and open
+        # database connections that must not be copied into the workers
+        self.workers = self.app.config['REPORT_WORKERS'] or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+
+    def run(self):
+        while True:
+            job = None
+            with self.app.app_context():
+                try:
+                    self.recover_stale_jobs()
+                    job = self.claim_next_job()
+                except Exception as e:
+                    self.app.logger.error(f"Checking for report jobs failed: {str(e)}")
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+
+            if job is None:
+                self.wakeup.wait(self.app.config['REPORT_JOB_POLL_INTERVAL'])
+                self.wakeup.clear()
+                continue
+
+            job_id, attempt = job
+            with self.app.app_context():
+                try:
+                    self.process(job_id, attempt)
+                except ReportJobLost:
+                    self.app.logger.warning(f"Report job {job_id} was taken over by another worker")
+                    db.session.rollback()
+                except Exception as e:
+                    self.app.logger.error(f"Report job {job_id} failed: {str(e)}")
+                    db.session.rollback()
+                    self.finish(job_id, attempt, status='failed', error=str(e))
+                finally:
+                    db.session.remove()
+
+    def claim_next_job(self):
+        """Mark the oldest queued job as running here. Returns (job id, attempt) or None."""
+        while True:
+            job_id = db.session.query(ReportJob.id).filter_by(status='queued') \
+                .order_by(ReportJob.created_at).limit(1).scalar()
+            if job_id is None:
+                return None
+            now = datetime.utcnow()
+            attempt = (db.session.query(ReportJob.attempts).filter_by(id=job_id).scalar() or 0) + 1
+            # Compare-and-set, so of several workers polling only one wins the job
+            claimed = ReportJob.query.filter_by(id=job_id, status='queued').update({
+                'status': 'running',
+                'attempts': attempt,
+                'completed': 0,
+                'started_at': now,
+                'heartbeat_at': now
+            }, synchronize_session=False)
+            db.session.commit()
+            if claimed:
+                return job_id, attempt
+
+    def recover_stale_jobs(self):
+        """
+        Requeue running jobs whose worker stopped sending heartbeats, or fail
+        them once they have been tried MAX_JOB_ATTEMPTS times. Returns the
+        number of jobs recovered.
+        """
+        now = datetime.utcnow()
+        stale = ReportJob.query.filter(
+            ReportJob.status == 'running',
+            db.or_(ReportJob.heartbeat_at == None, ReportJob.heartbeat_at < now - REPORT_JOB_STALE_AFTER)
+        ).all()
+
+        recovered = 0
+        for job in stale:
+            if (job.attempts or 0) < MAX_JOB_ATTEMPTS:
+                values = {'status': 'queued', 'completed': 0, 'started_at': None}
+            else:
+                values = {
+                    'status': 'failed',
+                    'error': f'The worker running this job stopped responding {MAX_JOB_ATTEMPTS} times',
+                    'finished_at': now
+                }
+            # Only if no heartbeat arrived since it was read
+            recovered += ReportJob.query.filter_by(
+                id=job.id, status='running', heartbeat_at=job.heartbeat_at
+            ).update(values, synchronize_session=False)
+        db.session.commit()
+        return recovered
+
+    def heartbeat(self, job_id, attempt, **values):
+        """Record progress on a running job. Raises ReportJobLost if it is no longer this worker's."""
+        values['heartbeat_at'] = datetime.utcnow()
+        updated = ReportJob.query.filter_by(id=job_id, status='running', attempts=attempt) \
+            .update(values, synchronize_session=False)
+        db.session.commit()
+        if not updated:
+            raise ReportJobLost(job_id)
+
+    def finish(self, job_id, attempt, **values):
+        values['finished_at'] = datetime.utcnow()
+        ReportJob.query.filter_by(id=job_id, status='running', attempts=attempt) \
+            .update(values, synchronize_session=False)
+        db.session.commit()
+
+    def process(self, job_id, attempt):
+        job = ReportJob.query.get(job_id)
+        query = select_applications(json.loads(job.filters or '{}'))
+        application_ids = [row[0] for row in query.with_entities(Application.id).order_by(Application.id)]
+        self.heartbeat(job_id, attempt, total=len(application_ids))
+        self.start_pool()
+
+        folder = self.app.config['REPORT_FOLDER']
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        result_path = os.path.join(folder, f'{job_id}.zip')
+        # Per attempt, so a worker that lost the job can't write into its successor's file
+        partial_path = f'{result_path}.{attempt}.part'
+        for previous in range(1, attempt):
+            if os.path.exists(f'{result_path}.{previous}.part'):
+                os.remove(f'{result_path}.{previous}.part')
+
+        generated_at = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        # Keep a bounded number of renders in flight so memory stays flat
+        max_pending = self.workers * 2
+        completed = 0
+
+        try:
+            with zipfile.ZipFile(partial_path, 'w', zipfile.ZIP_DEFLATED) as bundle:
+                pending = set()
+
+                def collect(return_when):
+                    nonlocal pending, completed
+                    done, pending = wait(pending, return_when=return_when)
+                    for future in done:
+                        filename, content = future.result()
+                        bundle.writestr(filename, content)
+                    completed += len(done)
+                    self.heartbeat(job_id, attempt, completed=completed)
+
+                for start in range(0, len(application_ids), JOB_BATCH_SIZE):
+                    batch_ids = application_ids[start:start + JOB_BATCH_SIZE]
+                    # Serialize the whole batch up front: the progress commits
+                    # below expire loaded objects and would force a reload per row
+                    batch = [
+                        application.to_dict() for application in
+                        Application.query.filter(Application.id.in_(batch_ids)).order_by(Application.id)
+                    ]
+                    for data in batch:
+                        pending.add(self.pool.submit(render_application_pdf, data, generated_at))
+                        if len(pending) >= max_pending:
+                            collect(FIRST_COMPLETED)
+
+                if pending:
+                    collect(ALL_COMPLETED)
+        except Exception:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+
+        # Claim the result before publishing it, so a job requeued meanwhile keeps its own file
+        self.heartbeat(job_id, attempt)
+        os.replace(partial_path, result_path)
+        self.finish(job_id, attempt, status='completed', result_path=result_path)
@@ -0,0 +1,154 @@
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label(value)}"' for name, value in labels) + '}'
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.values = {}
+
+    def inc(self, label_values, amount=1):
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        for label_values, value in sorted(self.values.items()):
+            labels = format_labels(list(zip(self.label_names, label_values)))
+            lines.append(f'{self.name}{labels} {format_value(value)}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self.series = {}  # label values -> [per-bucket counts (last one is +Inf), sum]
+
+    def observe(self, label_values, value):
+        series = self.series.get(label_values)
+        if series is None:
+            series = self.series[label_values] = [[0] * (len(self.buckets) + 1), 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for label_values, (counts, total) in sorted(self.series.items()):
+            labels = list(zip(self.label_names, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{format_labels(labels + [("le", bound)])} {cumulative}')
+            lines.append(f'{self.name}_sum{format_labels(labels)} {format_value(total)}')
+            lines.append(f'{self.name}_count{format_labels(labels)} {cumulative}')
+        return lines
+
+
+class RequestMetrics:
+    """
+    Per-endpoint request latency, status counts, and the number and total
+    time of SQL statements each request runs, collected with request hooks
+    and SQLAlchemy engine events. Statements slower than
+    SLOW_QUERY_THRESHOLD seconds are logged with the route that ran them.
+    Metrics are kept per process and served in Prometheus text format.
+
+    Latency is measured until the view returns, so for streamed responses
+    it excludes sending the body.
+    """
+
+    def __init__(self, app, engine):
+        self.app = app
+        self.lock = threading.Lock()
+        self.requests = Counter('http_requests_total', 'Requests handled.', ('endpoint', 'method', 'status'))
+        self.latency = Histogram('http_request_duration_seconds', 'Time to handle a request.', ('endpoint', 'method'), LATENCY_BUCKETS)
+        self.statements = Histogram('db_statements_per_request', 'SQL statements run per request.', ('endpoint',), QUERY_COUNT_BUCKETS)
+        self.sql_time = Histogram('db_time_per_request_seconds', 'Total SQL time per request.', ('endpoint',), LATENCY_BUCKETS)
+        self.slow_queries = Counter('db_slow_queries_total', 'SQL statements slower than the slow-query threshold.', ('endpoint',))
+
+        app.before_request(self.start_request)
+        app.after_request(self.finish_request)
+        event.listen(engine, 'before_cursor_execute', self.before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self.after_cursor_execute)
+        app.extensions['request_metrics'] = self
+
+    @staticmethod
+    def endpoint():
+        return request.endpoint or 'unmatched'
+
+    def start_request(self):
+        g.request_started = time.perf_counter()
+        g.sql_statements = 0
+        g.sql_time = 0.0
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_started'].pop()
+        # Statements run outside a request (startup, background jobs) aren't attributed
+        if not has_request_context() or 'sql_statements' not in g:
+            return
+        g.sql_statements += 1
+        g.sql_time += elapsed
+
+        if elapsed >= self.app.config['SLOW_QUERY_THRESHOLD']:
+            endpoint = self.endpoint()
+            with self.lock:
+                self.slow_queries.inc((endpoint,))
+            self.app.logger.warning(
+                f"Slow query ({elapsed * 1000:.1f} ms) in {request.method} {request.path} [{endpoint}]: {' '.join(statement.split())}"
+            )
+
+    def finish_request(self, response):
+        if 'request_started' not in g:
+            return response
+        elapsed = time.perf_counter() - g.request_started
+        endpoint = self.endpoint()
+        with self.lock:
+            self.requests.inc((endpoint, request.method, response.status_code))
+            self.latency.observe((endpoint, request.method), elapsed)
+            self.statements.observe((endpoint,), g.sql_statements)
+            self.sql_time.observe((endpoint,), g.sql_time)
+
+        if self.app.config['QUERY_COUNT_HEADER']:
+            response.headers['X-Query-Count'] = str(g.sql_statements)
+            response.headers['Server-Timing'] = f'db;dur={g.sql_time * 1000:.1f};desc="{g.sql_statements} queries", app;dur={elapsed * 1000:.1f}'
+        return response
+
+    def render(self):
+        with self.lock:
+            lines = []
+            for metric in (self.requests, self.latency, self.statements, self.sql_time, self.slow_queries):
+                lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def response(self):
+        return Response(self.render(), content_type=PROMETHEUS_CONTENT_TYPE)
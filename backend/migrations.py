@@ -0,0 +1,133 @@
+"""
+Schema migrations for databases created by earlier versions of the app.
+
+db.create_all() creates missing tables (with their indexes) but never alters
+existing ones. Each migration brings an existing table up to date with
+models.py. Migrations are written to be idempotent, so running one against a
+freshly created database is a no-op that just records it as applied.
+
+To change the schema, update models.py and append a migration here; never
+edit or reorder migrations that have shipped.
+"""
+from datetime import datetime
+
+from sqlalchemy import inspect
+
+from changes import backfill_change_numbers
+from models import db, Application, ApplicationTombstone, SchemaMigration
+
+
+def column_names(connection, table):
+    return [column['name'] for column in inspect(connection).get_columns(table)]
+
+
+def create_indexes(connection, table, *names):
+    """Create the named indexes declared on a model's table if they don't exist yet."""
+    for index in table.indexes:
+        if index.name in names:
+            index.create(connection, checkfirst=True)
+
+
+def add_column(connection, table, name, column_type, constraints=''):
+    """Add a column if it's missing, with its type spelled for the connection's database."""
+    if name not in column_names(connection, table):
+        type_sql = column_type.compile(dialect=connection.dialect)
+        connection.exec_driver_sql(f'ALTER TABLE {table} ADD COLUMN {name} {type_sql} {constraints}'.rstrip())
+
+
+def add_file_blob_id(connection):
+    add_column(connection, 'file', 'blob_id', db.Integer(), 'REFERENCES blob (id)')
+
+
+def add_application_updated_at_index(connection):
+    # Serves the latest-updated_at validator of the application list; the
+    # change feed pages by change_seq and uses ix_application_change_seq
+    create_indexes(connection, Application.__table__, 'ix_application_updated_at')
+
+
+def add_application_lookup_indexes(connection):
+    """Index user_id (unique), and enrollment status with university."""
+    table = Application.__table__
+    duplicates = connection.execute(
+        db.select(table.c.user_id).group_by(table.c.user_id).having(db.func.count() > 1)
+    ).scalars().all()
+    if duplicates:
+        raise RuntimeError(
+            'Cannot add the unique index on application.user_id: users '
+            f'{", ".join(str(user_id) for user_id in duplicates)} have more than one application. '
+            'Remove the extra applications and restart.'
+        )
+    create_indexes(connection, table, 'ix_application_user_id', 'ix_application_enrollment')
+
+
+def add_application_ranking_score(connection):
+    """Add the stored ranking score and its index; ensure_rankings() fills it in."""
+    add_column(connection, 'application', 'ranking_score', db.Float())
+    create_indexes(connection, Application.__table__, 'ix_application_ranking_score')
+
+
+def add_report_job_heartbeat(connection):
+    """Track attempts and worker heartbeats so jobs lost with a worker can be recovered."""
+    add_column(connection, 'report_job', 'attempts', db.Integer(), 'DEFAULT 0')
+    add_column(connection, 'report_job', 'heartbeat_at', db.DateTime())
+
+
+def add_change_sequence(connection):
+    """Number existing applications and tombstones for the change feed; see changes.py."""
+    for table in ('application', 'application_tombstone'):
+        add_column(connection, table, 'change_seq', db.BigInteger())
+    backfill_change_numbers(connection)
+    create_indexes(connection, Application.__table__, 'ix_application_change_seq')
+    create_indexes(connection, ApplicationTombstone.__table__, 'ix_application_tombstone_change_seq')
+
+
+def add_application_file_indexes(connection):
+    create_indexes(connection, Application.__table__, 'ix_application_transcript', 'ix_application_cv', 'ix_application_photo')
+
+
+# (version, name, function taking a connection); append only
+MIGRATIONS = [
+    (1, 'add_file_blob_id', add_file_blob_id),
+    (2, 'add_application_updated_at_index', add_application_updated_at_index),
+    (3, 'add_application_lookup_indexes', add_application_lookup_indexes),
+    (4, 'add_application_ranking_score', add_application_ranking_score),
+    (5, 'add_report_job_heartbeat', add_report_job_heartbeat),
+    (6, 'add_change_sequence', add_change_sequence),
+    (7, 'add_application_file_indexes', add_application_file_indexes)
+]
+
+
+def applied_versions():
+    return {migration.version for migration in SchemaMigration.query}
+
+
+def run_migrations():
+    """
+    Create missing tables, then apply pending migrations in order, each in
+    its own transaction. Returns the names of the migrations applied.
+    """
+    db.create_all()
+    applied = applied_versions()
+
+    ran = []
+    for version, name, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        with db.engine.begin() as connection:
+            migrate(connection)
+            connection.execute(SchemaMigration.__table__.insert().values(
+                version=version,
+                name=name,
+                applied_at=datetime.utcnow()
+            ))
+        ran.append(name)
+    return ran
+
+
+def migration_status():
+    """List every migration with whether it has been applied."""
+    applied = applied_versions()
+    return [
+        {'version': version, 'name': name, 'applied': version in applied}
+        for version, name, migrate in MIGRATIONS
+    ]
@@ -1,10 +1,41 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+from functools import lru_cache
+from operator import attrgetter, itemgetter
+import json
+import uuid
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
 
 db = SQLAlchemy()
 
+def compile_serializer(fields):
+    """
+    Build a function turning a model instance into a dict of `fields`.
+    Loaded column values live in the instance __dict__ and are read there
+    with a single itemgetter call, skipping the ORM's attribute descriptors,
+    which cost more than everything else per row. Expired or deferred
+    attributes aren't in __dict__ and are read through the ORM instead.
+    Values are returned as-is; the JSON provider encodes datetimes.
+    """
+    fields = tuple(fields)
+    loaded = itemgetter(*fields)
+    getter = attrgetter(*fields)
+    if len(fields) == 1:
+        # With one name the getters return the value itself, not a tuple
+        loaded_values = lambda obj: (loaded(obj.__dict__),)
+        values = lambda obj: (getter(obj),)
+    else:
+        loaded_values = lambda obj: loaded(obj.__dict__)
+        values = getter
+
+    def serialize(obj):
+        try:
+            return dict(zip(fields, loaded_values(obj)))
+        except KeyError:
+            return dict(zip(fields, values(obj)))
+    return serialize
+
 class User(db.Model, UserMixin):  # Added UserMixin for flask-login
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True, nullable=False)
@@ -17,6 +48,7 @@ class User(db.Model, UserMixin):  # Added UserMixin for flask-login
     
     applications = db.relationship('Application', backref='user', lazy=True, cascade="all, delete-orphan")
     files = db.relationship('File', backref='user', lazy=True, cascade="all, delete-orphan")
+    upload_sessions = db.relationship('UploadSession', backref='user', lazy=True, cascade="all, delete-orphan")
     
     def set_password(self, password):
         self.password = generate_password_hash(password)
@@ -25,15 +57,9 @@ class User(db.Model, UserMixin):  # Added UserMixin for flask-login
         return check_password_hash(self.password, password)
     
     def to_dict(self):
-        return {
-            'id': self.id,
-            'email': self.email,
-            'is_admin': self.is_admin,
-            'first_name': self.first_name,
-            'last_name': self.last_name,
-            'contact_number': self.contact_number,
-            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S')
-        }
+        return serialize_user(self)
+
+serialize_user = compile_serializer(['id', 'email', 'is_admin', 'first_name', 'last_name', 'contact_number', 'created_at'])
 
 class Application(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -58,8 +84,9 @@ class Application(db.Model):
     target_universities = db.Column(db.Text)
     applied_universities = db.Column(db.Text)
     accepted_universities = db.Column(db.Text)
-    enrolled_university = db.Column(db.String(200))
-    enrollment_status = db.Column(db.String(50), default='planning')  # 'planning', 'applied', 'accepted', 'enrolled'
+    # active_history keeps the previous value available to the statistics counters
+    enrolled_university = db.column_property(db.Column(db.String(200)), active_history=True)
+    enrollment_status = db.column_property(db.Column(db.String(50), default='planning'), active_history=True)  # 'planning', 'applied', 'accepted', 'enrolled'
     study_program = db.Column(db.String(200))
     admission_year = db.Column(db.Integer)
     scholarship_status = db.Column(db.String(50))
@@ -85,52 +112,112 @@ class Application(db.Model):
     availability_to_start = db.Column(db.String(50))
     additional_certifications = db.Column(db.Text)
     
+    # Weighted shortlist score (0-100), recomputed on every write; see ranking.py
+    ranking_score = db.Column(db.Float)
+    
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Position in the change feed, assigned in commit order on every write; see changes.py
+    change_seq = db.Column(db.BigInteger)
+    
+    university_links = db.relationship('ApplicationUniversity', backref='application', lazy=True, cascade="all, delete-orphan")
+    program_links = db.relationship('ApplicationProgram', backref='application', lazy=True, cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        db.Index('ix_application_updated_at', 'updated_at', 'id'),
+        db.Index('ix_application_user_id', 'user_id', unique=True),  # One application per user
+        db.Index('ix_application_enrollment', 'enrollment_status', 'enrolled_university'),
+        db.Index('ix_application_change_seq', 'change_seq', unique=True),
+        # Finding the applications that still use a file when one is deleted
+        db.Index('ix_application_transcript', 'transcript'),
+        db.Index('ix_application_cv', 'cv'),
+        db.Index('ix_application_photo', 'photo')
+    )
+    
+    def to_dict(self, fields=None):
+        """
+        Serialize the application. `fields` limits the output to those keys,
+        and only those attributes are read, so columns left unloaded by
+        load_only() aren't fetched.
+        """
+        return application_serializer(tuple(fields) if fields else APPLICATION_FIELDS)(self)
+
+# Highest scores first; serves the top-k shortlist over all applications
+db.Index('ix_application_ranking_score', Application.ranking_score.desc(), Application.id)
+
+# Keys of Application.to_dict(), in column order
+APPLICATION_FIELDS = tuple(column.key for column in Application.__table__.columns)
+
+@lru_cache(maxsize=64)
+def application_serializer(fields):
+    """Compiled serializer for a tuple of Application fields, cached per fieldset."""
+    return compile_serializer(fields)
+
+class University(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200), nullable=False)
+    name_key = db.Column(db.String(200), unique=True, nullable=False)  # Lowercased, whitespace-collapsed name
+    
     def to_dict(self):
         return {
             'id': self.id,
-            'user_id': self.user_id,
-            'first_name': self.first_name,
-            'middle_name': self.middle_name,
-            'last_name': self.last_name,
-            'contact_number': self.contact_number,
-            'gender': self.gender,
-            'email': self.email,
-            'final_percentage': self.final_percentage,
-            'tentative_ranking': self.tentative_ranking,
-            'final_year_project': self.final_year_project,
-            'other_projects': self.other_projects,
-            'publications': self.publications,
-            'target_universities': self.target_universities,
-            'applied_universities': self.applied_universities,
-            'accepted_universities': self.accepted_universities,
-            'enrolled_university': self.enrolled_university,
-            'enrollment_status': self.enrollment_status,
-            'study_program': self.study_program,
-            'admission_year': self.admission_year,
-            'scholarship_status': self.scholarship_status,
-            'extracurricular': self.extracurricular,
-            'professional_experience': self.professional_experience,
-            'strong_points': self.strong_points,
-            'weak_points': self.weak_points,
-            'transcript': self.transcript,
-            'cv': self.cv,
-            'photo': self.photo,
-            'preferred_programs': self.preferred_programs,
-            'references': self.references,
-            'statement_of_purpose': self.statement_of_purpose,
-            'intended_research_areas': self.intended_research_areas,
-            'english_proficiency': self.english_proficiency,
-            'leadership_experience': self.leadership_experience,
-            'availability_to_start': self.availability_to_start,
-            'additional_certifications': self.additional_certifications,
-            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-            'updated_at': self.updated_at.strftime('%Y-%m-%d %H:%M:%S')
+            'name': self.name
         }
 
+class ApplicationUniversity(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    application_id = db.Column(db.Integer, db.ForeignKey('application.id', ondelete='CASCADE'), nullable=False, index=True)
+    university_id = db.Column(db.Integer, db.ForeignKey('university.id'), nullable=False)
+    status = db.Column(db.String(20), nullable=False)  # 'target', 'applied', 'accepted', 'enrolled'
+    
+    university = db.relationship('University', lazy='joined')
+    
+    __table_args__ = (
+        db.UniqueConstraint('application_id', 'university_id', 'status'),
+        db.Index('ix_application_university_lookup', 'university_id', 'status', 'application_id'),
+    )
+
+class ApplicationProgram(db.Model):
+    """A program named in an application's study_program or preferred_programs, with a copy of its score."""
+    id = db.Column(db.Integer, primary_key=True)
+    application_id = db.Column(db.Integer, db.ForeignKey('application.id', ondelete='CASCADE'), nullable=False)
+    name = db.Column(db.String(200), nullable=False)
+    program_key = db.Column(db.String(200), nullable=False)  # Lowercased, whitespace-collapsed name
+    is_study = db.Column(db.Boolean, nullable=False, default=False)  # Named in study_program
+    is_preferred = db.Column(db.Boolean, nullable=False, default=False)  # Named in preferred_programs
+    score = db.Column(db.Float)  # Application.ranking_score, kept here so shortlists are one index range scan
+    
+    __table_args__ = (
+        db.UniqueConstraint('application_id', 'program_key'),
+    )
+
+# Highest scores first within a program
+db.Index('ix_application_program_rank', ApplicationProgram.program_key, ApplicationProgram.score.desc(), ApplicationProgram.application_id)
+
+class ApplicationTombstone(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    application_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow)
+    change_seq = db.Column(db.BigInteger, index=True)  # Shares the sequence of Application.change_seq
+
+class ChangeCounter(db.Model):
+    """Change sequence bookkeeping: the last number handed out, and the newest tombstone pruned."""
+    id = db.Column(db.Integer, primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+
+class ApplicationStatistic(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # 'total', 'status' or 'university'
+    key = db.Column(db.String(200), nullable=False, default='')
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        db.UniqueConstraint('kind', 'key'),
+    )
+
 class File(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -140,14 +227,109 @@ class File(db.Model):
     mime_type = db.Column(db.String(100))
     file_size = db.Column(db.Integer)  # Size in bytes
     upload_date = db.Column(db.DateTime, default=datetime.utcnow)
+    blob_id = db.Column(db.Integer, db.ForeignKey('blob.id'), nullable=True)  # Stored content; None for files uploaded before the blob store
+    
+    blob = db.relationship('Blob', lazy='joined')
+    
+    def to_dict(self):
+        return serialize_file(self)
+
+serialize_file = compile_serializer(['id', 'user_id', 'original_name', 'file_type', 'mime_type', 'file_size', 'upload_date'])
+
+class Blob(db.Model):
+    """File content stored once per SHA-256 digest and shared by File rows."""
+    id = db.Column(db.Integer, primary_key=True)
+    sha256 = db.Column(db.String(64), unique=True, nullable=False)
+    path = db.Column(db.String(500), nullable=False)
+    size = db.Column(db.Integer, nullable=False)
+    ref_count = db.Column(db.Integer, default=0, nullable=False)  # Number of File rows pointing here
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ReportJob(db.Model):
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    created_by = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='SET NULL'), nullable=True)
+    status = db.Column(db.String(20), default='queued')  # 'queued', 'running', 'completed', 'failed'
+    filters = db.Column(db.Text)  # JSON-encoded search filters selecting the applications
+    total = db.Column(db.Integer, default=0)
+    completed = db.Column(db.Integer, default=0)
+    result_path = db.Column(db.String(500))
+    error = db.Column(db.Text)
+    attempts = db.Column(db.Integer, default=0)  # Times a worker has started the job
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)  # Last progress from the worker running it
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'total': self.total,
+            'completed': self.completed,
+            'progress': round(self.completed / self.total * 100, 1) if self.total else (100.0 if self.status == 'completed' else 0.0),
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+
+class ImportJob(db.Model):
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    created_by = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='SET NULL'), nullable=True)
+    status = db.Column(db.String(20), default='queued')  # 'queued', 'running', 'completed', 'failed'
+    total = db.Column(db.Integer, default=0)  # Rows in the import file
+    processed = db.Column(db.Integer, default=0)  # Rows created or rejected so far
+    created = db.Column(db.Integer, default=0)
+    errors = db.Column(db.Text)  # JSON-encoded list of per-row errors
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime, default=datetime.utcnow)  # Last sign of life from the worker running it
+    
+    def to_dict(self):
+        errors = json.loads(self.errors or '[]')
+        return {
+            'id': self.id,
+            'status': self.status,
+            'total': self.total,
+            'processed': self.processed,
+            'created': self.created,
+            'failed': len(errors),
+            'errors': errors,
+            'progress': round(self.processed / self.total * 100, 1) if self.total else (100.0 if self.status == 'completed' else 0.0),
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+
+class UploadSession(db.Model):
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    application_id = db.Column(db.Integer, nullable=True)
+    original_name = db.Column(db.String(255), nullable=False)
+    file_type = db.Column(db.String(50), nullable=False)
+    total_size = db.Column(db.Integer, nullable=False)  # Declared size in bytes
+    received_size = db.Column(db.Integer, default=0)  # Bytes written so far; the next chunk offset
+    temp_path = db.Column(db.String(500), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     def to_dict(self):
         return {
             'id': self.id,
-            'user_id': self.user_id,
             'original_name': self.original_name,
             'file_type': self.file_type,
-            'mime_type': self.mime_type,
-            'file_size': self.file_size,
-            'upload_date': self.upload_date.strftime('%Y-%m-%d %H:%M:%S')
-        }
\ No newline at end of file
+            'total_size': self.total_size,
+            'offset': self.received_size,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
+        }
+
+class SchemaMigration(db.Model):
+    """Migrations from migrations.MIGRATIONS that have been applied to this database."""
+    __tablename__ = 'schema_migrations'
+    version = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    name = db.Column(db.String(100), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,301 @@
+import base64
+import json
+
+from sqlalchemy import and_, or_, String
+from sqlalchemy.orm import load_only
+
+from models import db, User, Application, ApplicationUniversity, APPLICATION_FIELDS
+from universities import matching_university_ids
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Named field sets for application responses; None means every field
+APPLICATION_VIEWS = {
+    'summary': [
+        'id', 'user_id', 'first_name', 'last_name', 'email', 'contact_number', 'gender',
+        'final_percentage', 'tentative_ranking', 'ranking_score', 'enrollment_status', 'enrolled_university',
+        'created_at', 'updated_at'
+    ],
+    'full': None
+}
+
+# Sort keys accepted by the admin dashboard. Each key maps to an ordered list of
+# (column expression, descending) pairs; the primary key is always the final
+# tie-breaker so that every row has a unique position for keyset pagination.
+SORT_KEYS = {
+    'id': [
+        (Application.id, False)
+    ],
+    'name': [
+        (db.func.coalesce(Application.first_name, ''), False),
+        (db.func.coalesce(Application.last_name, ''), False),
+        (Application.id, False)
+    ],
+    'email': [
+        (db.func.coalesce(Application.email, ''), False),
+        (Application.id, False)
+    ],
+    'percentage': [
+        (db.func.coalesce(Application.final_percentage, 0), True),
+        (Application.id, False)
+    ],
+    'score': [
+        (db.func.coalesce(Application.ranking_score, 0), True),
+        (Application.id, False)
+    ]
+}
+
+
+def encode_cursor(values):
+    """Encode the sort key values of the last row on a page as an opaque cursor."""
+    raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def cursor_value_matches(value, expected_type):
+    # bool is a subclass of int, and JSON can't tell 0 from 0.0
+    if isinstance(value, bool):
+        return False
+    if expected_type is float:
+        return isinstance(value, (int, float))
+    return isinstance(value, expected_type)
+
+
+def decode_cursor(cursor, types):
+    """
+    Decode a cursor produced by encode_cursor, checking it holds one value of
+    each of `types` (str, int or float) in order.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, UnicodeError):
+        raise ValueError('Invalid cursor')
+
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError('Invalid cursor')
+    if not all(cursor_value_matches(value, expected_type) for value, expected_type in zip(values, types)):
+        raise ValueError('Invalid cursor')
+    return values
+
+
+def parse_float(value, name):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{name} must be a number')
+
+
+def apply_application_filters(query, args):
+    """
+    Apply the dashboard filters (search, percentage range, gender, enrollment
+    status and university) from the request arguments to an Application query.
+    """
+    search = (args.get('q') or '').strip()
+    if search:
+        pattern = f'%{search}%'
+        full_name = db.func.coalesce(Application.first_name, '') + ' ' + \
+            db.func.coalesce(Application.last_name, '')
+        query = query.filter(or_(
+            db.cast(Application.id, String).like(pattern),
+            Application.email.ilike(pattern),
+            Application.first_name.ilike(pattern),
+            Application.last_name.ilike(pattern),
+            Application.contact_number.ilike(pattern),
+            full_name.ilike(pattern)
+        ))
+
+    min_percentage = args.get('min_percentage')
+    if min_percentage not in (None, ''):
+        query = query.filter(Application.final_percentage >= parse_float(min_percentage, 'min_percentage'))
+
+    max_percentage = args.get('max_percentage')
+    if max_percentage not in (None, ''):
+        query = query.filter(Application.final_percentage <= parse_float(max_percentage, 'max_percentage'))
+
+    gender = args.get('gender')
+    if gender:
+        query = query.filter(Application.gender == gender)
+
+    enrollment_status = args.get('enrollment_status')
+    if enrollment_status:
+        query = query.filter(Application.enrollment_status == enrollment_status)
+
+    university = (args.get('university') or '').strip()
+    if university:
+        # Match against the (small) university table, then use the link index
+        query = query.filter(Application.id.in_(
+            db.session.query(ApplicationUniversity.application_id)
+            .filter(ApplicationUniversity.university_id.in_(matching_university_ids(university)))
+        ))
+
+    return query
+
+
+def keyset_predicate(sort_columns, values):
+    """
+    Build the WHERE clause selecting rows strictly after `values` in the order
+    described by `sort_columns`. Written out as nested OR/AND terms rather than
+    a row-value comparison so that mixed ascending/descending keys work.
+    """
+    clauses = []
+    for i, (column, descending) in enumerate(sort_columns):
+        equal_prefix = [sort_columns[j][0] == values[j] for j in range(i)]
+        after = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*equal_prefix, after))
+    return or_(*clauses)
+
+
+def parse_page_size(value):
+    if value in (None, ''):
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('limit must be an integer')
+    if limit < 1:
+        raise ValueError('limit must be positive')
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def parse_fieldset(args, default_view='full'):
+    """
+    Return the Application fields requested with `fields` (comma-separated)
+    or `view` (a name in APPLICATION_VIEWS), or None for every field. The id
+    is always included. Raises ValueError for unknown names.
+    """
+    fields = args.get('fields')
+    view = args.get('view')
+    if fields and view:
+        raise ValueError('Pass either fields or view, not both')
+
+    if fields:
+        names = [name.strip() for name in fields.split(',') if name.strip()]
+        unknown = [name for name in names if name not in APPLICATION_FIELDS]
+        if unknown:
+            raise ValueError(f'Unknown fields: {", ".join(unknown)}')
+        return ['id'] + [name for name in dict.fromkeys(names) if name != 'id']
+
+    view = view or default_view
+    if view not in APPLICATION_VIEWS:
+        raise ValueError(f'view must be one of: {", ".join(APPLICATION_VIEWS)}')
+    return APPLICATION_VIEWS[view]
+
+
+def load_fields(query, fields, *required):
+    """Limit the Application columns `query` loads to `fields` plus `required`; None loads everything."""
+    if fields is None:
+        return query
+    return query.options(load_only(*[getattr(Application, name) for name in dict.fromkeys(list(fields) + list(required))]))
+
+
+def search_applications(args, fields=None):
+    """
+    Run a filtered, sorted, keyset-paginated application search.
+
+    Returns a tuple of (applications, next_cursor); next_cursor is None on the
+    last page. Only `fields` are loaded when given. Raises ValueError for
+    invalid arguments.
+    """
+    sort_by = args.get('sort_by') or 'id'
+    if sort_by not in SORT_KEYS:
+        raise ValueError(f'sort_by must be one of: {", ".join(SORT_KEYS)}')
+    sort_columns = SORT_KEYS[sort_by]
+    limit = parse_page_size(args.get('limit'))
+
+    query = load_fields(apply_application_filters(Application.query, args), fields)
+
+    cursor = args.get('cursor')
+    if cursor:
+        values = decode_cursor(cursor, [column.type.python_type for column, _ in sort_columns])
+        query = query.filter(keyset_predicate(sort_columns, values))
+
+    order_by = [column.desc() if descending else column.asc() for column, descending in sort_columns]
+    key_columns = [column.label(f'sort_key_{i}') for i, (column, _) in enumerate(sort_columns)]
+
+    # Fetch one extra row to find out whether another page exists
+    rows = query.add_columns(*key_columns).order_by(*order_by).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(list(rows[-1][1:]))
+
+    return [row[0] for row in rows], next_cursor
+
+
+def application_list_version(args):
+    """
+    Return (latest updated_at, row count) over the applications matching the
+    filters. Any insert, update or delete in the result set changes one of them.
+    """
+    query = apply_application_filters(
+        db.session.query(db.func.max(Application.updated_at), db.func.count(Application.id)),
+        args
+    )
+    return query.one()
+
+
+# Application columns embedded in the admin user listing
+APPLICATION_SUMMARY_FIELDS = [
+    'gender',
+    'final_percentage',
+    'tentative_ranking',
+    'preferred_programs',
+    'english_proficiency',
+    'enrollment_status',
+    'enrolled_university'
+]
+
+
+def list_users_with_applications(args):
+    """
+    List users ordered by id together with their application id, using one
+    query per page. With include_application=true a summary of the
+    application is embedded as well.
+
+    Returns a tuple of (user dicts, next_cursor). Raises ValueError for
+    invalid arguments.
+    """
+    limit = parse_page_size(args.get('limit'))
+    include_application = args.get('include_application', '').lower() in ('1', 'true', 'yes')
+
+    # A user is expected to have at most one application; pick the earliest
+    # one so the join can never duplicate user rows. The subquery is
+    # correlated, so only the users on the requested page are looked up.
+    application_id = db.session.query(db.func.min(Application.id)) \
+        .filter(Application.user_id == User.id) \
+        .correlate(User).scalar_subquery()
+
+    columns = [User, application_id.label('application_id')]
+    if include_application:
+        columns += [getattr(Application, field) for field in APPLICATION_SUMMARY_FIELDS]
+
+    query = db.session.query(*columns)
+    if include_application:
+        query = query.outerjoin(Application, Application.id == application_id)
+
+    cursor = args.get('cursor')
+    if cursor:
+        query = query.filter(User.id > decode_cursor(cursor, [int])[0])
+
+    rows = query.order_by(User.id).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1][0].id])
+
+    users = []
+    for row in rows:
+        user, application_id = row[0], row[1]
+        user_dict = user.to_dict()
+        user_dict['has_application'] = application_id is not None
+        if application_id is not None:
+            user_dict['application_id'] = application_id
+        if include_application:
+            user_dict['application'] = dict(zip(APPLICATION_SUMMARY_FIELDS, row[2:])) \
+                if application_id is not None else None
+        users.append(user_dict)
+
+    return users, next_cursor
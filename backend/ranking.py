@@ -0,0 +1,364 @@
+import json
+import os
+import re
+
+from flask import current_app
+from sqlalchemy import event, inspect
+
+from changes import reserve_change_numbers
+from models import db, Application, ApplicationProgram
+from queries import load_fields
+
+# Default weight of each feature in the ranking score; only the ratios matter
+DEFAULT_RANKING_WEIGHTS = {
+    'final_percentage': 0.5,
+    'tentative_ranking': 0.2,
+    'english_proficiency': 0.15,
+    'publications': 0.1,
+    'other_projects': 0.05
+}
+
+RANKING_FEATURES = list(DEFAULT_RANKING_WEIGHTS)
+
+# Application columns holding program names, keyed by the link flag they set
+PROGRAM_FIELDS = {
+    'is_study': 'study_program',
+    'is_preferred': 'preferred_programs'
+}
+
+# Ranks given without a cohort size ("12") are read as out of this many students
+DEFAULT_COHORT_SIZE = 100
+
+# Publications or projects beyond this many don't raise the score further
+MAX_LISTED_ITEMS = 5
+
+ENGLISH_LEVELS = {
+    'beginner': 0.25,
+    'elementary': 0.25,
+    'intermediate': 0.5,
+    'upper intermediate': 0.65,
+    'advanced': 0.75,
+    'proficient': 0.9,
+    'fluent': 1.0,
+    'native': 1.0
+}
+
+# Test name -> highest possible score
+ENGLISH_TESTS = {
+    'ielts': 9,
+    'toefl': 120,
+    'pte': 90,
+    'duolingo': 160
+}
+
+RESCORE_BATCH_SIZE = 1000
+
+NUMBER = r'(\d+(?:\.\d+)?)'
+
+
+def ranking_weights():
+    return current_app.config['RANKING_WEIGHTS']
+
+
+def validate_weights(weights):
+    """Raise ValueError unless `weights` maps known features to non-negative numbers with a positive total."""
+    if not isinstance(weights, dict) or not weights:
+        raise ValueError('RANKING_WEIGHTS must be a non-empty dict')
+    unknown = [name for name in weights if name not in RANKING_FEATURES]
+    if unknown:
+        raise ValueError(f'Unknown ranking features: {", ".join(unknown)}. Use: {", ".join(RANKING_FEATURES)}')
+    if any(not isinstance(weight, (int, float)) or weight < 0 for weight in weights.values()):
+        raise ValueError('Ranking weights must be non-negative numbers')
+    if not sum(weights.values()):
+        raise ValueError('At least one ranking weight must be positive')
+
+
+def load_ranking_weights():
+    """
+    Weights from the RANKING_WEIGHTS environment variable (a JSON object) or
+    the JSON file named by RANKING_WEIGHTS_FILE, else the defaults. Features
+    left out of a configured object weigh nothing. Raises ValueError for
+    unreadable or invalid weights.
+    """
+    text = os.environ.get('RANKING_WEIGHTS')
+    source = 'RANKING_WEIGHTS'
+    path = os.environ.get('RANKING_WEIGHTS_FILE')
+    if not text and path:
+        source = path
+        try:
+            with open(path) as f:
+                text = f.read()
+        except OSError as e:
+            raise ValueError(f'Cannot read RANKING_WEIGHTS_FILE: {e}')
+    if not text:
+        return dict(DEFAULT_RANKING_WEIGHTS)
+    try:
+        weights = json.loads(text)
+    except json.JSONDecodeError:
+        raise ValueError(f'{source} is not valid JSON')
+    validate_weights(weights)
+    return weights
+
+
+def program_key(name):
+    """Normalize a program name for matching: lowercase with collapsed whitespace."""
+    return ' '.join(name.lower().split())
+
+
+def split_programs(value):
+    """Split a free-text list of programs (comma, semicolon or newline separated)."""
+    names = []
+    seen = set()
+    for part in re.split(r'[,;\n]', value or ''):
+        name = ' '.join(part.split())
+        if name and program_key(name) not in seen:
+            seen.add(program_key(name))
+            names.append(name[:200])
+    return names
+
+
+def wanted_programs(values):
+    """Map program keys to link attributes (name and flags) for an application's column values."""
+    programs = {}
+    for flag, field in PROGRAM_FIELDS.items():
+        for name in split_programs(values.get(field)):
+            link = programs.setdefault(program_key(name), dict({'name': name}, **{f: False for f in PROGRAM_FIELDS}))
+            link[flag] = True
+    return programs
+
+
+def percentage_feature(value):
+    try:
+        return min(max(float(value), 0.0), 100.0) / 100
+    except (TypeError, ValueError):
+        return None
+
+
+def ranking_feature(value):
+    """
+    Read a class rank as 0-1, higher being better: "Top 10%" (the form's
+    values), "12/150" or "12 of 150", or a bare rank out of DEFAULT_COHORT_SIZE.
+    """
+    text = (value or '').lower()
+    match = re.search(NUMBER + r'\s*%', text)
+    if match:
+        return min(max(1 - float(match.group(1)) / 100, 0.0), 1.0)
+    match = re.search(NUMBER + r'\s*(?:/|of|out of)\s*' + NUMBER, text)
+    if match:
+        rank, size = float(match.group(1)), float(match.group(2))
+    else:
+        match = re.search(NUMBER, text)
+        if not match:
+            return None
+        rank, size = float(match.group(1)), DEFAULT_COHORT_SIZE
+    if rank < 1 or size < 1:
+        return None
+    return max(1 - (rank - 1) / size, 0.0)
+
+
+def english_feature(value):
+    """Read English proficiency as 0-1 from a test score ("IELTS 7.5") or a level ("Advanced")."""
+    text = (value or '').lower()
+    for test, maximum in ENGLISH_TESTS.items():
+        match = re.search(test + r'\D*' + NUMBER, text)
+        if match:
+            return min(float(match.group(1)) / maximum, 1.0)
+    # Longest names first so "upper intermediate" wins over "intermediate"
+    for level in sorted(ENGLISH_LEVELS, key=len, reverse=True):
+        if level in text:
+            return ENGLISH_LEVELS[level]
+    return None
+
+
+def count_feature(value):
+    """Number of listed items (one per line or semicolon-separated), capped at MAX_LISTED_ITEMS, as 0-1."""
+    items = [item for item in re.split(r'[;\n]', value or '') if item.strip()]
+    return min(len(items), MAX_LISTED_ITEMS) / MAX_LISTED_ITEMS
+
+
+FEATURE_READERS = {
+    'final_percentage': percentage_feature,
+    'tentative_ranking': ranking_feature,
+    'english_proficiency': english_feature,
+    'publications': count_feature,
+    'other_projects': count_feature
+}
+
+
+def application_score(values, weights):
+    """
+    Weighted score (0-100) of an application's column values, a dict
+    holding at least RANKING_FEATURES. Missing or unreadable values count
+    as zero, so incomplete applications rank below complete ones.
+    """
+    total = 0.0
+    for name, weight in weights.items():
+        if weight:
+            total += weight * (FEATURE_READERS[name](values.get(name)) or 0.0)
+    return round(total / sum(weights.values()) * 100, 2)
+
+
+def sync_application_programs(application):
+    """
+    Bring the application's program links in line with its program fields
+    and score. Runs inside the caller's transaction.
+    """
+    wanted = wanted_programs({field: getattr(application, field) for field in PROGRAM_FIELDS.values()})
+
+    current = {}
+    for link in list(application.program_links):
+        if link.program_key in wanted and link.program_key not in current:
+            current[link.program_key] = link
+        else:
+            application.program_links.remove(link)
+
+    for key, attributes in wanted.items():
+        link = current.get(key)
+        if link is None:
+            link = ApplicationProgram(program_key=key)
+            application.program_links.append(link)
+        for name, value in dict(attributes, score=application.ranking_score).items():
+            if getattr(link, name) != value:
+                setattr(link, name, value)
+
+
+def score_applications(session, flush_context, instances):
+    """
+    before_flush hook: recompute the score of every new or changed
+    application, and its program links when the score or programs changed.
+    Overwrites any ranking_score set directly.
+    """
+    weights = ranking_weights()
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Application) or obj in session.deleted:
+            continue
+        state = inspect(obj)
+        score = application_score({name: getattr(obj, name) for name in RANKING_FEATURES}, weights)
+        programs_changed = any(state.attrs[field].history.has_changes() for field in PROGRAM_FIELDS.values())
+        if score == obj.ranking_score and not programs_changed:
+            continue
+        obj.ranking_score = score
+        sync_application_programs(obj)
+
+
+def listen_for_ranking_inputs(session):
+    """Keep ranking scores and program links in sync with every flush made through `session`."""
+    event.listen(session, 'before_flush', score_applications)
+
+
+def rescore_applications(weights=None):
+    """
+    Recompute every stored score in batches, e.g. after RANKING_WEIGHTS
+    changed, writing only the scores that moved. Returns the number of
+    applications whose score changed.
+    """
+    weights = weights or ranking_weights()
+    table = Application.__table__
+    # Bulk updates skip the flush hooks, so give changed rows their change
+    # feed numbers here or sync clients would never see the new scores
+    update = table.update().where(table.c.id == db.bindparam('b_id')).values(
+        ranking_score=db.bindparam('b_score'),
+        change_seq=db.bindparam('b_seq')
+    )
+    columns = [Application.id, Application.ranking_score] + [getattr(Application, name) for name in RANKING_FEATURES]
+
+    changed = 0
+    last_id = 0
+    while True:
+        rows = db.session.query(*columns).filter(Application.id > last_id) \
+            .order_by(Application.id).limit(RESCORE_BATCH_SIZE).all()
+        if not rows:
+            break
+        scores = [(row.id, application_score(row._asdict(), weights), row.ranking_score) for row in rows]
+        updates = [{'b_id': application_id, 'b_score': score} for application_id, score, old in scores if score != old]
+        if updates:
+            first_change = reserve_change_numbers(db.session, len(updates))
+            for offset, values in enumerate(updates):
+                values['b_seq'] = first_change + offset
+            db.session.execute(update, updates)
+        db.session.commit()
+        changed += len(updates)
+        last_id = rows[-1].id
+
+    # Copy the new scores onto the program links in one statement
+    links = ApplicationProgram.__table__
+    db.session.execute(links.update().values(
+        score=db.select(table.c.ranking_score).where(table.c.id == links.c.application_id).scalar_subquery()
+    ))
+    db.session.commit()
+    return changed
+
+
+def backfill_application_programs():
+    """Rebuild program links for every application. Returns the number processed."""
+    processed = 0
+    last_id = 0
+    while True:
+        applications = Application.query.filter(Application.id > last_id) \
+            .order_by(Application.id).limit(RESCORE_BATCH_SIZE).all()
+        if not applications:
+            break
+        for application in applications:
+            sync_application_programs(application)
+        db.session.commit()
+        processed += len(applications)
+        last_id = applications[-1].id
+    return processed
+
+
+def ensure_rankings():
+    """Score applications and link their programs once for databases created before ranking existed."""
+    if Application.query.filter(Application.ranking_score == None).first() is not None:
+        rescore_applications()
+    if ApplicationProgram.query.first() is None:
+        has_programs = Application.query.filter(db.or_(*[
+            db.and_(getattr(Application, field) != None, getattr(Application, field) != '')
+            for field in PROGRAM_FIELDS.values()
+        ])).first()
+        if has_programs:
+            backfill_application_programs()
+
+
+def parse_program_source(value):
+    if value in (None, '', 'any'):
+        return None
+    if value not in ('study', 'preferred'):
+        raise ValueError('source must be one of: study, preferred, any')
+    return value
+
+
+def top_applications(program, source, limit, fields=None):
+    """
+    The `limit` highest-scoring applications as (application, score) pairs,
+    optionally only those naming `program` (exact, case-insensitive) in
+    study_program and/or preferred_programs as `source` selects. Both cases
+    read the rows in score order from an index and stop after `limit`.
+    """
+    if program:
+        query = db.session.query(Application, ApplicationProgram.score) \
+            .join(ApplicationProgram, ApplicationProgram.application_id == Application.id) \
+            .filter(ApplicationProgram.program_key == program_key(program), ApplicationProgram.score != None)
+        if source == 'study':
+            query = query.filter(ApplicationProgram.is_study == True)
+        elif source == 'preferred':
+            query = query.filter(ApplicationProgram.is_preferred == True)
+        query = query.order_by(ApplicationProgram.score.desc(), ApplicationProgram.application_id)
+    else:
+        query = db.session.query(Application, Application.ranking_score) \
+            .filter(Application.ranking_score != None) \
+            .order_by(Application.ranking_score.desc(), Application.id)
+    return load_fields(query, fields).limit(limit).all()
+
+
+def program_counts():
+    """Programs named in applications, with how many name each as study or preferred program, by name."""
+    rows = db.session.query(
+        ApplicationProgram.program_key,
+        db.func.min(ApplicationProgram.name),
+        db.func.sum(db.case((ApplicationProgram.is_study == True, 1), else_=0)),
+        db.func.sum(db.case((ApplicationProgram.is_preferred == True, 1), else_=0))
+    ).group_by(ApplicationProgram.program_key).order_by(ApplicationProgram.program_key)
+    return [
+        {'program': name, 'study': study or 0, 'preferred': preferred or 0}
+        for key, name, study, preferred in rows
+    ]
@@ -0,0 +1,113 @@
+import io
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfgen import canvas
+from werkzeug.utils import secure_filename
+
+# Layout mirrors the per-student report built in the admin dashboard:
+# coordinates are in millimetres from the top-left corner of an A4 page.
+PAGE_HEIGHT_MM = 297
+BOTTOM_MARGIN_MM = 20
+LINE_HEIGHT_MM = 7
+PRIMARY_COLOR = (13 / 255, 110 / 255, 253 / 255)
+
+
+class ReportWriter:
+    """Small wrapper around a reportlab canvas using top-left millimetre coordinates."""
+
+    def __init__(self, buffer):
+        self.pdf = canvas.Canvas(buffer, pagesize=A4)
+
+    def text(self, x, y, value, size=12, color=(0, 0, 0), align='left'):
+        self.pdf.setFont('Helvetica', size)
+        self.pdf.setFillColorRGB(*color)
+        if align == 'center':
+            self.pdf.drawCentredString(x * mm, (PAGE_HEIGHT_MM - y) * mm, value)
+        else:
+            self.pdf.drawString(x * mm, (PAGE_HEIGHT_MM - y) * mm, value)
+
+    def wrapped(self, x, y, value, width, size=12):
+        """Draw text wrapped to `width` mm, starting a new page when needed. Returns the next y."""
+        for line in simpleSplit(value, 'Helvetica', size, width * mm) or ['']:
+            if y > PAGE_HEIGHT_MM - BOTTOM_MARGIN_MM:
+                self.pdf.showPage()
+                y = BOTTOM_MARGIN_MM
+            self.text(x, y, line, size=size)
+            y += LINE_HEIGHT_MM
+        return y
+
+    def section(self, y, title):
+        """Draw a section heading, starting a new page if it would not fit. Returns the next y."""
+        if y > PAGE_HEIGHT_MM - BOTTOM_MARGIN_MM - 3 * LINE_HEIGHT_MM:
+            self.pdf.showPage()
+            y = BOTTOM_MARGIN_MM
+        self.text(20, y, title, size=14, color=PRIMARY_COLOR)
+        return y + 10
+
+    def line(self, x1, y1, x2, y2, color=PRIMARY_COLOR):
+        self.pdf.setStrokeColorRGB(*color)
+        self.pdf.line(x1 * mm, (PAGE_HEIGHT_MM - y1) * mm, x2 * mm, (PAGE_HEIGHT_MM - y2) * mm)
+
+    def save(self):
+        self.pdf.save()
+
+
+def report_filename(data):
+    name = secure_filename(f"{data.get('first_name') or 'unknown'}_{data.get('last_name') or 'unknown'}")
+    return f"{data['id']}_{name}_report.pdf"
+
+
+def render_application_pdf(data, generated_at):
+    """
+    Render the student application report for one application.
+
+    `data` is the dict produced by Application.to_dict(). Runs in a worker
+    process, so it must not touch the database or the Flask app.
+    Returns a tuple of (filename, pdf bytes).
+    """
+    buffer = io.BytesIO()
+    report = ReportWriter(buffer)
+
+    # Title
+    report.text(105, 15, 'Student Application Report', size=20, color=PRIMARY_COLOR, align='center')
+    report.line(20, 20, 190, 20)
+
+    # Student info
+    report.text(20, 30, f'Report generated: {generated_at}')
+    report.text(20, 40, f"Student: {data.get('first_name') or ''} {data.get('last_name') or ''}")
+    report.text(20, 50, f"Email: {data.get('email') or ''}")
+    report.text(20, 60, f"Contact: {data.get('contact_number') or ''}")
+
+    # Academic details
+    report.text(20, 75, 'Academic Details', size=14, color=PRIMARY_COLOR)
+    percentage = data.get('final_percentage')
+    report.text(30, 85, 'Final Percentage:')
+    report.text(130, 85, f'{percentage}%' if percentage is not None else 'N/A')
+    report.text(30, 95, 'Tentative Ranking:')
+    report.text(130, 95, data.get('tentative_ranking') or 'N/A')
+    report.text(30, 105, 'English Proficiency:')
+    report.text(130, 105, data.get('english_proficiency') or 'N/A')
+    report.text(30, 115, 'Preferred Programs:')
+    y = report.wrapped(130, 115, data.get('preferred_programs') or 'N/A', 70) + 8
+
+    # Enrollment status
+    y = report.section(y, 'Enrollment Status')
+    report.text(30, y, 'Status:')
+    report.text(130, y, (data.get('enrollment_status') or 'planning').capitalize())
+    y += LINE_HEIGHT_MM
+    if data.get('enrolled_university'):
+        report.text(30, y, 'Enrolled University:')
+        y = report.wrapped(130, y, data['enrolled_university'], 70)
+    y += 8
+
+    # Strengths and weaknesses
+    y = report.section(y, 'Strengths & Weaknesses')
+    y = report.wrapped(20, y, 'Strengths:', 160)
+    y = report.wrapped(30, y, data.get('strong_points') or 'N/A', 160) + 8
+    y = report.wrapped(20, y, 'Weaknesses:', 160)
+    report.wrapped(30, y, data.get('weak_points') or 'N/A', 160)
+
+    report.save()
+    return report_filename(data), buffer.getvalue()
@@ -0,0 +1,212 @@
+import html
+import re
+
+from flask import current_app
+from sqlalchemy import or_, text
+
+from models import db, Application
+
+# Free-text Application columns covered by the search index
+SEARCH_FIELDS = [
+    'statement_of_purpose',
+    'final_year_project',
+    'other_projects',
+    'publications',
+    'intended_research_areas',
+    'professional_experience'
+]
+
+DEFAULT_RESULT_LIMIT = 20
+MAX_RESULT_LIMIT = 100
+
+
+# Placeholders for the highlight tags while a snippet is still raw text
+MARK_START = '\ue000'
+MARK_END = '\ue001'
+
+
+def tokenize_query(query):
+    """Split a user-supplied query into plain search terms."""
+    return re.findall(r'\w+', query or '')
+
+
+def highlight(snippet):
+    """
+    HTML-escape a snippet of application text, then turn the placeholders
+    around matched terms into <mark> tags, so the result is safe to render
+    as HTML.
+    """
+    return html.escape(snippet or '').replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+
+class SearchIndex:
+    """Interface for keeping application free-text fields searchable."""
+
+    def ensure_index(self):
+        """Create the index if needed and populate it from existing applications."""
+        raise NotImplementedError
+
+    def rebuild(self):
+        """Drop and repopulate the index, e.g. after applications were bulk loaded."""
+        raise NotImplementedError
+
+    def index_application(self, application):
+        """Add or replace an application in the index (within the current transaction)."""
+        raise NotImplementedError
+
+    def remove_application(self, application_id):
+        """Remove an application from the index (within the current transaction)."""
+        raise NotImplementedError
+
+    def search(self, query, limit=DEFAULT_RESULT_LIMIT, offset=0):
+        """
+        Return a list of (application_id, score, snippet) tuples ordered by
+        relevance, best match first.
+        """
+        raise NotImplementedError
+
+
+class SQLiteSearchIndex(SearchIndex):
+    """Search index backed by an SQLite FTS5 virtual table ranked with bm25."""
+
+    table_name = 'application_fts'
+
+    def ensure_index(self):
+        exists = db.session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': self.table_name}
+        ).first()
+        if exists:
+            return
+
+        db.session.execute(text(
+            f"CREATE VIRTUAL TABLE {self.table_name} USING fts5("
+            f"{', '.join(SEARCH_FIELDS)}, tokenize = 'porter unicode61')"
+        ))
+
+        # Backfill applications created before the index existed
+        columns = ', '.join(SEARCH_FIELDS)
+        db.session.execute(text(
+            f"INSERT INTO {self.table_name} (rowid, {columns}) "
+            f"SELECT id, {columns} FROM {Application.__tablename__}"
+        ))
+        db.session.commit()
+
+    def rebuild(self):
+        db.session.execute(text(f"DROP TABLE IF EXISTS {self.table_name}"))
+        self.ensure_index()
+
+    def index_application(self, application):
+        self.remove_application(application.id)
+        params = {field: getattr(application, field) for field in SEARCH_FIELDS}
+        params['rowid'] = application.id
+        db.session.execute(text(
+            f"INSERT INTO {self.table_name} (rowid, {', '.join(SEARCH_FIELDS)}) "
+            f"VALUES (:rowid, {', '.join(':' + field for field in SEARCH_FIELDS)})"
+        ), params)
+
+    def remove_application(self, application_id):
+        db.session.execute(
+            text(f"DELETE FROM {self.table_name} WHERE rowid = :rowid"),
+            {'rowid': application_id}
+        )
+
+    def search(self, query, limit=DEFAULT_RESULT_LIMIT, offset=0):
+        terms = tokenize_query(query)
+        if not terms:
+            return []
+
+        # Quote every term so user input can't use FTS5 query syntax, and treat
+        # the last one as a prefix so partially typed words still match
+        match = ' '.join(f'"{term}"' for term in terms) + '*'
+
+        rows = db.session.execute(text(
+            f"SELECT rowid, bm25({self.table_name}) AS score, "
+            f"snippet({self.table_name}, -1, :mark_start, :mark_end, '...', 16) AS snippet "
+            f"FROM {self.table_name} WHERE {self.table_name} MATCH :match "
+            f"ORDER BY score LIMIT :limit OFFSET :offset"
+        ), {'match': match, 'limit': limit, 'offset': offset, 'mark_start': MARK_START, 'mark_end': MARK_END}).all()
+
+        # bm25() returns lower-is-better scores; flip them so higher means more relevant
+        return [(row.rowid, -row.score, highlight(row.snippet)) for row in rows]
+
+
+class LikeSearchIndex(SearchIndex):
+    """
+    Fallback for databases without FTS5. Nothing is stored; searches scan the
+    application table, so this is only suitable for small deployments.
+    """
+
+    def ensure_index(self):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def index_application(self, application):
+        pass
+
+    def remove_application(self, application_id):
+        pass
+
+    def search(self, query, limit=DEFAULT_RESULT_LIMIT, offset=0):
+        terms = tokenize_query(query)
+        if not terms:
+            return []
+
+        filters = []
+        for term in terms:
+            pattern = f'%{term}%'
+            filters.append(or_(*[getattr(Application, field).ilike(pattern) for field in SEARCH_FIELDS]))
+
+        applications = Application.query.filter(*filters).order_by(Application.id) \
+            .offset(offset).limit(limit).all()
+
+        results = []
+        for application in applications:
+            results.append((application.id, 0.0, self.make_snippet(application, terms[0])))
+        return results
+
+    @staticmethod
+    def make_snippet(application, term, width=60):
+        for field in SEARCH_FIELDS:
+            value = getattr(application, field) or ''
+            position = value.lower().find(term.lower())
+            if position >= 0:
+                start = max(position - width, 0)
+                end = position + len(term) + width
+                return highlight(
+                    ('...' if start > 0 else '') +
+                    value[start:position] + MARK_START + value[position:position + len(term)] + MARK_END +
+                    value[position + len(term):end] +
+                    ('...' if end < len(value) else '')
+                )
+        return ''
+
+
+def sqlite_supports_fts5():
+    """
+    Probe on a connection of its own: this can run in the middle of a
+    request's transaction, which a failed probe must not roll back.
+    """
+    with db.engine.connect() as connection:
+        try:
+            connection.execute(text("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(content)"))
+            connection.execute(text("DROP TABLE temp.fts5_probe"))
+            return True
+        except Exception:
+            return False
+        finally:
+            connection.rollback()
+
+
+def get_search_index():
+    """Return the search index for the current app, choosing an implementation on first use."""
+    index = current_app.extensions.get('search_index')
+    if index is None:
+        if db.engine.dialect.name == 'sqlite' and sqlite_supports_fts5():
+            index = SQLiteSearchIndex()
+        else:
+            index = LikeSearchIndex()
+        current_app.extensions['search_index'] = index
+    return index
@@ -0,0 +1,103 @@
+import os
+
+from flask import current_app, request, jsonify
+from werkzeug.utils import send_file as werkzeug_send_file
+
+from conditional import make_etag
+
+# How file bytes reach the client:
+#   'direct'           - streamed by the Python worker (Range and 304 handled here)
+#   'x-sendfile'       - X-Sendfile header for Apache mod_xsendfile / lighttpd
+#   'x-accel-redirect' - X-Accel-Redirect header for an nginx internal location
+FILE_SERVING_MODES = ['direct', 'x-sendfile', 'x-accel-redirect']
+
+# File ids can be reused once a file is deleted, so a plain file URL must be
+# revalidated; only a URL carrying the content hash (?v=<etag>) is cached for
+# a year without asking
+FILE_CACHE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def file_etag(file):
+    """Strong entity tag: the content hash, or the upload details for files outside the blob store."""
+    if file.blob is not None:
+        return file.blob.sha256
+    return make_etag(file.id, file.upload_date, file.file_size)
+
+
+def set_file_cache_headers(response, etag):
+    response.set_etag(etag)
+    # Files are only served to their owner and admins, so keep them out of shared caches
+    response.cache_control.public = None
+    response.cache_control.private = True
+    if request.args.get('v') == etag:
+        response.cache_control.no_cache = None
+        response.cache_control.max_age = FILE_CACHE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+        response.cache_control.max_age = None
+        response.cache_control.immutable = None
+    response.headers.pop('Expires', None)
+    return response
+
+
+def file_not_modified_response(etag):
+    return set_file_cache_headers(current_app.response_class(status=304), etag)
+
+
+def accel_redirect_response(file, etag, as_attachment):
+    """Hand the transfer to nginx; it serves ranges from the internal location itself."""
+    if request.if_none_match.contains(etag):
+        return file_not_modified_response(etag)
+
+    response = current_app.response_class(mimetype=file.mime_type or 'application/octet-stream')
+    set_file_cache_headers(response, etag)
+
+    relative_path = os.path.relpath(file.file_path, current_app.config['UPLOAD_FOLDER'])
+    prefix = current_app.config['X_ACCEL_REDIRECT_PREFIX'].rstrip('/')
+    response.headers['X-Accel-Redirect'] = f"{prefix}/{relative_path.replace(os.sep, '/')}"
+    if as_attachment:
+        response.headers.set('Content-Disposition', 'attachment', filename=file.original_name)
+    return response
+
+
+def send_derivative(path, etag, mimetype):
+    """Serve a generated file (such as a thumbnail) from the worker with the same caching as its source."""
+    response = werkzeug_send_file(
+        os.path.abspath(path),
+        request.environ,
+        mimetype=mimetype,
+        conditional=True,
+        etag=etag,
+        response_class=current_app.response_class
+    )
+    return set_file_cache_headers(response, etag)
+
+
+def send_stored_file(file, as_attachment=False):
+    """
+    Serve a File row's content with Range support and cache validators,
+    offloading the transfer to the web server when configured to.
+    """
+    mode = current_app.config['FILE_SERVING']
+    etag = file_etag(file)
+
+    if mode == 'x-accel-redirect':
+        return accel_redirect_response(file, etag, as_attachment)
+
+    try:
+        response = werkzeug_send_file(
+            os.path.abspath(file.file_path),
+            request.environ,
+            mimetype=file.mime_type or 'application/octet-stream',
+            as_attachment=as_attachment,
+            download_name=file.original_name,
+            conditional=True,
+            etag=etag,
+            use_x_sendfile=(mode == 'x-sendfile'),
+            response_class=current_app.response_class
+        )
+    except FileNotFoundError:
+        return jsonify({'message': 'File not found on server'}), 404
+
+    return set_file_cache_headers(response, etag)
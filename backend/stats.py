@@ -0,0 +1,184 @@
+from collections import Counter
+
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models import db, Application, ApplicationStatistic
+
+ENROLLMENT_STATUSES = ['planning', 'applied', 'accepted', 'enrolled']
+
+# Application attributes the aggregates depend on
+TRACKED_FIELDS = ['enrollment_status', 'enrolled_university']
+
+
+def statistic_keys(enrollment_status, enrolled_university):
+    """Return the (kind, key) counters an application with these values contributes to."""
+    keys = [('total', ''), ('status', enrollment_status or 'none')]
+    if enrollment_status == 'enrolled' and enrolled_university:
+        keys.append(('university', enrolled_university))
+    return keys
+
+
+def old_value(application, field):
+    history = inspect(application).attrs[field].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(application, field)
+
+
+def new_value(application, field):
+    """
+    Value an attribute will be inserted with. The ORM leaves None out of the
+    INSERT for columns that have a default, so the default applies instead.
+    """
+    value = getattr(application, field)
+    if value is None:
+        default = Application.__table__.c[field].default
+        if default is not None and default.is_scalar:
+            return default.arg
+    return value
+
+
+def collect_deltas(session, flush_context, instances):
+    """
+    before_flush hook: work out how pending Application inserts, updates and
+    deletes change the counters while attribute history is still available.
+    """
+    deltas = session.info.setdefault('statistic_deltas', Counter())
+
+    for obj in session.new:
+        if isinstance(obj, Application):
+            for key in statistic_keys(*[new_value(obj, field) for field in TRACKED_FIELDS]):
+                deltas[key] += 1
+
+    for obj in session.deleted:
+        if isinstance(obj, Application):
+            for key in statistic_keys(*[old_value(obj, field) for field in TRACKED_FIELDS]):
+                deltas[key] -= 1
+
+    for obj in session.dirty:
+        if isinstance(obj, Application) and obj not in session.deleted:
+            state = inspect(obj)
+            if not any(state.attrs[field].history.has_changes() for field in TRACKED_FIELDS):
+                continue
+            for key in statistic_keys(*[old_value(obj, field) for field in TRACKED_FIELDS]):
+                deltas[key] -= 1
+            for key in statistic_keys(obj.enrollment_status, obj.enrolled_university):
+                deltas[key] += 1
+
+
+def apply_deltas(session, flush_context):
+    """after_flush hook: write the collected deltas in the same transaction."""
+    deltas = session.info.pop('statistic_deltas', None)
+    if not deltas:
+        return
+
+    connection = session.connection()
+    dialect = connection.dialect.name
+    table = ApplicationStatistic.__table__
+
+    for (kind, key), delta in deltas.items():
+        if delta == 0:
+            continue
+        if dialect in ('sqlite', 'postgresql'):
+            insert = (sqlite if dialect == 'sqlite' else postgresql).insert(table)
+            connection.execute(
+                insert.values(kind=kind, key=key, count=delta).on_conflict_do_update(
+                    index_elements=['kind', 'key'],
+                    set_={'count': table.c.count + delta}
+                )
+            )
+        else:
+            result = connection.execute(
+                table.update().where(table.c.kind == kind, table.c.key == key)
+                .values(count=table.c.count + delta)
+            )
+            if result.rowcount == 0:
+                connection.execute(table.insert().values(kind=kind, key=key, count=delta))
+
+
+def discard_deltas(session):
+    session.info.pop('statistic_deltas', None)
+
+
+def listen_for_application_writes(session):
+    """Keep ApplicationStatistic in sync with every flush made through `session`."""
+    event.listen(session, 'before_flush', collect_deltas)
+    event.listen(session, 'after_flush', apply_deltas)
+    event.listen(session, 'after_soft_rollback', lambda session, previous_transaction: discard_deltas(session))
+
+
+def compute_statistics():
+    """Compute the aggregates from scratch as a dict of (kind, key) -> count."""
+    counts = Counter()
+    rows = db.session.query(
+        Application.enrollment_status,
+        Application.enrolled_university,
+        db.func.count(Application.id)
+    ).group_by(Application.enrollment_status, Application.enrolled_university)
+
+    for enrollment_status, enrolled_university, count in rows:
+        for key in statistic_keys(enrollment_status, enrolled_university):
+            counts[key] += count
+    counts.setdefault(('total', ''), 0)
+    return counts
+
+
+def stored_statistics(*kinds):
+    query = ApplicationStatistic.query
+    if kinds:
+        query = query.filter(ApplicationStatistic.kind.in_(kinds))
+    return {(statistic.kind, statistic.key): statistic.count for statistic in query}
+
+
+def rebuild_statistics():
+    """
+    Recompute all aggregates, replace the stored counters and return the
+    drift found as a list of dicts (empty when the counters were accurate).
+    """
+    expected = compute_statistics()
+    stored = stored_statistics()
+
+    drift = []
+    for kind, key in sorted(set(expected) | set(stored)):
+        if expected.get((kind, key), 0) != stored.get((kind, key), 0):
+            drift.append({
+                'kind': kind,
+                'key': key,
+                'stored': stored.get((kind, key), 0),
+                'actual': expected.get((kind, key), 0)
+            })
+
+    ApplicationStatistic.query.delete()
+    db.session.add_all([
+        ApplicationStatistic(kind=kind, key=key, count=count)
+        for (kind, key), count in expected.items() if count or kind == 'total'
+    ])
+    db.session.commit()
+    return drift
+
+
+def ensure_statistics():
+    """Build the counters once for databases created before they existed."""
+    if not ApplicationStatistic.query.filter_by(kind='total').first():
+        rebuild_statistics()
+
+
+def enrollment_statistics():
+    stored = {key: count for (kind, key), count in stored_statistics('total', 'status').items()}
+    status_counts = {status: stored.get(status, 0) for status in ENROLLMENT_STATUSES}
+    if stored.get('none', 0) > 0:
+        status_counts['none'] = stored['none']
+    return stored.get('', 0), status_counts
+
+
+def university_enrollment_counts():
+    return [
+        {'university': statistic.key, 'student_count': statistic.count}
+        for statistic in ApplicationStatistic.query.filter(
+            ApplicationStatistic.kind == 'university',
+            ApplicationStatistic.count > 0
+        ).order_by(ApplicationStatistic.key)
+    ]
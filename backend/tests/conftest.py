@@ -0,0 +1,46 @@
+import os
+import sys
+
+import pytest
+
+# Tests import the backend modules the way app.py does, as top-level modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, initialize_database  # noqa: E402
+from models import db  # noqa: E402
+
+ADMIN_EMAIL = 'admin@example.com'
+ADMIN_PASSWORD = 'admin123'
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """An app with a fresh SQLite database file; uploads and reports go under tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'test.db'}")
+    app = create_app({'TESTING': True})
+    with app.app_context():
+        initialize_database(ADMIN_EMAIL, ADMIN_PASSWORD)
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+def log_in(client, email, password):
+    response = client.post('/api/login', json={'email': email, 'password': password})
+    assert response.status_code == 200, response.get_json()
+    return client
+
+
+@pytest.fixture
+def admin_client(app):
+    return log_in(app.test_client(), ADMIN_EMAIL, ADMIN_PASSWORD)
+
+
+def register(app, email, password='password123'):
+    """Register a user and return a test client logged in as them."""
+    client = app.test_client()
+    response = client.post('/api/register', json={'email': email, 'password': password, 'first_name': 'Test', 'last_name': 'User'})
+    assert response.status_code == 201, response.get_json()
+    return log_in(client, email, password)
@@ -0,0 +1,41 @@
+from conftest import register
+
+APPLICANTS = [
+    {'gender': None, 'final_percentage': 55, 'enrollment_status': 'applied', 'admission_year': 2025},
+    {'gender': '', 'final_percentage': 65, 'enrollment_status': 'applied', 'admission_year': ''},
+    {'gender': 'Male', 'final_percentage': 85, 'enrollment_status': 'enrolled', 'admission_year': 2025},
+    {'gender': 'Female', 'final_percentage': 95, 'enrollment_status': None, 'admission_year': None}
+]
+
+
+def submit_all(app):
+    for i, fields in enumerate(APPLICANTS):
+        response = register(app, f'cohort{i}@example.com').post('/api/submit-application', json=fields)
+        assert response.status_code == 201
+
+
+def test_counts_add_up_to_the_cohort(app, admin_client):
+    submit_all(app)
+    analytics = admin_client.get('/api/admin/analytics').get_json()
+
+    summary = analytics['summary']
+    assert (summary['total'], summary['with_percentage'], summary['high_performers']) == (4, 4, 2)
+    assert summary['mean_percentage'] == 75.0
+    assert analytics['gender'] == {'unspecified': 2, 'Male': 1, 'Female': 1}
+    assert sum(analytics['gender'].values()) == summary['total']
+    assert analytics['status'] == {'planning': 1, 'applied': 2, 'accepted': 0, 'enrolled': 1}
+    assert [(row['admission_year'], row['total']) for row in analytics['status_by_year']] == [(2025, 2), (None, 2)]
+    assert analytics['percentiles']['p50'] == 75.0
+    assert [bucket['count'] for bucket in analytics['histogram'] if bucket['count']] == [1, 1, 1, 1]
+
+
+def test_filters_select_the_cohort_and_writes_refresh_it(app, admin_client):
+    submit_all(app)
+    analytics = admin_client.get('/api/admin/analytics?min_percentage=80').get_json()
+    assert analytics['summary']['total'] == 2
+    assert analytics['gender'] == {'Male': 1, 'Female': 1}
+
+    response = register(app, 'late@example.com').post('/api/submit-application', json={'gender': 'Male', 'final_percentage': 90})
+    assert response.status_code == 201
+    analytics = admin_client.get('/api/admin/analytics?min_percentage=80').get_json()
+    assert analytics['gender'] == {'Male': 2, 'Female': 1}
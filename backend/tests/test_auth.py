@@ -0,0 +1,37 @@
+from conftest import ADMIN_EMAIL, register
+from models import db, User
+
+
+def change_in_other_worker(app, statement, **params):
+    """Run SQL outside the session, as another worker would, so this process's cache isn't told."""
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.execute(db.text(statement), params)
+
+
+def user_id(app, email):
+    with app.app_context():
+        return User.query.filter_by(email=email).one().id
+
+
+def test_user_deleted_elsewhere_cannot_write(app):
+    client = register(app, 'deleted@example.com')
+    assert client.get('/api/check-auth').status_code == 200
+
+    change_in_other_worker(app, 'DELETE FROM user WHERE id = :id', id=user_id(app, 'deleted@example.com'))
+
+    response = client.post('/api/submit-application', json={'first_name': 'Ghost'})
+    assert response.status_code == 401
+    with app.app_context():
+        assert db.session.execute(db.text('SELECT count(*) FROM application')).scalar() == 0
+
+
+def test_admin_demoted_elsewhere_loses_admin_writes(app, admin_client):
+    register(app, 'target@example.com')
+    assert admin_client.get('/api/admin/users').status_code == 200
+
+    change_in_other_worker(app, 'UPDATE user SET is_admin = 0 WHERE id = :id', id=user_id(app, ADMIN_EMAIL))
+
+    response = admin_client.delete(f"/api/admin/delete-user/{user_id(app, 'target@example.com')}")
+    assert response.status_code == 403
+
@@ -0,0 +1,71 @@
+import os
+import threading
+import time
+
+from blobs import collect_unreferenced_blobs, create_file_record
+from models import db, Blob, File, User
+
+CONTENT = b'%PDF-1.4\nshared content'
+
+
+def write_source(name):
+    with open(name, 'wb') as f:
+        f.write(CONTENT)
+    return name
+
+
+def test_store_blob_rejects_content_not_matching_expected_digest(app):
+    with app.app_context():
+        user = User.query.first()
+        source = write_source('mismatch.pdf')
+        try:
+            create_file_record(user.id, source, 'cv.pdf', 'cv', 'application/pdf', expected_sha256='0' * 64)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError('expected a checksum mismatch')
+        db.session.rollback()
+        assert os.path.exists(source)
+        assert Blob.query.count() == 0
+
+
+def test_reused_blob_survives_concurrent_collection(app):
+    with app.app_context():
+        user = User.query.first()
+        first = create_file_record(user.id, write_source('first.pdf'), 'cv.pdf', 'cv', 'application/pdf')
+        db.session.commit()
+        blob_id = first.blob_id
+
+        # The last File went away, but the after-commit collection hasn't run yet
+        File.query.filter_by(id=first.id).delete()
+        Blob.query.filter_by(id=blob_id).update({'ref_count': 0})
+        db.session.commit()
+
+        # Identical content arrives and reuses the blob...
+        second = create_file_record(user.id, write_source('second.pdf'), 'cv.pdf', 'cv', 'application/pdf')
+        assert second.blob.id == blob_id
+
+        # ...while the collection runs from another request
+        def collect():
+            with app.app_context():
+                collect_unreferenced_blobs([blob_id])
+
+        collector = threading.Thread(target=collect)
+        collector.start()
+        time.sleep(0.2)
+        db.session.commit()
+        collector.join()
+
+        blob = db.session.get(Blob, blob_id)
+        assert blob is not None
+        assert blob.ref_count == 1
+        assert os.path.exists(blob.path)
+
+
+def test_new_blob_is_counted_once(app):
+    with app.app_context():
+        user = User.query.first()
+        for name in ('a.pdf', 'b.pdf'):
+            create_file_record(user.id, write_source(name), 'cv.pdf', 'cv', 'application/pdf')
+            db.session.commit()
+        assert [blob.ref_count for blob in Blob.query] == [2]
@@ -0,0 +1,98 @@
+import base64
+from datetime import datetime, timedelta
+
+import pytest
+
+from changes import prune_tombstones
+from conftest import register
+from models import db, Application, ApplicationTombstone
+
+
+def submit(app, email):
+    response = register(app, email).post('/api/submit-application', json={'first_name': email})
+    assert response.status_code == 201
+    return response.get_json()['application_id']
+
+
+def read_feed(client, cursor=None):
+    """Follow the feed to its end. Returns (changed application ids, deleted ids, next cursor)."""
+    changed, deleted = [], []
+    while True:
+        response = client.get('/api/admin/application-changes', query_string={'limit': 2, **({'cursor': cursor} if cursor else {})})
+        assert response.status_code == 200, response.get_json()
+        page = response.get_json()
+        changed += [application['id'] for application in page['changed']]
+        deleted += page['deleted']
+        cursor = page['next_cursor']
+        if not page['has_more']:
+            return changed, deleted, cursor
+
+
+def test_feed_returns_every_application_then_only_changes(app, admin_client):
+    ids = [submit(app, f'feed{i}@example.com') for i in range(5)]
+    changed, deleted, cursor = read_feed(admin_client)
+    assert sorted(changed) == ids and deleted == []
+
+    assert admin_client.put(f'/api/update-application/{ids[3]}', json={'middle_name': 'Kathmandu'}).status_code == 200
+    assert admin_client.delete(f'/api/delete-application/{ids[1]}').status_code == 200
+    changed, deleted, cursor = read_feed(admin_client, cursor)
+    assert (changed, deleted) == ([ids[3]], [ids[1]])
+
+    assert read_feed(admin_client, cursor)[:2] == ([], [])
+
+
+def test_write_committed_after_a_newer_timestamp_is_not_skipped(app, admin_client):
+    late, early = submit(app, 'late@example.com'), submit(app, 'early@example.com')
+    cursor = read_feed(admin_client)[2]
+
+    # A writer stamps updated_at, then waits for the write lock while
+    # another write commits and a client reads the feed past it
+    stamped_at = datetime.utcnow()
+    assert admin_client.put(f'/api/update-application/{early}', json={'middle_name': 'Pokhara'}).status_code == 200
+    changed, deleted, cursor = read_feed(admin_client, cursor)
+    assert changed == [early]
+
+    with app.app_context():
+        application = Application.query.get(late)
+        application.middle_name = 'Lalitpur'
+        application.updated_at = stamped_at - timedelta(seconds=1)
+        db.session.commit()
+
+    assert read_feed(admin_client, cursor)[0] == [late]
+
+
+def test_feed_rejects_cursors_from_before_the_change_sequence(admin_client):
+    # (updated_at, application id, tombstone id), as issued by the old feed
+    response = admin_client.get('/api/admin/application-changes', query_string={'cursor': 'WyIyMDI1LTAxLTAxIDAwOjAwOjAwIiwxLDBd'})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('cursor', [b'[true,1]', b'[1,false]', b'[1.5,1]', b'[null,1]'])
+def test_feed_rejects_cursors_holding_other_types(admin_client, cursor):
+    response = admin_client.get('/api/admin/application-changes', query_string={'cursor': base64.urlsafe_b64encode(cursor).decode()})
+    assert response.status_code == 400
+
+
+def test_cursors_older_than_pruned_deletions_must_resync(app, admin_client):
+    ids = [submit(app, f'pruned{i}@example.com') for i in range(3)]
+    stale_cursor = read_feed(admin_client)[2]
+
+    assert admin_client.delete(f'/api/delete-application/{ids[0]}').status_code == 200
+    assert admin_client.delete(f'/api/delete-application/{ids[1]}').status_code == 200
+    current_cursor = read_feed(admin_client, stale_cursor)[2]
+
+    with app.app_context():
+        ApplicationTombstone.query.filter_by(application_id=ids[0]).update({'deleted_at': datetime.utcnow() - timedelta(days=60)})
+        db.session.commit()
+        assert prune_tombstones(timedelta(days=30)) == 1
+        assert [tombstone.application_id for tombstone in ApplicationTombstone.query] == [ids[1]]
+
+    response = admin_client.get('/api/admin/application-changes', query_string={'cursor': stale_cursor})
+    assert response.status_code == 410
+
+    # Clients that had read past the pruned deletion, and fresh copies, carry on
+    assert read_feed(admin_client, current_cursor)[:2] == ([], [])
+    changed, deleted, cursor = read_feed(admin_client)
+    assert (sorted(changed), deleted) == ([ids[2]], [])
+    assert admin_client.delete(f'/api/delete-application/{ids[2]}').status_code == 200
+    assert read_feed(admin_client, cursor)[:2] == ([], [ids[2]])
@@ -0,0 +1,28 @@
+import zlib
+
+from compression import GzipEncoder, compress_chunks
+from conftest import register
+
+ROWS = [f'{i},applicant{i}@example.com\n' for i in range(2000)]
+
+
+def test_gzip_stream_is_flushed_as_it_is_produced():
+    stream = compress_chunks(iter(ROWS), GzipEncoder(6), flush_size=1024)
+    decompressor = zlib.decompressobj(31)
+
+    # The first row is readable before any more are produced
+    assert decompressor.decompress(next(stream)) == ROWS[0].encode()
+
+    pieces = list(stream)
+    assert len(pieces) > len(''.join(ROWS)) // 1024 // 2
+    assert decompressor.decompress(b''.join(pieces)) == ''.join(ROWS[1:]).encode()
+    assert decompressor.eof
+
+
+def test_export_is_streamed_gzipped(app, admin_client):
+    register(app, 'export@example.com').post('/api/submit-application', json={'first_name': 'Export'})
+
+    response = admin_client.get('/api/admin/export-applications?format=csv', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200 and response.is_streamed
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert b'Export' in zlib.decompress(response.data, 31)
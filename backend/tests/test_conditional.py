@@ -0,0 +1,71 @@
+from conftest import register
+
+
+def submit(client, **fields):
+    response = client.post('/api/submit-application', json={'first_name': 'Asha', **fields})
+    assert response.status_code == 201
+    return response.get_json()['application_id']
+
+
+def test_application_revalidates_until_it_changes(app):
+    client = register(app, 'owner@example.com')
+    application_id = submit(client)
+
+    response = client.get(f'/api/get-application/{application_id}')
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    assert etag.startswith('W/"') and response.last_modified is not None
+    assert response.cache_control.private and response.cache_control.no_cache
+
+    response = client.get(f'/api/get-application/{application_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 304 and response.data == b''
+    assert response.headers['ETag'] == etag
+    assert client.get('/api/get-application', headers={'If-None-Match': etag}).status_code == 304
+
+    # Another field set is another representation
+    response = client.get(f'/api/get-application/{application_id}?view=summary', headers={'If-None-Match': etag})
+    assert response.status_code == 200 and response.headers['ETag'] != etag
+
+    assert client.put(f'/api/update-application/{application_id}', json={'first_name': 'Asmita'}).status_code == 200
+    response = client.get(f'/api/get-application/{application_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200 and response.headers['ETag'] != etag
+    assert response.get_json()['first_name'] == 'Asmita'
+
+
+def test_if_modified_since_is_used_only_without_an_etag(app):
+    client = register(app, 'owner@example.com')
+    submit(client)
+    last_modified = client.get('/api/get-application').headers['Last-Modified']
+
+    assert client.get('/api/get-application', headers={'If-Modified-Since': last_modified}).status_code == 304
+    response = client.get('/api/get-application', headers={'If-Modified-Since': last_modified, 'If-None-Match': 'W/"stale"'})
+    assert response.status_code == 200
+
+
+def test_other_users_cannot_revalidate_an_application(app):
+    owner = register(app, 'owner@example.com')
+    application_id = submit(owner)
+    etag = owner.get(f'/api/get-application/{application_id}').headers['ETag']
+
+    response = register(app, 'other@example.com').get(f'/api/get-application/{application_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 403
+
+
+def test_application_list_changes_with_any_write_to_the_filtered_set(app, admin_client):
+    ids = [submit(register(app, f'listed{i}@example.com'), gender='Female') for i in range(3)]
+    path = '/api/get-all-applications?gender=Female'
+
+    etag = admin_client.get(path).headers['ETag']
+    assert admin_client.get(path, headers={'If-None-Match': etag}).status_code == 304
+    # The page and sort order are part of the representation
+    assert admin_client.get(path + '&limit=1', headers={'If-None-Match': etag}).status_code == 200
+
+    # A delete doesn't move the latest updated_at, but still changes the list
+    assert admin_client.delete(f'/api/delete-application/{ids[2]}').status_code == 200
+    response = admin_client.get(path, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert [application['id'] for application in response.get_json()['applications']] == ids[:2]
+
+    etag = response.headers['ETag']
+    assert admin_client.put(f'/api/update-application/{ids[0]}', json={'middle_name': 'Maya'}).status_code == 200
+    assert admin_client.get(path, headers={'If-None-Match': etag}).status_code == 200
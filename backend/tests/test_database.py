@@ -0,0 +1,70 @@
+import random
+import threading
+
+from conftest import register
+from models import db
+from stats import ENROLLMENT_STATUSES, rebuild_statistics
+
+THREADS = 8
+WRITES_PER_THREAD = 25
+UNIVERSITIES = ['MIT', 'Stanford', 'Oxford']
+
+
+def application_fields(rng):
+    status = rng.choice(ENROLLMENT_STATUSES)
+    return {
+        'enrollment_status': status,
+        'enrolled_university': rng.choice(UNIVERSITIES) if status == 'enrolled' else None,
+        'target_universities': ', '.join(rng.sample(UNIVERSITIES, 2)),
+        'final_percentage': str(rng.randint(50, 99))
+    }
+
+
+def test_sqlite_connections_use_wal(app):
+    with app.app_context():
+        assert db.session.execute(db.text('PRAGMA journal_mode')).scalar() == 'wal'
+        assert db.session.execute(db.text('PRAGMA busy_timeout')).scalar() == 5000
+
+
+def test_concurrent_application_writes_succeed_without_counter_drift(app):
+    clients = [register(app, f'writer{i}@example.com') for i in range(THREADS)]
+    start = threading.Barrier(THREADS)
+    statuses = []
+    failures = []
+    lock = threading.Lock()
+
+    def record(status):
+        with lock:
+            statuses.append(status)
+
+    def write(index):
+        client = clients[index]
+        rng = random.Random(index)
+        start.wait()
+        try:
+            response = client.post('/api/submit-application', json=application_fields(rng))
+            record(response.status_code)
+            application_id = response.get_json()['application_id']
+            for write_number in range(WRITES_PER_THREAD):
+                if write_number % 2:
+                    response = client.post('/api/submit-application', json=application_fields(rng))
+                else:
+                    response = client.put(f'/api/update-application/{application_id}', json=application_fields(rng))
+                record(response.status_code)
+        except Exception as e:
+            # TESTING propagates errors out of the test client instead of returning a 500
+            with lock:
+                failures.append(repr(e))
+
+    threads = [threading.Thread(target=write, args=(index,)) for index in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert failures == []
+    assert all(status in (200, 201) for status in statuses), sorted(set(statuses))
+    assert len(statuses) == THREADS * (WRITES_PER_THREAD + 1)
+
+    with app.app_context():
+        assert rebuild_statistics() == []
@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+
+import pytest
+
+import exports
+from conftest import register
+
+APPLICANTS = [
+    {'first_name': 'Sita', 'gender': 'Female', 'final_percentage': 81.5, 'preferred_programs': 'Physics, "Applied" Maths'},
+    {'first_name': 'Ram', 'gender': 'Male', 'final_percentage': 64},
+    {'first_name': 'Gita', 'gender': 'Female', 'final_percentage': 92.25, 'statement_of_purpose': 'Line one\nline two'}
+]
+
+
+@pytest.fixture
+def applications(app):
+    ids = []
+    for i, fields in enumerate(APPLICANTS):
+        response = register(app, f'export{i}@example.com').post('/api/submit-application', json=fields)
+        assert response.status_code == 201
+        ids.append(response.get_json()['application_id'])
+    return ids
+
+
+def test_csv_export_streams_the_selected_columns_in_id_order(admin_client, applications):
+    response = admin_client.get('/api/admin/export-applications', query_string={'columns': 'id,first_name,preferred_programs,statement_of_purpose'})
+    assert response.status_code == 200 and response.is_streamed
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'].startswith('attachment; filename=applications_')
+
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert rows == [
+        ['id', 'first_name', 'preferred_programs', 'statement_of_purpose'],
+        [str(applications[0]), 'Sita', 'Physics, "Applied" Maths', ''],
+        [str(applications[1]), 'Ram', '', ''],
+        [str(applications[2]), 'Gita', '', 'Line one\nline two']
+    ]
+
+
+def test_ndjson_export_applies_the_dashboard_filters(admin_client, applications):
+    response = admin_client.get('/api/admin/export-applications', query_string={
+        'format': 'ndjson', 'gender': 'Female', 'min_percentage': 85, 'columns': 'id,final_percentage'
+    })
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert [json.loads(line) for line in response.get_data(as_text=True).splitlines()] == [
+        {'id': applications[2], 'final_percentage': 92.25}
+    ]
+
+
+def test_export_is_produced_while_it_is_sent(admin_client, applications, monkeypatch):
+    converted = []
+    export_value = exports.export_value
+    monkeypatch.setattr(exports, 'EXPORT_BATCH_SIZE', 1)
+    monkeypatch.setattr(exports, 'export_value', lambda application, column: converted.append(application.id) or export_value(application, column))
+
+    response = admin_client.get('/api/admin/export-applications?format=ndjson&columns=id', buffered=False)
+    body = iter(response.response)
+
+    # Each row is sent as soon as it is read, before the next one is converted
+    assert json.loads(next(body)) == {'id': applications[0]}
+    assert converted == applications[:1]
+    assert [json.loads(line)['id'] for line in body] == applications[1:]
+    assert converted == applications
+    response.close()
+
+
+@pytest.mark.parametrize('query, message', [
+    ({'format': 'xlsx'}, 'format must be one of: csv, ndjson'),
+    ({'columns': 'id,password'}, 'Unknown export columns: password'),
+    ({'columns': ' , '}, 'At least one column is required'),
+    ({'min_percentage': 'high'}, 'min_percentage must be a number')
+])
+def test_invalid_exports_are_refused_before_streaming(admin_client, query, message):
+    response = admin_client.get('/api/admin/export-applications', query_string=query)
+    assert response.status_code == 400
+    assert response.get_json()['message'] == message
+
+
+def test_only_admins_can_export(app):
+    assert register(app, 'applicant@example.com').get('/api/admin/export-applications').status_code == 403
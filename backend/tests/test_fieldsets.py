@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy import event
+
+from conftest import register
+from models import db
+from queries import APPLICATION_VIEWS
+
+LONG_TEXT = 'research ' * 2000
+
+
+@pytest.fixture
+def client_and_application(app):
+    client = register(app, 'owner@example.com')
+    response = client.post('/api/submit-application', json={'first_name': 'Asha', 'statement_of_purpose': LONG_TEXT})
+    assert response.status_code == 201
+    return client, response.get_json()['application_id']
+
+
+def selected_sql(app, send):
+    """Run `send()` and return the SELECTs on the application table it made."""
+    statements = []
+
+    def capture(connection, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith('SELECT') and 'FROM application' in statement:
+            statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        response = send()
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+    assert response.status_code == 200, response.get_json()
+    return response, statements
+
+
+def test_fields_limit_the_response_and_the_columns_read(app, client_and_application):
+    client, application_id = client_and_application
+    response, statements = selected_sql(app, lambda: client.get(f'/api/get-application/{application_id}?fields=first_name,email'))
+    assert response.get_json() == {'id': application_id, 'first_name': 'Asha', 'email': None}
+    assert statements and not any('statement_of_purpose' in statement for statement in statements)
+
+    response = client.get(f'/api/get-application/{application_id}')
+    assert response.get_json()['statement_of_purpose'] == LONG_TEXT
+
+
+def test_summary_view_leaves_out_long_text(app, admin_client, client_and_application):
+    response, statements = selected_sql(app, lambda: admin_client.get('/api/get-all-applications?view=summary'))
+    [application] = response.get_json()['applications']
+    assert set(application) == set(APPLICATION_VIEWS['summary'])
+    assert not any('statement_of_purpose' in statement for statement in statements)
+
+
+@pytest.mark.parametrize('query', ['fields=first_name,height', 'view=everything', 'fields=id&view=summary'])
+def test_unknown_fieldsets_are_refused(admin_client, client_and_application, query):
+    assert admin_client.get(f'/api/get-all-applications?{query}').status_code == 400
@@ -0,0 +1,77 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import register
+from jobs import MAX_JOB_APPLICATIONS, MAX_JOB_ATTEMPTS, ReportJobLost
+from models import db, ReportJob
+
+
+@pytest.fixture
+def runner(app):
+    """The app's report job runner, polling quickly so tests don't wait out the interval."""
+    app.config['REPORT_JOB_POLL_INTERVAL'] = 0.1
+    runner = app.extensions['report_jobs']
+    runner.wakeup.set()
+    return runner
+
+
+def add_job(app, **values):
+    with app.app_context():
+        job = ReportJob(filters='{}', **values)
+        db.session.add(job)
+        db.session.commit()
+        return job.id
+
+
+def wait_for_job(client, job_id, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f'/api/admin/report-jobs/{job_id}').get_json()
+        if job['status'] in ('completed', 'failed'):
+            return job
+        time.sleep(0.1)
+    raise AssertionError(f'report job still {job["status"]} after {timeout}s')
+
+
+def test_queued_job_left_in_table_is_claimed_by_a_running_worker(app, admin_client, runner):
+    register(app, 'applicant@example.com').post('/api/submit-application', json={'first_name': 'Ada'})
+    # Queued by a worker that died before handing it to its runner
+    job_id = add_job(app, status='queued')
+
+    job = wait_for_job(admin_client, job_id)
+    assert (job['status'], job['total'], job['completed']) == ('completed', 1, 1)
+    assert admin_client.get(f'/api/admin/report-jobs/{job_id}/download').status_code == 200
+
+
+def test_job_lost_with_its_worker_is_requeued(app, admin_client, runner):
+    register(app, 'applicant@example.com').post('/api/submit-application', json={'first_name': 'Ada'})
+    job_id = add_job(app, status='running', attempts=1, completed=0, heartbeat_at=datetime.utcnow() - timedelta(hours=1))
+
+    job = wait_for_job(admin_client, job_id)
+    assert job['status'] == 'completed'
+    with app.app_context():
+        assert ReportJob.query.get(job_id).attempts == 2
+
+
+def test_job_lost_too_often_is_failed(app, admin_client, runner):
+    job_id = add_job(app, status='running', attempts=MAX_JOB_ATTEMPTS, heartbeat_at=datetime.utcnow() - timedelta(hours=1))
+
+    job = wait_for_job(admin_client, job_id)
+    assert job['status'] == 'failed'
+    assert 'stopped responding' in job['error']
+
+
+def test_worker_stops_writing_a_job_another_worker_took_over(app):
+    job_id = add_job(app, status='running', attempts=2, heartbeat_at=datetime.utcnow())
+    with app.app_context():
+        with pytest.raises(ReportJobLost):
+            app.extensions['report_jobs'].heartbeat(job_id, 1, completed=MAX_JOB_APPLICATIONS)
+        assert ReportJob.query.get(job_id).completed == 0
+
+
+@pytest.mark.parametrize('body', ['[]', '"computer science"', '3', 'null', '{not json', '{"q": ["a"]}', '{"gender": {"a": 1}}', '{"application_ids": "1"}'])
+def test_job_request_must_be_an_object_of_filters(admin_client, body):
+    response = admin_client.post('/api/admin/report-jobs', data=body, content_type='application/json')
+    assert response.status_code == 400
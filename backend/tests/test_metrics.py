@@ -0,0 +1,50 @@
+import re
+
+from conftest import register
+
+
+def metric(text, name, **labels):
+    """Value of the sample `name` with exactly these labels in a Prometheus text exposition."""
+    label_text = ','.join(f'{key}="{value}"' for key, value in labels.items())
+    match = re.search(rf'^{re.escape(name)}{{{re.escape(label_text)}}} (\S+)$', text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+def test_requests_and_their_queries_are_counted_per_endpoint(app, admin_client):
+    admin_client.get('/api/admin/users')
+    admin_client.get('/api/admin/users')
+    admin_client.get('/api/admin/users?limit=oops')
+
+    text = admin_client.get('/metrics').get_data(as_text=True)
+    assert metric(text, 'http_requests_total', endpoint='api.get_all_users', method='GET', status='200') == 2
+    assert metric(text, 'http_requests_total', endpoint='api.get_all_users', method='GET', status='400') == 1
+    assert metric(text, 'http_request_duration_seconds_count', endpoint='api.get_all_users', method='GET') == 3
+    assert metric(text, 'db_statements_per_request_sum', endpoint='api.get_all_users') > 0
+
+
+def test_slow_queries_are_counted_and_logged(app, admin_client, caplog):
+    app.config['SLOW_QUERY_THRESHOLD'] = 0
+    admin_client.get('/api/admin/users')
+
+    text = admin_client.get('/metrics').get_data(as_text=True)
+    assert metric(text, 'db_slow_queries_total', endpoint='api.get_all_users') >= 1
+    assert any('Slow query' in record.getMessage() and '[api.get_all_users]' in record.getMessage() for record in caplog.records)
+
+
+def test_query_count_header_is_opt_in(app):
+    client = register(app, 'applicant@example.com')
+    assert 'X-Query-Count' not in client.get('/api/check-auth').headers
+
+    app.config['QUERY_COUNT_HEADER'] = True
+    response = client.get('/api/check-auth')
+    assert int(response.headers['X-Query-Count']) >= 0
+    assert response.headers['Server-Timing'].startswith('db;dur=')
+
+
+def test_metrics_token_is_required_when_set(app):
+    app.config['METRICS_TOKEN'] = 'scrape-secret'
+    client = app.test_client()
+    assert client.get('/metrics').status_code == 403
+    response = client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'})
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
@@ -0,0 +1,152 @@
+import io
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
+
+import migrations
+from conftest import register
+from migrations import run_migrations
+from models import db, Application, SchemaMigration, User
+
+LOOKUP_INDEXES = [
+    'ix_application_updated_at', 'ix_application_user_id', 'ix_application_enrollment', 'ix_application_change_seq',
+    'ix_application_transcript', 'ix_application_cv', 'ix_application_photo'
+]
+
+
+def downgrade(app):
+    """Drop the application lookup indexes and forget the migrations that add them, as on an old database."""
+    with app.app_context():
+        for name in LOOKUP_INDEXES:
+            db.session.execute(db.text(f'DROP INDEX IF EXISTS {name}'))
+        SchemaMigration.query.filter(SchemaMigration.version.in_([2, 3, 6, 7])).delete()
+        db.session.commit()
+
+
+@pytest.fixture(params=['created', 'upgraded'])
+def migrated_app(request, app):
+    """An app whose schema came from run_migrations(), on a new database or an old one being upgraded."""
+    if request.param == 'upgraded':
+        downgrade(app)
+        with app.app_context():
+            assert run_migrations() == [
+                'add_application_updated_at_index', 'add_application_lookup_indexes', 'add_change_sequence', 'add_application_file_indexes'
+            ]
+    return app
+
+
+def query_plans(app, send, clause):
+    """
+    Run `send()` and return the EXPLAIN QUERY PLAN details of every SELECT
+    it made whose SQL contains `clause`, as one string per statement.
+    """
+    statements = []
+
+    def capture(connection, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and clause in ' '.join(statement.split()):
+            statements.append((statement, parameters))
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        response = send()
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+    assert response.status_code == 200, response.get_json()
+
+    with app.app_context():
+        return [
+            ' | '.join(row[-1] for row in db.session.connection().exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters))
+            for statement, parameters in statements
+        ]
+
+
+def submit(app, email, status):
+    client = register(app, email)
+    response = client.post('/api/submit-application', json={'enrollment_status': status})
+    assert response.status_code == 201
+    return client
+
+
+def test_current_user_lookup_uses_user_id_index(migrated_app):
+    client = submit(migrated_app, 'owner@example.com', 'applied')
+    plans = query_plans(migrated_app, lambda: client.get('/api/get-application'), 'WHERE application.user_id = ?')
+    assert plans and all('USING INDEX ix_application_user_id (user_id=?)' in plan for plan in plans), plans
+
+
+def test_user_list_subquery_uses_user_id_index(migrated_app, admin_client):
+    submit(migrated_app, 'listed@example.com', 'applied')
+    plans = query_plans(migrated_app, lambda: admin_client.get('/api/admin/users?include_application=true'), 'WHERE application.user_id = user.id')
+    assert any('CORRELATED SCALAR SUBQUERY' in plan and 'INDEX ix_application_user_id (user_id=?)' in plan for plan in plans), plans
+
+
+def test_status_filter_uses_enrollment_index(migrated_app, admin_client):
+    submit(migrated_app, 'applied@example.com', 'applied')
+    submit(migrated_app, 'planning@example.com', 'planning')
+    plans = query_plans(migrated_app, lambda: admin_client.get('/api/get-all-applications?enrollment_status=applied'), 'WHERE application.enrollment_status = ?')
+    assert plans and all('INDEX ix_application_enrollment (enrollment_status=?)' in plan for plan in plans), plans
+
+
+def test_change_feed_reads_change_seq_index(migrated_app, admin_client):
+    for i in range(3):
+        submit(migrated_app, f'changed{i}@example.com', 'applied')
+    first_page = admin_client.get('/api/admin/application-changes?limit=1').get_json()
+
+    for path in ['/api/admin/application-changes?limit=1', f"/api/admin/application-changes?limit=1&cursor={first_page['next_cursor']}"]:
+        plans = query_plans(migrated_app, lambda: admin_client.get(path), 'ORDER BY application.change_seq')
+        assert plans and all('INDEX ix_application_change_seq' in plan and 'TEMP B-TREE' not in plan for plan in plans), plans
+
+
+def test_deleting_an_application_finds_shared_files_by_index(migrated_app, admin_client):
+    client = register(migrated_app, 'files@example.com')
+    response = client.post('/api/upload-file', data={'file': (io.BytesIO(b'%PDF-1.4\n'), 'transcript.pdf'), 'type': 'transcript'})
+    assert response.status_code == 201
+    file_id = response.get_json()['fileId']
+    application_id = client.post('/api/submit-application', json={'transcript': file_id, 'cv': file_id}).get_json()['application_id']
+
+    plans = query_plans(migrated_app, lambda: admin_client.delete(f'/api/delete-application/{application_id}'), 'UNION')
+    assert plans, plans
+    for column in ('transcript', 'cv', 'photo'):
+        assert all(f'INDEX ix_application_{column} ({column}=?)' in plan for plan in plans), plans
+    assert all('SCAN application' not in plan for plan in plans), plans
+
+
+def test_lookup_index_migration_refuses_duplicate_applications(app):
+    downgrade(app)
+    with app.app_context():
+        user = User.query.first()
+        db.session.add_all([Application(user_id=user.id), Application(user_id=user.id)])
+        db.session.commit()
+
+        with pytest.raises(RuntimeError, match=f'users {user.id} have more than one application'):
+            run_migrations()
+
+        # The updated_at index went in; the failed migration is left pending
+        assert {migration.version for migration in SchemaMigration.query} >= {1, 2, 4, 5}
+        assert SchemaMigration.query.filter_by(version=3).first() is None
+        indexes = {index['name'] for index in db.inspect(db.engine).get_indexes('application')}
+        assert 'ix_application_updated_at' in indexes
+        assert 'ix_application_user_id' not in indexes
+
+        Application.query.filter(Application.id == db.select(db.func.max(Application.id)).scalar_subquery()).delete(synchronize_session=False)
+        db.session.commit()
+        assert run_migrations() == ['add_application_lookup_indexes', 'add_change_sequence', 'add_application_file_indexes']
+
+
+def test_added_columns_use_the_database_type_names(monkeypatch):
+    class RecordingConnection:
+        dialect = postgresql.dialect()
+        statements = []
+
+        def exec_driver_sql(self, statement):
+            self.statements.append(statement)
+
+    monkeypatch.setattr(migrations, 'column_names', lambda connection, table: [])
+    connection = RecordingConnection()
+    migrations.add_report_job_heartbeat(connection)
+    assert connection.statements == [
+        'ALTER TABLE report_job ADD COLUMN attempts INTEGER DEFAULT 0',
+        'ALTER TABLE report_job ADD COLUMN heartbeat_at TIMESTAMP WITHOUT TIME ZONE'
+    ]
@@ -0,0 +1,85 @@
+import base64
+import json
+
+import pytest
+
+from conftest import register
+
+APPLICANTS = [
+    {'first_name': 'Sita', 'last_name': 'Rai', 'final_percentage': 81.5},
+    {'first_name': 'Ram', 'last_name': 'Thapa', 'final_percentage': 81.5},
+    {'first_name': 'Hari', 'final_percentage': None},
+    {'first_name': None, 'last_name': 'Gurung', 'final_percentage': 67},
+    {'first_name': 'Gita', 'last_name': 'Rai', 'final_percentage': 92.25}
+]
+
+
+def make_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def read_pages(client, **args):
+    ids, cursor = [], None
+    while True:
+        response = client.get('/api/get-all-applications', query_string={'limit': 2, **args, **({'cursor': cursor} if cursor else {})})
+        assert response.status_code == 200, response.get_json()
+        page = response.get_json()
+        ids += [application['id'] for application in page['applications']]
+        cursor = page['next_cursor']
+        if not page['has_more']:
+            return ids
+
+
+@pytest.mark.parametrize('sort_by', ['id', 'name', 'email', 'percentage', 'score'])
+def test_cursor_pages_match_the_unpaged_order(app, admin_client, sort_by):
+    for i, fields in enumerate(APPLICANTS):
+        response = register(app, f'page{i}@example.com').post('/api/submit-application', json=fields)
+        assert response.status_code == 201
+
+    unpaged = admin_client.get('/api/get-all-applications', query_string={'sort_by': sort_by}).get_json()
+    expected = [application['id'] for application in unpaged['applications']]
+    assert len(expected) == len(APPLICANTS)
+    assert read_pages(admin_client, sort_by=sort_by) == expected
+
+
+@pytest.mark.parametrize('sort_by, values', [
+    ('id', [{'a': 1}]),
+    ('id', [[1]]),
+    ('id', [None]),
+    ('id', [True]),
+    ('id', ['1']),
+    ('id', [1, 2]),
+    ('name', ['Ram', 'Rai', 1.5]),
+    ('percentage', ['high', 1])
+])
+def test_malformed_application_cursors_are_rejected(admin_client, sort_by, values):
+    response = admin_client.get('/api/get-all-applications', query_string={'sort_by': sort_by, 'cursor': make_cursor(values)})
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'Invalid cursor'
+
+
+def test_unreadable_cursors_are_rejected(admin_client):
+    response = admin_client.get('/api/get-all-applications', query_string={'cursor': 'not a cursor'})
+    assert response.status_code == 400
+
+
+def test_user_cursor_pages_cover_every_user(app, admin_client):
+    for i in range(4):
+        register(app, f'user{i}@example.com')
+
+    emails, cursor = [], None
+    while True:
+        response = admin_client.get('/api/admin/users', query_string={'limit': 2, **({'cursor': cursor} if cursor else {})})
+        assert response.status_code == 200, response.get_json()
+        page = response.get_json()
+        emails += [user['email'] for user in page['users']]
+        cursor = page['next_cursor']
+        if not page['has_more']:
+            break
+    assert emails == ['admin@example.com'] + [f'user{i}@example.com' for i in range(4)]
+
+
+@pytest.mark.parametrize('cursor', [make_cursor([{'a': 1}]), make_cursor([[1]]), make_cursor([None]), make_cursor([True]), make_cursor([1.5]), 'not a cursor'])
+def test_malformed_user_cursors_are_rejected(admin_client, cursor):
+    response = admin_client.get('/api/admin/users', query_string={'cursor': cursor})
+    assert response.status_code == 400
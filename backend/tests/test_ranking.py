@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from conftest import register
+from ranking import load_ranking_weights, rescore_applications
+
+APPLICANTS = {
+    'strong@example.com': {'final_percentage': 92, 'tentative_ranking': 'Top 5%', 'english_proficiency': 'IELTS 8', 'preferred_programs': 'Computer Science'},
+    'middle@example.com': {'final_percentage': 75, 'tentative_ranking': 'Top 25%', 'english_proficiency': 'Fluent', 'preferred_programs': 'Physics'},
+    'weak@example.com': {'final_percentage': 60, 'tentative_ranking': 'Top 50%', 'english_proficiency': 'Beginner', 'preferred_programs': 'Computer Science'}
+}
+
+
+@pytest.fixture
+def applications(app):
+    ids = {}
+    for email, fields in APPLICANTS.items():
+        response = register(app, email).post('/api/submit-application', json=fields)
+        assert response.status_code == 201
+        ids[email] = response.get_json()['application_id']
+    return ids
+
+
+def test_shortlist_orders_by_score_and_filters_by_program(admin_client, applications):
+    shortlist = admin_client.get('/api/admin/shortlist?limit=10').get_json()
+    assert [item['id'] for item in shortlist['applications']] == list(applications.values())
+
+    shortlist = admin_client.get('/api/admin/shortlist?program=computer  science&source=preferred').get_json()
+    assert [item['id'] for item in shortlist['applications']] == [applications['strong@example.com'], applications['weak@example.com']]
+
+
+def test_rescore_is_visible_in_the_change_feed(app, admin_client, applications):
+    cursor = admin_client.get('/api/admin/application-changes').get_json()['next_cursor']
+
+    with app.app_context():
+        assert rescore_applications({'english_proficiency': 1}) == len(applications)
+
+    page = admin_client.get('/api/admin/application-changes', query_string={'cursor': cursor}).get_json()
+    assert sorted(application['id'] for application in page['changed']) == sorted(applications.values())
+    scores = {application['id']: application['ranking_score'] for application in page['changed']}
+    assert scores[applications['weak@example.com']] == 25.0
+
+
+def test_weights_come_from_the_environment(monkeypatch, tmp_path):
+    assert load_ranking_weights()['final_percentage'] == 0.5
+
+    monkeypatch.setenv('RANKING_WEIGHTS', '{"final_percentage": 2, "publications": 1}')
+    assert load_ranking_weights() == {'final_percentage': 2, 'publications': 1}
+
+    monkeypatch.delenv('RANKING_WEIGHTS')
+    path = tmp_path / 'weights.json'
+    path.write_text(json.dumps({'english_proficiency': 1}))
+    monkeypatch.setenv('RANKING_WEIGHTS_FILE', str(path))
+    assert load_ranking_weights() == {'english_proficiency': 1}
+
+
+@pytest.mark.parametrize('value', ['not json', '{"height": 1}', '{"final_percentage": -1}', '{}'])
+def test_invalid_weights_are_refused(monkeypatch, value):
+    monkeypatch.setenv('RANKING_WEIGHTS', value)
+    with pytest.raises(ValueError):
+        load_ranking_weights()
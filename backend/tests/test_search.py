@@ -0,0 +1,43 @@
+import pytest
+from sqlalchemy import text as sql_text
+
+import search
+from conftest import register
+from models import db, Application, User
+from search import LikeSearchIndex, SQLiteSearchIndex, sqlite_supports_fts5
+
+STATEMENT = 'I built a <script>alert(1)</script> compiler & studied machine learning.'
+
+
+@pytest.fixture(params=[SQLiteSearchIndex, LikeSearchIndex])
+def index(request, app):
+    """Each search index implementation, installed as the app's index and built."""
+    with app.app_context():
+        app.extensions['search_index'] = request.param()
+        app.extensions['search_index'].ensure_index()
+    return app.extensions['search_index']
+
+
+def test_search_ranks_matches_and_escapes_snippets(app, admin_client, index):
+    response = register(app, 'writer@example.com').post('/api/submit-application', json={'statement_of_purpose': STATEMENT})
+    application_id = response.get_json()['application_id']
+
+    results = admin_client.get('/api/admin/search-applications?q=compiler').get_json()['results']
+    assert [result['application_id'] for result in results] == [application_id]
+    snippet = results[0]['snippet']
+    assert '<script>' not in snippet
+    assert '&lt;script&gt;' in snippet and '&amp;' in snippet
+    assert '<mark>compiler</mark>' in snippet
+
+
+def test_failed_fts5_probe_keeps_the_pending_write(app, monkeypatch):
+    # Make the probe fail as it would on an SQLite build without FTS5
+    monkeypatch.setattr(search, 'text', lambda sql: sql_text(sql.replace('fts5(', 'no_such_module(')))
+    with app.app_context():
+        user = User.query.first()
+        db.session.add(Application(user_id=user.id, first_name='Pending'))
+        db.session.flush()
+
+        assert sqlite_supports_fts5() is False
+        db.session.commit()
+        assert Application.query.filter_by(first_name='Pending').count() == 1
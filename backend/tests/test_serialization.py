@@ -0,0 +1,62 @@
+import json
+from datetime import date, datetime
+
+import pytest
+
+import jsonprovider
+from conftest import register
+from models import db, compile_serializer, User
+
+PAYLOAD = {
+    'name': 'Aṣhā',
+    'submitted': datetime(2025, 3, 22, 16, 22, 40, 123456),
+    'born': date(2001, 5, 4),
+    'scores': [81.5, None, 3],
+    'nested': {'b': 1, 'a': 2}
+}
+
+
+@pytest.fixture(params=['orjson', 'standard library'])
+def provider(request, app, monkeypatch):
+    if request.param == 'standard library':
+        monkeypatch.setattr(jsonprovider, 'orjson', None)
+    elif jsonprovider.orjson is None:
+        pytest.skip('orjson is not installed')
+    return app.json
+
+
+def test_both_encoders_write_the_same_json(provider):
+    assert json.loads(provider.dumps(PAYLOAD)) == {
+        'name': 'Aṣhā',
+        'submitted': '2025-03-22T16:22:40+00:00',
+        'born': '2001-05-04',
+        'scores': [81.5, None, 3],
+        'nested': {'b': 1, 'a': 2}
+    }
+    assert list(provider.loads(provider.dumps(PAYLOAD))['nested']) == ['b', 'a']
+
+
+def test_responses_are_utf8_json(app, provider):
+    with app.app_context():
+        response = provider.response(PAYLOAD)
+    assert response.mimetype == 'application/json'
+    assert json.loads(response.get_data().decode('utf-8'))['name'] == 'Aṣhā'
+
+
+def test_serializer_reads_expired_attributes_through_the_orm(app):
+    serialize = compile_serializer(['id', 'email'])
+    with app.app_context():
+        user = User.query.first()
+        expected = {'id': user.id, 'email': user.email}
+        assert serialize(user) == expected
+
+        db.session.expire(user, ['email'])
+        assert serialize(user) == expected
+        assert compile_serializer(['email'])(user) == {'email': user.email}
+
+
+def test_api_responses_use_iso_dates(app):
+    client = register(app, 'owner@example.com')
+    client.post('/api/submit-application', json={'first_name': 'Asha'})
+    created_at = client.get('/api/get-application').get_json()['created_at']
+    assert datetime.fromisoformat(created_at).utcoffset().total_seconds() == 0
@@ -0,0 +1,50 @@
+import hashlib
+import io
+
+from conftest import register
+
+CONTENT = b'%PDF-1.4\n' + b'transcript' * 100
+
+
+def upload(client, content=CONTENT):
+    response = client.post('/api/upload-file', data={'file': (io.BytesIO(content), 'transcript.pdf'), 'type': 'transcript'})
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()['fileId']
+
+
+def test_plain_file_urls_are_revalidated(app):
+    client = register(app, 'owner@example.com')
+    file_id = upload(client)
+
+    response = client.get(f'/api/files/{file_id}/view')
+    assert response.status_code == 200
+    assert response.data == CONTENT
+    assert response.headers['ETag'] == f'"{hashlib.sha256(CONTENT).hexdigest()}"'
+    assert response.cache_control.no_cache and response.cache_control.private
+    assert not response.cache_control.immutable and response.cache_control.max_age is None
+
+    response = client.get(f'/api/files/{file_id}/view', headers={'If-None-Match': response.headers['ETag']})
+    assert response.status_code == 304
+    assert response.cache_control.no_cache
+
+
+def test_content_versioned_urls_are_immutable(app):
+    client = register(app, 'owner@example.com')
+    file_id = upload(client)
+
+    response = client.get(f'/api/files/{file_id}/download?v={hashlib.sha256(CONTENT).hexdigest()}')
+    assert response.status_code == 200
+    assert response.cache_control.immutable and response.cache_control.max_age == 365 * 24 * 60 * 60
+
+    # A stale version must not be cached as if it were the current content
+    response = client.get(f'/api/files/{file_id}/download?v={"0" * 64}')
+    assert response.cache_control.no_cache and not response.cache_control.immutable
+
+
+def test_range_requests_return_partial_content(app):
+    client = register(app, 'owner@example.com')
+    file_id = upload(client)
+
+    response = client.get(f'/api/files/{file_id}/view', headers={'Range': 'bytes=0-8'})
+    assert response.status_code == 206
+    assert response.data == CONTENT[:9]
@@ -0,0 +1,26 @@
+import os
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+from app import create_app
+
+
+def test_create_app_touches_neither_database_nor_disk(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'never-created.db'}")
+    statements, connections = [], []
+    record_statement = lambda *args: statements.append(args[2])
+    record_connection = lambda *args: connections.append(1)
+    event.listen(Engine, 'before_cursor_execute', record_statement)
+    event.listen(Pool, 'connect', record_connection)
+    try:
+        create_app({'TESTING': True})
+    finally:
+        event.remove(Engine, 'before_cursor_execute', record_statement)
+        event.remove(Pool, 'connect', record_connection)
+
+    assert (statements, connections) == ([], [])
+    assert os.listdir(tmp_path) == []
+
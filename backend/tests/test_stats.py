@@ -0,0 +1,46 @@
+from conftest import register
+from models import db, ApplicationStatistic
+
+
+def submit(app, email, **fields):
+    response = register(app, email).post('/api/submit-application', json=fields)
+    assert response.status_code == 201
+    return response.get_json()['application_id']
+
+
+def test_counters_follow_inserts_updates_and_deletes(app, admin_client):
+    planning = submit(app, 'planning@example.com')
+    applied = submit(app, 'applied@example.com', enrollment_status='applied')
+    enrolled = submit(app, 'enrolled@example.com', enrollment_status='enrolled', enrolled_university='Tribhuvan University')
+
+    statistics = admin_client.get('/api/admin/enrollment-statistics').get_json()
+    assert statistics['total_applications'] == 3
+    assert statistics['status_counts'] == {'planning': 1, 'applied': 1, 'accepted': 0, 'enrolled': 1}
+
+    response = admin_client.put(f'/api/update-application-status/{applied}', json={
+        'enrollment_status': 'enrolled', 'enrolled_university': 'Kathmandu University'
+    })
+    assert response.status_code == 200
+    assert admin_client.delete(f'/api/delete-application/{enrolled}').status_code == 200
+    # Writes that don't touch the tracked fields leave the counters alone
+    assert admin_client.put(f'/api/update-application/{planning}', json={'first_name': 'Bina'}).status_code == 200
+
+    statistics = admin_client.get('/api/admin/enrollment-statistics').get_json()
+    assert statistics['total_applications'] == 2
+    assert statistics['status_counts'] == {'planning': 1, 'applied': 0, 'accepted': 0, 'enrolled': 1}
+    report = admin_client.get('/api/admin/university-report').get_json()
+    assert report['universities'] == [{'university': 'Kathmandu University', 'student_count': 1}]
+    assert report['total_enrolled'] == 1
+
+    assert admin_client.post('/api/admin/statistics/rebuild').get_json()['drift'] == []
+
+
+def test_rebuild_repairs_and_reports_drift(app, admin_client):
+    submit(app, 'applied@example.com', enrollment_status='applied')
+    with app.app_context():
+        ApplicationStatistic.query.filter_by(kind='status', key='applied').update({'count': 5})
+        db.session.commit()
+
+    response = admin_client.post('/api/admin/statistics/rebuild')
+    assert response.get_json()['drift'] == [{'kind': 'status', 'key': 'applied', 'stored': 5, 'actual': 1}]
+    assert admin_client.get('/api/admin/enrollment-statistics').get_json()['status_counts']['applied'] == 1
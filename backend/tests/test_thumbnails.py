@@ -0,0 +1,72 @@
+import io
+import os
+
+import pytest
+from PIL import Image
+
+import thumbnails
+from conftest import register
+from thumbnails import ThumbnailCache
+
+
+def image_bytes(size=(1200, 600), mode='RGBA', format='PNG'):
+    buffer = io.BytesIO()
+    Image.new(mode, size, (30, 120, 200, 128) if mode == 'RGBA' else (30, 120, 200)).save(buffer, format)
+    return buffer.getvalue()
+
+
+def upload(client, content, name='photo.png', file_type='photo'):
+    response = client.post('/api/upload-file', data={'file': (io.BytesIO(content), name), 'type': file_type})
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()['fileId']
+
+
+@pytest.fixture
+def client(app):
+    return register(app, 'owner@example.com')
+
+
+def test_thumbnail_is_rendered_once_then_served_from_the_cache(client, monkeypatch):
+    file_id = upload(client, image_bytes())
+    renders = []
+    render_thumbnail = thumbnails.render_thumbnail
+    monkeypatch.setattr(thumbnails, 'render_thumbnail', lambda *args: renders.append(args) or render_thumbnail(*args))
+
+    response = client.get(f'/api/files/{file_id}/thumbnail?size=avatar')
+    assert response.status_code == 200 and response.mimetype == 'image/jpeg'
+    with Image.open(io.BytesIO(response.data)) as image:
+        assert (image.format, image.size) == ('JPEG', (64, 32))
+
+    etag = response.headers['ETag']
+    assert client.get(f'/api/files/{file_id}/thumbnail?size=avatar').data == response.data
+    assert client.get(f'/api/files/{file_id}/thumbnail?size=avatar', headers={'If-None-Match': etag}).status_code == 304
+    assert len(renders) == 1
+
+    # Each size is its own derivative
+    response = client.get(f'/api/files/{file_id}/thumbnail')
+    assert response.headers['ETag'] != etag and len(renders) == 2
+
+
+def test_thumbnails_are_refused_for_other_files_and_sizes(app, client):
+    photo_id = upload(client, image_bytes())
+    transcript_id = upload(client, b'%PDF-1.4\n', 'transcript.pdf', 'transcript')
+
+    assert client.get(f'/api/files/{photo_id}/thumbnail?size=huge').status_code == 400
+    assert client.get(f'/api/files/{transcript_id}/thumbnail').status_code == 400
+    assert register(app, 'other@example.com').get(f'/api/files/{photo_id}/thumbnail').status_code == 403
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path):
+    image = Image.new('RGB', (50, 50), (10, 20, 30))
+    entry_size = os.path.getsize(ThumbnailCache(str(tmp_path / 'probe'), max_bytes=10 ** 6).put('probe', 'avatar', image))
+
+    cache = ThumbnailCache(str(tmp_path / 'cache'), max_bytes=int(entry_size * 2.5))
+    first = cache.put('aa11', 'avatar', image)
+    second = cache.put('bb22', 'avatar', image)
+    os.utime(first, (0, 0))
+    os.utime(second, (1, 1))
+    assert cache.get('aa11', 'avatar') == first  # A hit makes it the most recently used
+
+    cache.put('cc33', 'avatar', image)
+    assert cache.get('bb22', 'avatar') is None
+    assert cache.get('aa11', 'avatar') and cache.get('cc33', 'avatar')
@@ -0,0 +1,42 @@
+from conftest import register
+from universities import split_universities
+
+
+def submit(app, email, **fields):
+    response = register(app, email).post('/api/submit-application', json=fields)
+    assert response.status_code == 201
+    return response.get_json()['application_id']
+
+
+def test_free_text_lists_are_split_and_deduplicated():
+    assert split_universities('MIT, Stanford;\n mit ;  Tribhuvan   University,,') == ['MIT', 'Stanford', 'Tribhuvan University']
+    assert split_universities(None) == []
+
+
+def test_funnel_counts_each_university_by_status(app, admin_client):
+    first = submit(app, 'first@example.com', target_universities='MIT, Stanford', applied_universities='MIT')
+    submit(app, 'second@example.com', target_universities='mit', applied_universities='Stanford', accepted_universities='Stanford')
+
+    funnel = admin_client.get('/api/admin/university-funnel').get_json()['universities']
+    assert funnel == [
+        {'university': 'MIT', 'target': 2, 'applied': 1, 'accepted': 0, 'enrolled': 0},
+        {'university': 'Stanford', 'target': 1, 'applied': 1, 'accepted': 1, 'enrolled': 0}
+    ]
+
+    # Links follow edits to the free-text fields
+    response = admin_client.put(f'/api/update-application-status/{first}', json={
+        'applied_universities': '', 'enrollment_status': 'enrolled', 'enrolled_university': 'Stanford'
+    })
+    assert response.status_code == 200
+    funnel = admin_client.get('/api/admin/university-funnel?university=stan').get_json()['universities']
+    assert funnel == [{'university': 'Stanford', 'target': 1, 'applied': 1, 'accepted': 1, 'enrolled': 1}]
+
+
+def test_dashboard_filters_by_linked_university(app, admin_client):
+    submit(app, 'mit@example.com', applied_universities='Massachusetts Institute of Technology')
+    stanford = submit(app, 'stanford@example.com', target_universities='Stanford University')
+
+    applications = admin_client.get('/api/get-all-applications?university=STANFORD').get_json()['applications']
+    assert [application['id'] for application in applications] == [stanford]
+    # LIKE wildcards in the search text are matched literally
+    assert admin_client.get('/api/get-all-applications?university=%25').get_json()['applications'] == []
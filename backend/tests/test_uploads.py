@@ -0,0 +1,79 @@
+import hashlib
+import io
+import threading
+import time
+
+from conftest import log_in, register
+
+CHUNK = 256 * 1024
+
+
+class SlowBody(io.BytesIO):
+    """A request body that trickles in, so two requests overlap while writing."""
+
+    def __init__(self, data, delay):
+        super().__init__(data)
+        self.delay = delay
+
+    def read(self, size=-1):
+        time.sleep(self.delay)
+        return super().read(16 * 1024 if size < 0 else min(size, 16 * 1024))
+
+
+def start_upload(client, size):
+    response = client.post('/api/uploads', json={'filename': 'cv.pdf', 'type': 'cv', 'size': size})
+    assert response.status_code == 201
+    return response.get_json()['id']
+
+
+def test_concurrent_puts_at_same_offset_keep_file_and_digest_consistent(app):
+    client = register(app, 'uploader@example.com')
+    upload_id = start_upload(client, CHUNK)
+    bodies = {'A': b'A' * CHUNK, 'B': b'B' * CHUNK}
+    # A slow original request and a quick retry that starts while it is still writing
+    delays = {'A': 0.01, 'B': 0.001}
+    statuses = {}
+
+    def put(name):
+        thread_client = log_in(app.test_client(), 'uploader@example.com', 'password123')
+        response = thread_client.put(
+            f'/api/uploads/{upload_id}?offset=0',
+            input_stream=SlowBody(bodies[name], delays[name]),
+            headers={'Content-Type': 'application/octet-stream', 'Content-Length': str(CHUNK)}
+        )
+        statuses[name] = response.status_code
+
+    threads = [threading.Thread(target=put, args=(name,)) for name in bodies]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.05)
+    for thread in threads:
+        thread.join()
+
+    # One write wins; the other sees the offset has moved on
+    assert sorted(statuses.values()) == [200, 409]
+    winner = next(name for name, status in statuses.items() if status == 200)
+
+    response = client.post(f'/api/uploads/{upload_id}/complete', json={})
+    assert response.status_code == 201
+    digest = response.get_json()['sha256']
+    assert digest == hashlib.sha256(bodies[winner]).hexdigest()
+
+    with app.app_context():
+        from models import File
+        stored = File.query.get(response.get_json()['fileId'])
+        with open(stored.file_path, 'rb') as f:
+            assert hashlib.sha256(f.read()).hexdigest() == digest
+
+
+def test_complete_rejects_checksum_of_other_content(app):
+    client = register(app, 'checksum@example.com')
+    data = b'%PDF-1.4\n' + b'x' * 1000
+    upload_id = start_upload(client, len(data))
+    assert client.put(f'/api/uploads/{upload_id}?offset=0', data=data).status_code == 200
+
+    response = client.post(f'/api/uploads/{upload_id}/complete', json={'sha256': hashlib.sha256(b'other').hexdigest()})
+    assert response.status_code == 400
+
+    response = client.post(f'/api/uploads/{upload_id}/complete', json={'sha256': hashlib.sha256(data).hexdigest()})
+    assert response.status_code == 201
@@ -0,0 +1,103 @@
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+import user_import
+from conftest import ADMIN_EMAIL
+from models import db, ImportJob, User
+
+
+def wait_for_job(client, job_id, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f'/api/admin/import-jobs/{job_id}').get_json()
+        if job['status'] in ('completed', 'failed'):
+            return job
+        time.sleep(0.1)
+    raise AssertionError(f'import job still {job["status"]} after {timeout}s')
+
+
+def test_import_runs_in_background_and_reports_rows(app, admin_client):
+    users = [
+        {'email': 'one@example.com', 'password': 'secret1'},
+        {'email': 'two@example.com', 'password': 'secret2', 'is_admin': 'yes'},
+        {'email': 'not-an-email', 'password': 'secret3'},
+        {'email': ADMIN_EMAIL, 'password': 'secret4'}
+    ]
+    response = admin_client.post('/api/admin/import-users', json=users)
+    assert response.status_code == 202
+    assert response.get_json()['total'] == 4
+
+    job = wait_for_job(admin_client, response.get_json()['id'])
+    assert job['status'] == 'completed'
+    assert (job['processed'], job['created'], job['failed']) == (4, 2, 2)
+    assert [(error['row'], error['message']) for error in job['errors']] == [
+        (3, 'Invalid email address'), (4, 'Email already registered')
+    ]
+
+    with app.app_context():
+        user = User.query.filter_by(email='two@example.com').one()
+        assert user.is_admin and user.check_password('secret2')
+
+
+def test_import_commits_each_batch_as_it_is_hashed(app, monkeypatch):
+    monkeypatch.setattr(user_import, 'IMPORT_BATCH_SIZE', 2)
+    records = [{'email': f'user{i}@example.com', 'password': 'secret'} for i in range(5)]
+    seen = []
+
+    def progress(processed, created, errors):
+        # Earlier batches are already visible to other connections
+        with db.engine.connect() as connection:
+            stored = connection.execute(db.select(db.func.count()).select_from(User.__table__)).scalar()
+        seen.append((processed, created, stored))
+
+    with app.app_context():
+        report = user_import.import_users(records, progress)
+
+    assert report['created'] == 5
+    assert seen == [(2, 2, 3), (4, 4, 5), (5, 5, 6)]
+
+
+def test_registered_emails_are_looked_up_once_for_the_whole_import(app, monkeypatch):
+    monkeypatch.setattr(user_import, 'IMPORT_BATCH_SIZE', 2)
+    monkeypatch.setattr(user_import, 'EMAIL_LOOKUP_CHUNK_SIZE', 4)
+    records = [{'email': f'user{i}@example.com', 'password': 'secret'} for i in range(6)]
+    records.insert(3, {'email': ADMIN_EMAIL, 'password': 'secret'})
+    lookups = []
+
+    def capture(connection, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith('SELECT user.email'):
+            lookups.append(len(parameters))
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        try:
+            report = user_import.import_users(records)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capture)
+
+    assert sorted(lookups) == [3, 4]
+    assert report['created'] == 6
+    assert [(error['row'], error['message']) for error in report['errors']] == [(4, 'Email already registered')]
+
+
+def test_import_rejects_oversized_files_up_front(app, admin_client, monkeypatch):
+    monkeypatch.setattr(user_import, 'MAX_IMPORT_ROWS', 2)
+    records = [{'email': f'user{i}@example.com', 'password': 'secret'} for i in range(3)]
+    response = admin_client.post('/api/admin/import-users', json=records)
+    assert response.status_code == 400
+    with app.app_context():
+        assert ImportJob.query.count() == 0
+
+
+def test_job_lost_with_its_worker_is_reported_failed(app, admin_client):
+    with app.app_context():
+        job = ImportJob(total=10, status='running', heartbeat_at=datetime.utcnow() - timedelta(hours=1))
+        db.session.add(job)
+        db.session.commit()
+        job_id = job.id
+
+    job = admin_client.get(f'/api/admin/import-jobs/{job_id}').get_json()
+    assert job['status'] == 'failed'
+    assert 'interrupted' in job['error']
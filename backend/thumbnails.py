@@ -0,0 +1,148 @@
+import os
+import threading
+import uuid
+
+from flask import current_app
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# Longest edge in pixels for each derivative size
+THUMBNAIL_SIZES = {
+    'avatar': 64,
+    'thumbnail': 200,
+    'preview': 800
+}
+
+DEFAULT_THUMBNAIL_SIZE = 'thumbnail'
+
+THUMBNAIL_QUALITY = 85
+
+# When the cache is over its limit, evict down to this fraction of it
+EVICTION_TARGET = 0.9
+
+
+class ThumbnailCache:
+    """
+    Size-bounded disk cache of image derivatives with LRU eviction. A file's
+    mtime is bumped on every hit, so eviction removes the least recently
+    used entries first. The running total is per process; eviction rescans
+    the directory, which also picks up entries written by other workers.
+    """
+
+    def __init__(self, folder, max_bytes):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.total_bytes = None
+        self.lock = threading.Lock()
+
+    def path_for(self, key, size):
+        return os.path.join(self.folder, key[:2], f'{key}_{size}.jpg')
+
+    def get(self, key, size):
+        """Return the cached derivative's path, or None on a miss."""
+        path = self.path_for(key, size)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key, size, image):
+        """Write a derivative atomically, evicting old entries if the cache is full."""
+        path = self.path_for(key, size)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+        image.save(temp_path, 'JPEG', quality=THUMBNAIL_QUALITY, optimize=True)
+        written = os.path.getsize(temp_path)
+        os.replace(temp_path, path)
+
+        with self.lock:
+            if self.total_bytes is None:
+                self.total_bytes = self.scan_size()
+            else:
+                self.total_bytes += written
+            if self.total_bytes > self.max_bytes:
+                self.evict()
+        return path
+
+    def entries(self):
+        for root, dirs, files in os.walk(self.folder):
+            for name in files:
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield stat.st_mtime, stat.st_size, path
+
+    def scan_size(self):
+        return sum(size for mtime, size, path in self.entries())
+
+    def evict(self):
+        """Remove least recently used entries until the cache is under its target size."""
+        entries = sorted(self.entries())
+        total = sum(size for mtime, size, path in entries)
+        target = self.max_bytes * EVICTION_TARGET
+        for mtime, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self.total_bytes = total
+
+
+def get_thumbnail_cache():
+    """Return the app's thumbnail cache, creating it on first use."""
+    cache = current_app.extensions.get('thumbnail_cache')
+    if cache is None:
+        cache = ThumbnailCache(
+            current_app.config['THUMBNAIL_FOLDER'],
+            current_app.config['THUMBNAIL_CACHE_SIZE']
+        )
+        current_app.extensions['thumbnail_cache'] = cache
+    return cache
+
+
+def render_thumbnail(source_path, edge):
+    """
+    Decode an image and shrink it to fit within edge x edge pixels. JPEG
+    sources are decoded at reduced scale, so large photos stay cheap.
+    Raises ValueError if the file isn't a readable image.
+    """
+    try:
+        with Image.open(source_path) as image:
+            image.draft('RGB', (edge, edge))
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((edge, edge))
+            if image.mode in ('RGBA', 'LA', 'P'):
+                # JPEG has no alpha channel; flatten onto white
+                image = image.convert('RGBA')
+                background = Image.new('RGB', image.size, (255, 255, 255))
+                background.paste(image, mask=image.split()[-1])
+                return background
+            return image.convert('RGB')
+    except FileNotFoundError:
+        raise
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        raise ValueError('File is not a readable image')
+
+
+def get_thumbnail(file, size, key):
+    """
+    Return the path of the `size` derivative of a File, generating it on
+    first request. `key` identifies the file's content. Raises ValueError
+    for unknown sizes or unreadable images, FileNotFoundError if the source
+    is missing.
+    """
+    if size not in THUMBNAIL_SIZES:
+        raise ValueError(f'Invalid size. Allowed sizes: {", ".join(THUMBNAIL_SIZES)}')
+
+    cache = get_thumbnail_cache()
+    path = cache.get(key, size)
+    if path is None:
+        path = cache.put(key, size, render_thumbnail(file.file_path, THUMBNAIL_SIZES[size]))
+    return path
@@ -0,0 +1,136 @@
+import re
+
+from models import db, Application, University, ApplicationUniversity
+
+# Application columns holding university names, keyed by link status
+UNIVERSITY_STATUS_FIELDS = {
+    'target': 'target_universities',
+    'applied': 'applied_universities',
+    'accepted': 'accepted_universities',
+    'enrolled': 'enrolled_university'
+}
+
+UNIVERSITY_STATUSES = list(UNIVERSITY_STATUS_FIELDS)
+
+BACKFILL_BATCH_SIZE = 500
+
+
+def university_key(name):
+    """Normalize a university name for matching: lowercase with collapsed whitespace."""
+    return ' '.join(name.lower().split())
+
+
+def split_universities(value):
+    """Split a free-text list of universities (comma, semicolon or newline separated)."""
+    names = []
+    seen = set()
+    for part in re.split(r'[,;\n]', value or ''):
+        name = ' '.join(part.split())
+        if name and university_key(name) not in seen:
+            seen.add(university_key(name))
+            names.append(name[:200])
+    return names
+
+
+def get_or_create_universities(names):
+    """Return a dict mapping name keys to University rows, creating missing ones."""
+    keys = {university_key(name): name for name in names}
+    if not keys:
+        return {}
+
+    universities = {
+        university.name_key: university
+        for university in University.query.filter(University.name_key.in_(list(keys))).all()
+    }
+    for key, name in keys.items():
+        if key not in universities:
+            university = University(name=name, name_key=key)
+            db.session.add(university)
+            universities[key] = university
+    db.session.flush()
+    return universities
+
+
+def sync_application_universities(application):
+    """
+    Bring the application's university links in line with its free-text
+    university fields. Runs inside the caller's transaction.
+    """
+    wanted = {}
+    for status, field in UNIVERSITY_STATUS_FIELDS.items():
+        for name in split_universities(getattr(application, field)):
+            wanted[(university_key(name), status)] = name
+
+    universities = get_or_create_universities(wanted.values())
+
+    current = {}
+    for link in list(application.university_links):
+        key = (link.university.name_key, link.status)
+        if key in wanted and key not in current:
+            current[key] = link
+        else:
+            application.university_links.remove(link)
+
+    for (key, status) in wanted:
+        if (key, status) not in current:
+            application.university_links.append(
+                ApplicationUniversity(university=universities[key], status=status)
+            )
+
+
+def matching_university_ids(query):
+    """Subquery of ids of universities whose name contains `query` (case-insensitive)."""
+    return db.session.query(University.id).filter(University.name_key.contains(university_key(query), autoescape=True))
+
+
+def backfill_application_universities():
+    """Rebuild university links for every application. Returns the number processed."""
+    processed = 0
+    last_id = 0
+    while True:
+        applications = Application.query.filter(Application.id > last_id) \
+            .order_by(Application.id).limit(BACKFILL_BATCH_SIZE).all()
+        if not applications:
+            break
+        for application in applications:
+            sync_application_universities(application)
+        db.session.commit()
+        processed += len(applications)
+        last_id = applications[-1].id
+    return processed
+
+
+def ensure_university_links():
+    """Backfill university links once for databases created before the link table existed."""
+    if ApplicationUniversity.query.first() is not None:
+        return
+    has_universities = Application.query.filter(db.or_(*[
+        db.and_(getattr(Application, field) != None, getattr(Application, field) != '')
+        for field in UNIVERSITY_STATUS_FIELDS.values()
+    ])).first()
+    if has_universities:
+        backfill_application_universities()
+
+
+def university_funnel(query=None):
+    """
+    Count applications per university and link status. Optionally limited to
+    universities whose name contains `query`. Returns a list of dicts sorted
+    by university name.
+    """
+    rows = db.session.query(
+        University.id,
+        University.name,
+        ApplicationUniversity.status,
+        db.func.count(ApplicationUniversity.application_id)
+    ).join(ApplicationUniversity, ApplicationUniversity.university_id == University.id)
+
+    if query:
+        rows = rows.filter(University.id.in_(matching_university_ids(query)))
+
+    funnel = {}
+    for university_id, name, status, count in rows.group_by(University.id, University.name, ApplicationUniversity.status):
+        entry = funnel.setdefault(university_id, dict({'university': name}, **{s: 0 for s in UNIVERSITY_STATUSES}))
+        entry[status] = count
+
+    return sorted(funnel.values(), key=lambda entry: entry['university'].lower())
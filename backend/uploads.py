@@ -0,0 +1,179 @@
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; uploads are then only serialized within a process
+    fcntl = None
+
+from sqlalchemy.exc import InvalidRequestError
+
+from models import db, UploadSession
+
+# Size of the buffer used when copying request bodies and files
+READ_BUFFER_SIZE = 64 * 1024
+
+# Fallback per-upload locks for platforms without fcntl
+_upload_locks = {}
+_upload_locks_lock = threading.Lock()
+
+
+class UploadOffsetError(Exception):
+    """Raised when a chunk doesn't start where the stored upload ends."""
+
+    def __init__(self, expected_offset):
+        super().__init__(f'Chunk must start at offset {expected_offset}')
+        self.expected_offset = expected_offset
+
+
+def partial_upload_path(user_dir, upload_id):
+    partial_dir = os.path.join(user_dir, '.partial')
+    if not os.path.exists(partial_dir):
+        os.makedirs(partial_dir)
+    return os.path.join(partial_dir, f'{upload_id}.part')
+
+
+def start_upload(user_id, user_dir, original_name, file_type, total_size, application_id=None):
+    """Create an upload session with an empty partial file."""
+    upload = UploadSession(
+        user_id=user_id,
+        application_id=application_id,
+        original_name=original_name,
+        file_type=file_type,
+        total_size=total_size,
+        received_size=0,
+        temp_path=''
+    )
+    db.session.add(upload)
+    db.session.flush()
+    upload.temp_path = partial_upload_path(user_dir, upload.id)
+    open(upload.temp_path, 'wb').close()
+    db.session.commit()
+    return upload
+
+
+@contextmanager
+def locked_upload(upload):
+    """
+    Hold an exclusive lock on the upload's partial file, across threads and
+    worker processes, and yield the file opened for reading and writing.
+    The upload is reloaded once the lock is held, so its received_size
+    can't change until the block exits. Raises ValueError if the upload
+    expired in the meantime.
+    """
+    try:
+        f = open(upload.temp_path, 'r+b')
+    except FileNotFoundError:
+        raise ValueError('Upload has expired')
+    with f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            lock = None
+        else:
+            with _upload_locks_lock:
+                lock = _upload_locks.setdefault(upload.id, threading.Lock())
+            lock.acquire()
+        try:
+            # End the current transaction so the reload sees other workers' commits
+            db.session.commit()
+            try:
+                db.session.refresh(upload)
+            except InvalidRequestError:
+                raise ValueError('Upload has expired')
+            yield f
+        finally:
+            if lock is not None:
+                lock.release()
+            # Closing the file releases the flock
+
+
+def append_chunk(upload, stream, offset):
+    """
+    Append a chunk read from `stream` to the partial file at `offset`. Only
+    READ_BUFFER_SIZE bytes are held in memory at a time. The upload is locked
+    for the whole write, so concurrent requests for the same offset (e.g. a
+    client retrying a chunk that is still being written) run one after the
+    other and the second gets an UploadOffsetError. Raises
+    UploadOffsetError or ValueError; nothing is recorded in that case.
+    """
+    with locked_upload(upload) as f:
+        if offset != upload.received_size:
+            raise UploadOffsetError(upload.received_size)
+
+        remaining = upload.total_size - offset
+        written = 0
+
+        # Drop bytes left behind by an earlier chunk that failed part way
+        f.seek(offset)
+        f.truncate()
+        while True:
+            data = stream.read(READ_BUFFER_SIZE)
+            if not data:
+                break
+            written += len(data)
+            if written > remaining:
+                f.truncate(offset)
+                raise ValueError('Chunk extends past the declared file size')
+            f.write(data)
+        f.flush()
+
+        # Still compare-and-set, in case the session was expired and removed meanwhile
+        updated = UploadSession.query.filter_by(id=upload.id, received_size=offset).update({
+            'received_size': offset + written,
+            'updated_at': datetime.utcnow()
+        })
+        db.session.commit()
+        if not updated:
+            raise UploadOffsetError(offset)
+
+    db.session.refresh(upload)
+    return written
+
+
+def finish_upload(upload, expected_sha256=None):
+    """
+    Verify a fully received upload and close its session. The partial file
+    is hashed afresh under the upload lock and left at upload.temp_path for
+    the caller to store. Returns the SHA-256 hex digest. Raises ValueError if
+    the upload is incomplete or the checksum doesn't match.
+    """
+    with locked_upload(upload) as f:
+        if upload.received_size != upload.total_size or os.fstat(f.fileno()).st_size != upload.total_size:
+            raise ValueError(f'Upload incomplete: received {upload.received_size} of {upload.total_size} bytes')
+
+        hasher = hashlib.sha256()
+        f.seek(0)
+        for data in iter(lambda: f.read(READ_BUFFER_SIZE), b''):
+            hasher.update(data)
+        digest = hasher.hexdigest()
+
+    if expected_sha256 and expected_sha256.lower() != digest:
+        raise ValueError('Checksum mismatch')
+
+    discard_upload(upload, remove_file=False)
+    return digest
+
+
+def discard_upload(upload, remove_file=True):
+    """Delete an upload session (in the current transaction) and its partial file."""
+    if remove_file and os.path.exists(upload.temp_path):
+        os.remove(upload.temp_path)
+    with _upload_locks_lock:
+        _upload_locks.pop(upload.id, None)
+    db.session.delete(upload)
+
+
+def expire_stale_uploads(max_age):
+    """Remove upload sessions that haven't received data for `max_age`. Returns the number removed."""
+    stale = UploadSession.query.filter(UploadSession.updated_at < datetime.utcnow() - max_age).all()
+    for upload in stale:
+        discard_upload(upload)
+    db.session.commit()
+    return len(stale)
+
+
+def upload_expiry(app):
+    return timedelta(hours=app.config['UPLOAD_EXPIRY_HOURS'])
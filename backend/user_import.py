@@ -0,0 +1,338 @@
+import csv
+import io
+import json
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from werkzeug.security import generate_password_hash
+
+from models import db, User, ImportJob
+
+IMPORT_FIELDS = ['email', 'password', 'first_name', 'last_name', 'contact_number', 'is_admin']
+
+# Maximum number of users accepted in one import
+MAX_IMPORT_ROWS = 10000
+
+# Users inserted per transaction
+IMPORT_BATCH_SIZE = 500
+
+# Emails bound per existing-user lookup; below SQLite's 999 variable limit
+EMAIL_LOOKUP_CHUNK_SIZE = 900
+
+# Passwords sent to a worker process at a time
+HASH_CHUNK_SIZE = 50
+
+# A queued or running import whose worker hasn't reported for this long is
+# treated as lost; a batch takes about a minute to hash on a single CPU
+IMPORT_JOB_STALE_AFTER = timedelta(minutes=5)
+
+TRUE_VALUES = ('1', 'true', 'yes', 'y')
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_hash_pool():
+    """Return the shared process pool used for password hashing, starting it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawn rather than fork, for the same reasons as the report job pool
+            _pool = ProcessPoolExecutor(
+                max_workers=current_app.config['IMPORT_WORKERS'] or os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _pool
+
+
+def hash_password(password):
+    """Runs in a worker process."""
+    return generate_password_hash(password)
+
+
+def hash_passwords(passwords):
+    """Hash passwords across the process pool, preserving order."""
+    if len(passwords) <= 1:
+        return [hash_password(password) for password in passwords]
+    return list(get_hash_pool().map(hash_password, passwords, chunksize=HASH_CHUNK_SIZE))
+
+
+def parse_import_file(filename, content):
+    """
+    Parse an uploaded CSV (with a header row) or JSON file into a list of
+    dicts. Raises ValueError for unreadable content.
+    """
+    try:
+        text = content.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        raise ValueError('Import file must be UTF-8 encoded')
+
+    if filename.lower().endswith('.json'):
+        try:
+            return parse_import_records(json.loads(text))
+        except json.JSONDecodeError:
+            raise ValueError('Import file is not valid JSON')
+
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames or 'email' not in [name.strip() for name in reader.fieldnames]:
+        raise ValueError('CSV must have a header row with at least email and password columns')
+    return [{(key or '').strip(): value for key, value in row.items()} for row in reader]
+
+
+def parse_import_records(data):
+    """Accept a JSON list of users or an object with a 'users' list."""
+    if isinstance(data, dict):
+        data = data.get('users')
+    if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+        raise ValueError('Expected a list of users')
+    return data
+
+
+def clean_row(row):
+    """Return (user fields, error message) for one import row."""
+    values = {}
+    for field in IMPORT_FIELDS:
+        value = row.get(field)
+        values[field] = value.strip() if isinstance(value, str) else value
+
+    if not values['email'] or not values['password']:
+        return None, 'Email and password are required'
+    if not isinstance(values['email'], str) or '@' not in values['email'] or len(values['email']) > 120:
+        return None, 'Invalid email address'
+    if not isinstance(values['password'], str):
+        return None, 'Invalid password'
+
+    is_admin = values['is_admin']
+    if isinstance(is_admin, str):
+        is_admin = is_admin.lower() in TRUE_VALUES
+
+    return {
+        'email': values['email'],
+        'password': values['password'],
+        'is_admin': bool(is_admin),
+        'first_name': str(values['first_name'] or '')[:100],
+        'last_name': str(values['last_name'] or '')[:100],
+        'contact_number': str(values['contact_number'] or '')[:20]
+    }, None
+
+
+def insert_users(rows):
+    """
+    Insert one batch in a single transaction. If the batch conflicts with
+    users created concurrently, fall back to row-by-row inserts so only the
+    conflicting rows fail. Returns (created, errors).
+    """
+    try:
+        db.session.execute(db.insert(User), [fields for index, fields in rows])
+        db.session.commit()
+        return len(rows), []
+    except IntegrityError:
+        db.session.rollback()
+
+    created = 0
+    errors = []
+    for index, fields in rows:
+        try:
+            db.session.execute(db.insert(User), [fields])
+            db.session.commit()
+            created += 1
+        except IntegrityError:
+            db.session.rollback()
+            errors.append({'row': index, 'email': fields['email'], 'message': 'Email already registered'})
+    return created, errors
+
+
+def registered_emails(emails):
+    """Return the subset of `emails` that already belong to a user, looked up in chunks."""
+    emails = list(emails)
+    existing = set()
+    for start in range(0, len(emails), EMAIL_LOOKUP_CHUNK_SIZE):
+        existing.update(db.session.scalars(
+            db.select(User.email).where(User.email.in_(emails[start:start + EMAIL_LOOKUP_CHUNK_SIZE]))
+        ))
+    return existing
+
+
+def check_import_size(records):
+    """Raise ValueError unless `records` holds between 1 and MAX_IMPORT_ROWS rows."""
+    if not records:
+        raise ValueError('No users to import')
+    if len(records) > MAX_IMPORT_ROWS:
+        raise ValueError(f'A single import may contain at most {MAX_IMPORT_ROWS} users')
+
+
+def import_users(records, progress=None):
+    """
+    Validate and create users in bulk. Rows are numbered from 1 in the
+    order given. Valid rows are hashed and inserted IMPORT_BATCH_SIZE at a
+    time, so each batch is committed as soon as its passwords are hashed;
+    after every batch `progress(processed, created, errors)` is called if
+    given. Returns a report dict with counts and per-row errors. Raises
+    ValueError if the import as a whole is invalid.
+    """
+    check_import_size(records)
+
+    errors = []
+    valid = []
+    seen = set()
+    for index, row in enumerate(records, start=1):
+        fields, error = clean_row(row)
+        if error is None and fields['email'] in seen:
+            error = 'Duplicate email in import'
+        if error:
+            errors.append({'row': index, 'email': row.get('email'), 'message': error})
+            continue
+        seen.add(fields['email'])
+        valid.append((index, fields))
+
+    # Emails already registered are looked up for the whole import before any
+    # hashing; users created meanwhile are caught by insert_users
+    existing = registered_emails(seen)
+    for index, fields in valid:
+        if fields['email'] in existing:
+            errors.append({'row': index, 'email': fields['email'], 'message': 'Email already registered'})
+    valid = [(index, fields) for index, fields in valid if fields['email'] not in existing]
+
+    created = 0
+    processed = len(errors)
+    for start in range(0, len(valid), IMPORT_BATCH_SIZE):
+        rows = valid[start:start + IMPORT_BATCH_SIZE]
+
+        hashes = hash_passwords([fields['password'] for index, fields in rows])
+        rows = [(index, dict(fields, password=password_hash)) for (index, fields), password_hash in zip(rows, hashes)]
+
+        batch_created, batch_errors = insert_users(rows)
+        created += batch_created
+        errors.extend(batch_errors)
+        processed += len(rows)
+        if progress:
+            progress(processed, created, errors)
+
+    errors.sort(key=lambda error: error['row'])
+    return {
+        'total': len(records),
+        'created': created,
+        'failed': len(errors),
+        'errors': errors
+    }
+
+
+def fail_stale_import_job(job):
+    """
+    Mark a queued or running import failed when the worker holding it has
+    stopped reporting, e.g. because it was restarted. Rows are only held in
+    that worker's memory, so the job can't be resumed elsewhere; users
+    created before it stopped are kept. Returns True if the job was failed.
+    """
+    if job.status not in ('queued', 'running'):
+        return False
+    if job.heartbeat_at and job.heartbeat_at > datetime.utcnow() - IMPORT_JOB_STALE_AFTER:
+        return False
+    job.status = 'failed'
+    job.error = 'The import was interrupted before it finished; users created until then were kept'
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+    return True
+
+
+class ImportJobRunner:
+    """
+    Runs bulk user imports in the background, so hashing thousands of
+    passwords never holds a request open past the server's timeout.
+
+    Parsed rows are queued in memory with their job id (plaintext passwords
+    are never written to the database) and imported one job at a time by a
+    coordinator thread. Progress and the per-row report are committed to the
+    ImportJob table after every batch so that any worker can answer status
+    polls; the same commits refresh the heartbeat of this worker's jobs.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.jobs = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.pending = set()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['import_jobs'] = self
+
+    def submit(self, job_id, records):
+        self.start()
+        with self.lock:
+            self.pending.add(job_id)
+        self.jobs.put((job_id, records))
+
+    def start(self):
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.thread = threading.Thread(target=self.run, name='import-jobs', daemon=True)
+            self.thread.start()
+
+    def run(self):
+        while True:
+            job_id, records = self.jobs.get()
+            with self.app.app_context():
+                try:
+                    self.process(job_id, records)
+                except Exception as e:
+                    self.app.logger.error(f"Import job {job_id} failed: {str(e)}")
+                    db.session.rollback()
+                    job = ImportJob.query.get(job_id)
+                    if job:
+                        job.status = 'failed'
+                        job.error = str(e)
+                        job.finished_at = datetime.utcnow()
+                        db.session.commit()
+                finally:
+                    with self.lock:
+                        self.pending.discard(job_id)
+                    db.session.remove()
+
+    def heartbeat(self):
+        """Show that this worker is still holding its queued and running jobs."""
+        with self.lock:
+            job_ids = list(self.pending)
+        if job_ids:
+            ImportJob.query.filter(ImportJob.id.in_(job_ids)).update(
+                {'heartbeat_at': datetime.utcnow()}, synchronize_session=False
+            )
+
+    def process(self, job_id, records):
+        # Claim the job unless a status poll already gave up on it
+        now = datetime.utcnow()
+        claimed = ImportJob.query.filter_by(id=job_id, status='queued').update(
+            {'status': 'running', 'started_at': now, 'heartbeat_at': now}, synchronize_session=False
+        )
+        db.session.commit()
+        if not claimed:
+            return
+
+        def progress(processed, created, errors):
+            ImportJob.query.filter_by(id=job_id).update({
+                'processed': processed,
+                'created': created,
+                'errors': json.dumps(sorted(errors, key=lambda error: error['row']))
+            }, synchronize_session=False)
+            self.heartbeat()
+            db.session.commit()
+
+        report = import_users(records, progress)
+
+        job = ImportJob.query.get(job_id)
+        job.status = 'completed'
+        job.processed = report['total']
+        job.created = report['created']
+        job.errors = json.dumps(report['errors'])
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
@@ -0,0 +1,11 @@
+"""
+Production entry point:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Building the app does no database work, so it is safe to preload in the
+gunicorn master. Run `flask init-db` once per deployment before starting.
+"""
+from app import create_app
+
+app = create_app()
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useMemo } from 'react';
+import React, { useState, useEffect, useCallback } from 'react';
 import { Link } from 'react-router-dom';
 import axios from '../services/axiosConfig';
 import jsPDF from 'jspdf';
@@ -8,7 +8,10 @@ import { CSVLink } from 'react-csv';
 const AdminDashboard = () => {
   // State management
   const [applications, setApplications] = useState([]);
+  const [analytics, setAnalytics] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState('');
   const [deleteSuccess, setDeleteSuccess] = useState('');
   const [generatingReport, setGeneratingReport] = useState(false);
@@ -16,6 +19,7 @@ const AdminDashboard = () => {
   const [showReportModal, setShowReportModal] = useState(false);
   const [reportFormat, setReportFormat] = useState('pdf');
   const [selectedApplication, setSelectedApplication] = useState(null);
+  const [reportJob, setReportJob] = useState(null);
 
   // Advanced filtering state
   const [filters, setFilters] = useState({
@@ -41,13 +45,31 @@ const AdminDashboard = () => {
     { label: "English Proficiency", key: "english_proficiency" }
   ];
 
-  // Fetch applications data
+  // Translate dashboard filters into query parameters for the search API
+  const buildSearchParams = useCallback((cursor) => {
+    const params = { sort_by: filters.sortBy, view: 'summary' };
+
+    if (filters.searchQuery) params.q = filters.searchQuery;
+    if (filters.gender) params.gender = filters.gender;
+    if (filters.enrollmentStatus) params.enrollment_status = filters.enrollmentStatus;
+    if (filters.university) params.university = filters.university;
+    if (filters.finalPercentage) {
+      const [min, max] = filters.finalPercentage.split('-');
+      params.min_percentage = min;
+      params.max_percentage = max;
+    }
+    if (cursor) params.cursor = cursor;
+
+    return params;
+  }, [filters]);
+
+  // Fetch the first page of applications whenever the filters change
   useEffect(() => {
     const fetchApplications = async () => {
       try {
-        setLoading(true);
-        const response = await axios.get('/api/get-all-applications');
-        setApplications(response.data);
+        const response = await axios.get('/api/get-all-applications', { params: buildSearchParams() });
+        setApplications(response.data.applications);
+        setNextCursor(response.data.next_cursor);
         setLoading(false);
       } catch (error) {
         setError('Error fetching applications: ' + (error.response?.data?.message || 'Unknown error'));
@@ -55,74 +77,86 @@ const AdminDashboard = () => {
       }
     };
 
-    fetchApplications();
-  }, []);
-
-  // Filter applications based on criteria
-  const filteredApplications = useMemo(() => {
-    let result = [...applications];
-
-    // Search query filter (id, email, name, contact)
-    if (filters.searchQuery) {
-      const query = filters.searchQuery.toLowerCase();
-      result = result.filter(app =>
-        (app.id?.toString().includes(query)) ||
-        (app.email?.toLowerCase().includes(query)) ||
-        (app.first_name?.toLowerCase().includes(query)) ||
-        (app.last_name?.toLowerCase().includes(query)) ||
-        (app.contact_number?.toLowerCase().includes(query)) ||
-        (`${app.first_name} ${app.last_name}`.toLowerCase().includes(query))
-      );
-    }
+    // Debounce so that typing in the search box doesn't send a request per keystroke
+    const timer = setTimeout(fetchApplications, 300);
+    return () => clearTimeout(timer);
+  }, [buildSearchParams]);
 
-    // Final percentage filter
-    if (filters.finalPercentage) {
-      const [min, max] = filters.finalPercentage.split('-').map(Number);
-      result = result.filter(app => {
-        const percentage = parseFloat(app.final_percentage);
-        return !isNaN(percentage) && percentage >= min && percentage <= max;
-      });
+  // Summary card statistics are computed server-side over every matching application
+  const fetchAnalytics = useCallback(async () => {
+    try {
+      const params = buildSearchParams();
+      delete params.sort_by;
+      delete params.view;
+      const response = await axios.get('/api/admin/analytics', { params });
+      setAnalytics(response.data);
+    } catch (error) {
+      setError('Error fetching statistics: ' + (error.response?.data?.message || 'Unknown error'));
     }
+  }, [buildSearchParams]);
 
-    // Gender filter
-    if (filters.gender) {
-      result = result.filter(app => app.gender === filters.gender);
-    }
+  useEffect(() => {
+    const timer = setTimeout(fetchAnalytics, 300);
+    return () => clearTimeout(timer);
+  }, [fetchAnalytics]);
+
+  // Fetch the next page and append it to the list
+  const loadMoreApplications = async () => {
+    if (!nextCursor) return;
 
-    // Enrollment status filter
-    if (filters.enrollmentStatus) {
-      result = result.filter(app => app.enrollment_status === filters.enrollmentStatus);
+    try {
+      setLoadingMore(true);
+      const response = await axios.get('/api/get-all-applications', { params: buildSearchParams(nextCursor) });
+      setApplications(prev => [...prev, ...response.data.applications]);
+      setNextCursor(response.data.next_cursor);
+      setLoadingMore(false);
+    } catch (error) {
+      setError('Error fetching applications: ' + (error.response?.data?.message || 'Unknown error'));
+      setLoadingMore(false);
     }
+  };
+
+  // Download all applications matching the current filters as a streamed CSV file
+  const exportFilteredApplications = () => {
+    const params = buildSearchParams();
+    delete params.sort_by;
+    window.open(axios.getUri({ url: '/api/admin/export-applications', params: { ...params, format: 'csv' } }), '_blank');
+  };
 
-    // University filter (searches across all university fields)
-    if (filters.university) {
-      const query = filters.university.toLowerCase();
-      result = result.filter(app =>
-        (app.target_universities?.toLowerCase().includes(query)) ||
-        (app.applied_universities?.toLowerCase().includes(query)) ||
-        (app.accepted_universities?.toLowerCase().includes(query)) ||
-        (app.enrolled_university?.toLowerCase().includes(query))
-      );
+  // Queue a server-side job rendering PDF reports for every matching application
+  const startBatchReportJob = async () => {
+    try {
+      const params = buildSearchParams();
+      delete params.sort_by;
+      const response = await axios.post('/api/admin/report-jobs', params);
+      setReportJob(response.data);
+    } catch (error) {
+      setError('Failed to start report job: ' + (error.response?.data?.message || 'Unknown error'));
     }
+  };
 
-    // Apply sorting
-    result.sort((a, b) => {
-      switch (filters.sortBy) {
-        case 'id':
-          return a.id - b.id;
-        case 'name':
-          return `${a.first_name || ''} ${a.last_name || ''}`.localeCompare(`${b.first_name || ''} ${b.last_name || ''}`);
-        case 'email':
-          return (a.email || '').localeCompare(b.email || '');
-        case 'percentage':
-          return (parseFloat(b.final_percentage) || 0) - (parseFloat(a.final_percentage) || 0);
-        default:
-          return 0;
+  // Poll the report job until it finishes, then download the ZIP bundle
+  useEffect(() => {
+    if (!reportJob || reportJob.status === 'completed' || reportJob.status === 'failed') return;
+
+    const timer = setTimeout(async () => {
+      try {
+        const response = await axios.get(`/api/admin/report-jobs/${reportJob.id}`);
+        setReportJob(response.data);
+
+        if (response.data.status === 'completed') {
+          window.open(axios.getUri({ url: `/api/admin/report-jobs/${reportJob.id}/download` }), '_blank');
+        } else if (response.data.status === 'failed') {
+          setError('Report job failed: ' + (response.data.error || 'Unknown error'));
+        }
+      } catch (error) {
+        setError('Error checking report job: ' + (error.response?.data?.message || 'Unknown error'));
+        setReportJob(null);
       }
-    });
+    }, 2000);
 
-    return result;
-  }, [applications, filters]);
+    return () => clearTimeout(timer);
+  }, [reportJob]);
 
   // Handle filter changes
   const handleFilterChange = (e) => {
@@ -139,6 +173,8 @@ const AdminDashboard = () => {
       searchQuery: '',
       finalPercentage: '',
       gender: '',
+      enrollmentStatus: '',
+      university: '',
       sortBy: 'id'
     });
   };
@@ -149,6 +185,7 @@ const AdminDashboard = () => {
       try {
         await axios.delete(`/api/delete-application/${id}`);
         setApplications(applications.filter(app => app.id !== id));
+        fetchAnalytics();
         setDeleteSuccess('Application deleted successfully');
         setTimeout(() => setDeleteSuccess(''), 3000);
       } catch (error) {
@@ -371,7 +408,7 @@ const AdminDashboard = () => {
                 </div>
                 <div>
                   <h5 className="card-title mb-1">Total Applications</h5>
-                  <h2 className="fw-bold text-primary mb-0">{applications.length}</h2>
+                  <h2 className="fw-bold text-primary mb-0">{analytics ? analytics.summary.total : '-'}</h2>
                 </div>
               </div>
             </div>
@@ -392,7 +429,7 @@ const AdminDashboard = () => {
                       <div className="px-2 py-1 rounded" style={{ backgroundColor: '#e6f0ff' }}>
                         <i className="bi bi-gender-male me-1" style={{ color: '#0d6efd' }}></i>
                         <span style={{ color: '#0d6efd', fontWeight: 'bold' }}>
-                          {applications.filter(app => app.gender === 'Male').length}
+                          {analytics ? analytics.gender.Male || 0 : '-'}
                         </span>
                       </div>
                       <div className="mt-1 small" style={{ color: '#0d6efd' }}>Male</div>
@@ -401,7 +438,7 @@ const AdminDashboard = () => {
                       <div className="px-2 py-1 rounded" style={{ backgroundColor: '#fce8f3' }}>
                         <i className="bi bi-gender-female me-1" style={{ color: '#d63384' }}></i>
                         <span style={{ color: '#d63384', fontWeight: 'bold' }}>
-                          {applications.filter(app => app.gender === 'Female').length}
+                          {analytics ? analytics.gender.Female || 0 : '-'}
                         </span>
                       </div>
                       <div className="mt-1 small" style={{ color: '#d63384' }}>Female</div>
@@ -410,7 +447,7 @@ const AdminDashboard = () => {
                       <div className="px-2 py-1 rounded" style={{ backgroundColor: '#f0f0f0' }}>
                         <i className="bi bi-gender-ambiguous me-1" style={{ color: '#6c757d' }}></i>
                         <span style={{ color: '#6c757d', fontWeight: 'bold' }}>
-                          {applications.filter(app => app.gender === 'Other').length}
+                          {analytics ? analytics.gender.Other || 0 : '-'}
                         </span>
                       </div>
                       <div className="mt-1 small" style={{ color: '#6c757d' }}>Other</div>
@@ -432,9 +469,9 @@ const AdminDashboard = () => {
                 <div>
                   <h5 className="card-title mb-1">High Performers</h5>
                   <h2 className="fw-bold text-danger mb-0">
-                    {applications.filter(app => parseFloat(app.final_percentage) >= 80).length}
+                    {analytics ? analytics.summary.high_performers : '-'}
                   </h2>
-                  <small className="text-muted">Applicants with 80%+</small>
+                  <small className="text-muted">Applicants with {analytics ? analytics.summary.high_performer_threshold : 80}%+</small>
                 </div>
               </div>
             </div>
@@ -451,13 +488,7 @@ const AdminDashboard = () => {
                 <div>
                   <h5 className="card-title mb-1">Recent Applications</h5>
                   <h2 className="fw-bold text-warning mb-0">
-                    {applications.filter(app => {
-                      const createdDate = new Date(app.created_at);
-                      const now = new Date();
-                      const diffTime = Math.abs(now - createdDate);
-                      const diffDays = Math.ceil(diffTime / (1000 * 60 * 60 * 24));
-                      return diffDays <= 7;
-                    }).length}
+                    {analytics ? analytics.summary.recent : '-'}
                   </h2>
                   <small className="text-muted">Last 7 days</small>
                 </div>
@@ -578,6 +609,7 @@ const AdminDashboard = () => {
                   <option value="name">Sort by Name</option>
                   <option value="email">Sort by Email</option>
                   <option value="percentage">Sort by Percentage (highest first)</option>
+                  <option value="score">Sort by Ranking Score (highest first)</option>
                 </select>
                 <label htmlFor="sortBy">Sort Results</label>
               </div>
@@ -596,7 +628,7 @@ const AdminDashboard = () => {
                 <div className="alert alert-info py-2 mb-0 d-inline-block">
                   <small>
                     <i className="bi bi-info-circle me-2"></i>
-                    Showing {filteredApplications.length} of {applications.length} applications
+                    Showing {applications.length} applications{nextCursor ? ' (more available)' : ''}
                   </small>
                 </div>
               </div>
@@ -613,11 +645,37 @@ const AdminDashboard = () => {
               <i className="bi bi-table text-primary me-2"></i>
               <h3 className="h5 mb-0">Applications</h3>
             </div>
+            <div className="d-flex gap-2">
+              <button
+                className="btn btn-sm btn-outline-primary"
+                onClick={startBatchReportJob}
+                disabled={reportJob && (reportJob.status === 'queued' || reportJob.status === 'running')}
+                title="Generate PDF reports for applications matching the current filters"
+              >
+                {reportJob && (reportJob.status === 'queued' || reportJob.status === 'running') ? (
+                  <>
+                    <span className="spinner-border spinner-border-sm me-1" role="status" aria-hidden="true"></span>
+                    Generating ({reportJob.completed}/{reportJob.total})
+                  </>
+                ) : (
+                  <>
+                    <i className="bi bi-file-earmark-zip me-1"></i> Batch PDF Reports
+                  </>
+                )}
+              </button>
+              <button
+                className="btn btn-sm btn-outline-success"
+                onClick={exportFilteredApplications}
+                title="Export applications matching the current filters"
+              >
+                <i className="bi bi-download me-1"></i> Export CSV
+              </button>
+            </div>
           </div>
         </div>
 
         <div className="card-body p-0">
-          {filteredApplications.length === 0 ? (
+          {applications.length === 0 ? (
             <div className="text-center py-5">
               <i className="bi bi-inbox text-muted fs-1"></i>
               <p className="mt-3 text-muted">No applications found matching your criteria.</p>
@@ -640,7 +698,7 @@ const AdminDashboard = () => {
                   </tr>
                 </thead>
                 <tbody>
-                  {filteredApplications.map(application => {
+                  {applications.map(application => {
                     const genderDisplay = getGenderDisplay(application.gender);
                     const percentageDisplay = getPercentageDisplay(application.final_percentage);
                     const getEnrollmentStatusDisplay = (status) => {
@@ -694,6 +752,11 @@ const AdminDashboard = () => {
                               </span>
                             </div>
                           )}
+                          {application.ranking_score != null && (
+                            <div className="mt-1 text-muted" style={{ fontSize: '0.75rem' }}>
+                              Score {application.ranking_score.toFixed(1)}
+                            </div>
+                          )}
                         </td>
                         {/* University Status column */}
                         <td>
@@ -779,21 +842,18 @@ const AdminDashboard = () => {
         <div className="card-footer bg-white py-3 border-top">
           <div className="d-flex justify-content-between align-items-center">
             <div className="small text-muted">
-              Showing {filteredApplications.length} of {applications.length} applications
+              Showing {applications.length} applications
             </div>
-            <nav aria-label="Page navigation">
-              <ul className="pagination pagination-sm mb-0">
-                <li className="page-item disabled">
-                  <span className="page-link">Previous</span>
-                </li>
-                <li className="page-item active">
-                  <span className="page-link">1</span>
-                </li>
-                <li className="page-item disabled">
-                  <span className="page-link">Next</span>
-                </li>
-              </ul>
-            </nav>
+            <button
+              className="btn btn-sm btn-outline-primary"
+              onClick={loadMoreApplications}
+              disabled={!nextCursor || loadingMore}
+            >
+              {loadingMore && (
+                <span className="spinner-border spinner-border-sm me-1" role="status" aria-hidden="true"></span>
+              )}
+              Load More
+            </button>
           </div>
         </div>
       </div>
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import axios from '../services/axiosConfig';
+import { uploadFileInChunks } from '../services/chunkedUpload';
 
 const ApplicationForm = () => {
   const navigate = useNavigate();
@@ -130,17 +131,9 @@ const ApplicationForm = () => {
   const uploadFile = async (file, type) => {
     if (!file) return filePaths[type] || null;
     
-    const formData = new FormData();
-    formData.append('file', file);
-    formData.append('type', type);
-    
     try {
-      const response = await axios.post('/api/upload-file', formData, {
-        headers: {
-          'Content-Type': 'multipart/form-data'
-        },
-        onUploadProgress: (progressEvent) => {
-          const percentCompleted = Math.round((progressEvent.loaded * 100) / progressEvent.total);
+      const data = await uploadFileInChunks(file, type, {
+        onProgress: (percentCompleted) => {
           setUploadProgress(prev => ({
             ...prev,
             [type]: percentCompleted
@@ -154,7 +147,7 @@ const ApplicationForm = () => {
         [type]: 0
       }));
       
-      return response.data.fileId; // Store file ID instead of path
+      return data.fileId; // Store file ID instead of path
     } catch (error) {
       console.error(`Error uploading ${type}:`, error);
       throw error;
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useParams, useNavigate, Link } from 'react-router-dom';
 import axios from '../services/axiosConfig';
+import { uploadFileInChunks } from '../services/chunkedUpload';
 
 const EditApplication = () => {
   const { id } = useParams();
@@ -160,16 +161,7 @@ const EditApplication = () => {
         }
       }));
       
-      const formDataObj = new FormData();
-      formDataObj.append('file', file);
-      formDataObj.append('type', fileType);
-      formDataObj.append('applicationId', id);
-      
-      const response = await axios.post('/api/upload-file', formDataObj, {
-        headers: {
-          'Content-Type': 'multipart/form-data'
-        }
-      });
+      const data = await uploadFileInChunks(file, fileType, { applicationId: id });
       
       setFileStatus(prev => ({
         ...prev,
@@ -181,7 +173,7 @@ const EditApplication = () => {
         }
       }));
       
-      return response.data.fileId; // Return the file ID for storage
+      return data.fileId; // Return the file ID for storage
     } catch (error) {
       console.error(`Error uploading ${fileType}:`, error);
       setFileStatus(prev => ({
@@ -8,8 +8,9 @@ import { CSVLink } from 'react-csv';
 const ManageUsers = () => {
   // State management
   const [users, setUsers] = useState([]);
-  const [applications, setApplications] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState('');
   const [success, setSuccess] = useState('');
   const [showDeleteDialog, setShowDeleteDialog] = useState(false);
@@ -19,6 +20,7 @@ const ManageUsers = () => {
   const [reportFormat, setReportFormat] = useState('pdf');
   const [reportData, setReportData] = useState(null);
   const [generatingReport, setGeneratingReport] = useState(false);
+  const [importJob, setImportJob] = useState(null);
   const [currentUser] = useState('shreyaupretyy');
   const [currentDateTime] = useState('2025-03-21 11:24:56');
   
@@ -45,19 +47,18 @@ const ManageUsers = () => {
     contact_number: ''
   });
 
-  // Fetch users and applications data
+  // Fetch users together with a summary of their applications
+  const fetchUsersPage = (cursor) => axios.get('/api/admin/users', {
+    params: { include_application: true, ...(cursor && { cursor }) }
+  });
+
   useEffect(() => {
     const fetchData = async () => {
       try {
         setLoading(true);
-        // Fetch all users
-        const usersResponse = await axios.get('/api/admin/users');
-        setUsers(usersResponse.data);
-        
-        // Fetch all applications for additional details
-        const applicationsResponse = await axios.get('/api/get-all-applications');
-        setApplications(applicationsResponse.data);
-        
+        const response = await fetchUsersPage();
+        setUsers(response.data.users);
+        setNextCursor(response.data.next_cursor);
         setLoading(false);
       } catch (error) {
         setError('Error fetching data: ' + (error.response?.data?.message || 'Unknown error'));
@@ -68,17 +69,30 @@ const ManageUsers = () => {
     fetchData();
   }, []);
 
-  // Combine user and application data
+  // Fetch the next page of users and append it to the list
+  const loadMoreUsers = async () => {
+    if (!nextCursor) return;
+
+    try {
+      setLoadingMore(true);
+      const response = await fetchUsersPage(nextCursor);
+      setUsers(prev => [...prev, ...response.data.users]);
+      setNextCursor(response.data.next_cursor);
+      setLoadingMore(false);
+    } catch (error) {
+      setError('Error fetching data: ' + (error.response?.data?.message || 'Unknown error'));
+      setLoadingMore(false);
+    }
+  };
+
+  // Flatten the embedded application summary into each user row
   const combinedUserData = useMemo(() => {
-    return users.map(user => {
-      const application = applications.find(app => app.user_id === user.id);
-      return {
-        ...user,
-        ...application,
-        hasApplicationData: !!application
-      };
-    });
-  }, [users, applications]);
+    return users.map(user => ({
+      ...user.application,
+      ...user,
+      hasApplicationData: !!user.has_application
+    }));
+  }, [users]);
 
   // Form field handling for new user creation
   const handleChange = (e) => {
@@ -151,6 +165,65 @@ const ManageUsers = () => {
     }
   };
 
+  // Create users in bulk from a CSV or JSON file
+  const handleImportUsers = async (e) => {
+    const file = e.target.files[0];
+    e.target.value = '';
+    if (!file) return;
+
+    setError('');
+    setSuccess('');
+    const formData = new FormData();
+    formData.append('file', file);
+
+    try {
+      // The import runs in the background; the effect below polls it
+      const response = await axios.post('/api/admin/import-users', formData, {
+        headers: { 'Content-Type': 'multipart/form-data' }
+      });
+      setImportJob(response.data);
+    } catch (error) {
+      setError('Failed to import users: ' + (error.response?.data?.message || 'Unknown error'));
+    }
+  };
+
+  const importing = importJob !== null && (importJob.status === 'queued' || importJob.status === 'running');
+
+  // Poll the import job until it finishes, then report failed rows and reload the users
+  useEffect(() => {
+    if (!importing) return;
+
+    const timer = setTimeout(async () => {
+      try {
+        const response = await axios.get(`/api/admin/import-jobs/${importJob.id}`);
+        const job = response.data;
+        setImportJob(job);
+
+        if (job.status === 'completed') {
+          setSuccess(job.message);
+        } else if (job.status === 'failed') {
+          setError('Import failed: ' + (job.error || 'Unknown error'));
+        }
+        if (job.status === 'completed' || job.status === 'failed') {
+          if (job.failed) {
+            const details = job.errors.slice(0, 5).map(err => `row ${err.row}: ${err.message}`).join('; ');
+            setError(prev => `${prev ? prev + ' ' : ''}${job.failed} rows were not imported (${details}${job.failed > 5 ? '; ...' : ''})`);
+          }
+
+          // Reload the first page so the new users show up
+          const usersResponse = await fetchUsersPage();
+          setUsers(usersResponse.data.users);
+          setNextCursor(usersResponse.data.next_cursor);
+        }
+      } catch (error) {
+        setError('Error checking import: ' + (error.response?.data?.message || 'Unknown error'));
+        setImportJob(null);
+      }
+    }, 2000);
+
+    return () => clearTimeout(timer);
+  }, [importJob]);
+
   // Open delete confirmation dialog
   const openDeleteDialog = (user) => {
     setUserToDelete(user);
@@ -557,6 +630,24 @@ const ManageUsers = () => {
                   <h3 className="h5 mb-0">User List</h3>
                 </div>
                 <div>
+                  <label
+                    className={`btn btn-sm me-2 mb-0 ${importing ? 'disabled' : ''}`}
+                    style={{
+                      backgroundColor: 'rgba(13, 110, 253, 0.1)',
+                      color: '#0d6efd',
+                      borderRadius: '6px',
+                      boxShadow: '0 2px 4px rgba(0,0,0,0.05)',
+                      padding: '0.5rem 0.75rem'
+                    }}
+                    title="CSV or JSON with email, password, first_name, last_name, contact_number"
+                  >
+                    {importing ? (
+                      <><span className="spinner-border spinner-border-sm me-1" role="status" aria-hidden="true"></span> Importing ({importJob.processed}/{importJob.total})</>
+                    ) : (
+                      <><i className="bi bi-upload me-1"></i> Import Users</>
+                    )}
+                    <input type="file" accept=".csv,.json" className="d-none" onChange={handleImportUsers} disabled={importing} />
+                  </label>
                   <button 
                     className="btn btn-sm"
                     style={{
@@ -721,6 +812,16 @@ const ManageUsers = () => {
                   <i className="bi bi-info-circle me-1"></i> 
                   Showing {combinedUserData.length} users in the system
                 </div>
+                <button
+                  className="btn btn-sm btn-outline-primary"
+                  onClick={loadMoreUsers}
+                  disabled={!nextCursor || loadingMore}
+                >
+                  {loadingMore && (
+                    <span className="spinner-border spinner-border-sm me-1" role="status" aria-hidden="true"></span>
+                  )}
+                  Load More
+                </button>
               </div>
             </div>
           </div>
@@ -604,11 +604,11 @@ const UserDashboard = () => {
               <div className="row">
                 <div className="col-md-6">
                   <div className="small text-muted mb-1">Created on</div>
-                  <div className="fw-medium">{application.created_at}</div>
+                  <div className="fw-medium">{new Date(application.created_at).toLocaleString()}</div>
                 </div>
                 <div className="col-md-6">
                   <div className="small text-muted mb-1">Last updated</div>
-                  <div className="fw-medium">{application.updated_at}</div>
+                  <div className="fw-medium">{new Date(application.updated_at).toLocaleString()}</div>
                 </div>
               </div>
             </div>
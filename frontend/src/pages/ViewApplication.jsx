@@ -1178,6 +1178,13 @@ const ViewApplication = () => {
                   <td>
                     {application.photo ? (
                       <>
+                        <img
+                          src={axios.getUri({ url: `/api/files/${application.photo}/thumbnail`, params: { size: 'avatar' } })}
+                          alt="Applicant"
+                          className="rounded-circle me-2"
+                          style={{ width: '32px', height: '32px', objectFit: 'cover' }}
+                          loading="lazy"
+                        />
                         <span className="badge bg-success">
                           <i className="bi bi-check-circle me-1"></i> Available
                         </span>
@@ -1242,7 +1249,7 @@ const ViewApplication = () => {
             </div>
             <div className="col-md-4">
               <div className="small text-muted mb-1">Last Updated</div>
-              <div className="fw-bold">{application.updated_at}</div>
+              <div className="fw-bold">{new Date(application.updated_at).toLocaleString()}</div>
             </div>
           </div>
         </div>
@@ -15,7 +15,7 @@ instance.interceptors.request.use(
     
     // Ensure content type for submission
     if (config.method === 'post' || config.method === 'put') {
-      if (!(config.data instanceof FormData)) {
+      if (!(config.data instanceof FormData) && !(config.data instanceof Blob)) {
         config.headers['Content-Type'] = 'application/json';
       }
     }
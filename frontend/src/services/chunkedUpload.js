@@ -0,0 +1,62 @@
+// services/chunkedUpload.js
+import axios from './axiosConfig';
+
+const MAX_CHUNK_RETRIES = 3;
+
+// SHA-256 of the whole file as hex, so the server can check the bytes it stored.
+// Resolves with null where Web Crypto isn't available (non-HTTPS origins).
+const sha256Hex = async (file) => {
+  if (!window.crypto || !window.crypto.subtle) {
+    return null;
+  }
+  const digest = await window.crypto.subtle.digest('SHA-256', await file.arrayBuffer());
+  return Array.from(new Uint8Array(digest), byte => byte.toString(16).padStart(2, '0')).join('');
+};
+
+// Upload a file in chunks through /api/uploads so a dropped connection only
+// costs the current chunk. Resolves with the upload response (fileId etc.).
+export const uploadFileInChunks = async (file, type, { applicationId, onProgress } = {}) => {
+  const { data: upload } = await axios.post('/api/uploads', {
+    filename: file.name,
+    type,
+    size: file.size,
+    applicationId
+  });
+
+  // Hash while the chunks upload
+  const digest = sha256Hex(file).catch(() => null);
+
+  let offset = upload.offset;
+  let retries = 0;
+
+  while (offset < file.size) {
+    const chunk = file.slice(offset, offset + upload.chunk_size);
+    try {
+      const { data } = await axios.put(`/api/uploads/${upload.id}`, chunk, {
+        params: { offset },
+        headers: { 'Content-Type': 'application/octet-stream' }
+      });
+      offset = data.offset;
+      retries = 0;
+    } catch (error) {
+      if (error.response && error.response.status === 409) {
+        // The server has a different offset (e.g. a retried chunk did arrive); continue from there
+        offset = error.response.data.offset;
+      } else if (retries < MAX_CHUNK_RETRIES && (!error.response || error.response.status >= 500)) {
+        retries += 1;
+        const { data } = await axios.get(`/api/uploads/${upload.id}`);
+        offset = data.offset;
+      } else {
+        throw error;
+      }
+    }
+
+    if (onProgress) {
+      onProgress(Math.round((offset * 100) / file.size));
+    }
+  }
+
+  const sha256 = await digest;
+  const { data } = await axios.post(`/api/uploads/${upload.id}/complete`, sha256 ? { sha256 } : {});
+  return data;
+};